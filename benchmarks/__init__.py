@@ -0,0 +1,5 @@
+import os
+
+# CrewAI reads these when it is first imported; benchmarks must never reach the network
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
@@ -0,0 +1,171 @@
+import json
+import re
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+import pandas as pd
+import yfinance as yf
+from crewai.llms.base_llm import BaseLLM
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+_ROLE_PATTERN = re.compile(r"You are (.+?)\.")
+
+
+@dataclass(frozen=True)
+class Latency:
+    """Simulated round-trip time, in seconds, added to each replayed call."""
+    yahoo: float = 0.0
+    brave: float = 0.0
+    llm: float = 0.0
+
+
+def _sleep(seconds: float) -> None:
+    if seconds > 0:
+        time.sleep(seconds)
+
+
+def base_symbol(ticker: str) -> str:
+    """Map a synthetic watchlist symbol (e.g. 'AAPL17') to the recorded symbol it replays."""
+    return ticker.upper().rstrip("0123456789")
+
+
+class Fixtures:
+    """Recorded responses loaded from a fixtures directory.
+
+    Price history dates are shifted so the last recorded bar falls on the previous
+    day, which keeps "last N days" requests meaningful whenever the benchmark runs.
+    """
+
+    def __init__(self, directory: str | Path = FIXTURES_DIR, today: date | None = None):
+        directory = Path(directory)
+        self.info: dict[str, dict] = self._load(directory / "yahoo_info.json")
+        self.search_results: dict[str, list[dict]] = self._load(directory / "brave_search.json")
+        self.completions: dict[str, list[str]] = self._load(directory / "llm_completions.json")
+
+        today = today or date.today()
+        self.history: dict[str, pd.DataFrame] = {}
+        for symbol, recorded in self._load(directory / "yahoo_history.json").items():
+            index = pd.DatetimeIndex(pd.to_datetime(recorded.pop("dates")))
+            index = index + pd.Timedelta(days=(today - timedelta(days=1) - index[-1].date()).days)
+            self.history[symbol] = pd.DataFrame(recorded, index=index)
+
+    @staticmethod
+    def _load(path: Path) -> Any:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self.info)
+
+    def watchlist(self, size: int) -> list[str]:
+        """Return ``size`` distinct symbols cycling through the recorded ones."""
+        symbols = self.symbols
+        watchlist = []
+        for i in range(size):
+            symbol = symbols[i % len(symbols)]
+            rounds = i // len(symbols)
+            watchlist.append(f"{symbol}{rounds}" if rounds else symbol)
+        return watchlist
+
+    def headlines(self, ticker: str) -> list[str]:
+        return [result["title"] for result in self.search_results.get(base_symbol(ticker), [])]
+
+
+class ReplayTicker:
+    """Stand-in for ``yf.Ticker`` serving recorded info and history."""
+
+    def __init__(self, fixtures: Fixtures, latency: Latency, ticker: str):
+        self._fixtures = fixtures
+        self._latency = latency
+        self.ticker = ticker
+
+    @property
+    def info(self) -> dict:
+        _sleep(self._latency.yahoo)
+        info = self._fixtures.info.get(base_symbol(self.ticker))
+        if info is None:
+            raise Exception(f"HTTP Error 404: Quote not found for symbol: {self.ticker}")
+        return dict(info)
+
+    def history(self, start=None, end=None, interval="1d", **kwargs) -> pd.DataFrame:
+        _sleep(self._latency.yahoo)
+        frame = self._fixtures.history.get(base_symbol(self.ticker))
+        if frame is None:
+            return pd.DataFrame()
+        return frame.loc[str(start):str(end)].copy() if start else frame.copy()
+
+
+def replay_download(fixtures: Fixtures, latency: Latency, tickers, start=None, end=None, **kwargs) -> pd.DataFrame:
+    """Stand-in for ``yf.download(..., group_by="ticker")``: one delay for the whole batch."""
+    _sleep(latency.yahoo)
+    frames = {
+        ticker: ReplayTicker(fixtures, Latency(), ticker).history(start=start, end=end)
+        for ticker in tickers
+    }
+    frames = {ticker: frame for ticker, frame in frames.items() if not frame.empty}
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1)
+
+
+@contextmanager
+def replayed_yahoo(fixtures: Fixtures, latency: Latency) -> Iterator[None]:
+    """Route every ``yf.Ticker`` and ``yf.download`` call to the recorded responses."""
+    with mock.patch.object(yf, "Ticker", lambda ticker, *args, **kwargs: ReplayTicker(fixtures, latency, ticker)), \
+            mock.patch.object(yf, "download", lambda *args, **kwargs: replay_download(fixtures, latency, *args, **kwargs)):
+        yield
+
+
+class ReplaySearchBackend:
+    """News search backend returning the recorded Brave results for a query's ticker."""
+
+    def __init__(self, fixtures: Fixtures, latency: Latency):
+        self.fixtures = fixtures
+        self.latency = latency
+
+    def search(self, query: str, count: int = 10) -> list[dict]:
+        _sleep(self.latency.brave)
+        ticker = query.split()[0] if query.strip() else ""
+        return self.fixtures.search_results.get(base_symbol(ticker), [])[:count]
+
+
+class ReplayLLM(BaseLLM):
+    """LLM replaying recorded completions per agent role.
+
+    The n-th call within one agent execution gets the n-th recorded completion of
+    that agent's role; '{ticker}' in a completion is replaced with ``self.ticker``.
+    """
+
+    def __init__(self, fixtures: Fixtures, latency: Latency):
+        super().__init__(model="replay")
+        self.fixtures = fixtures
+        self.latency = latency
+        self.ticker = ""
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None) -> str:
+        _sleep(self.latency.llm)
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        match = _ROLE_PATTERN.search(messages[0]["content"])
+        completions = self.fixtures.completions.get(match.group(1) if match else "", [])
+        if not completions:
+            return "Thought: I now know the final answer\nFinal Answer: No recorded answer."
+        turn = sum(1 for message in messages if message["role"] == "assistant")
+        return completions[min(turn, len(completions) - 1)].replace("{ticker}", self.ticker)
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return 128_000
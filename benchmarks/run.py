@@ -0,0 +1,332 @@
+import argparse
+import contextlib
+import io
+import json
+import logging
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from benchmarks.replay import (
+    Fixtures,
+    Latency,
+    ReplayLLM,
+    ReplaySearchBackend,
+    replayed_yahoo,
+)
+from src.controller import analyze_ticker
+from src.session import AnalyzerSession
+from src.utils import price_loader, rate_limit, validation
+from src.utils.cache_config import CACHE_DIR_ENV, NO_CACHE_ENV
+from src.utils.news_cache import NewsSearchCache, set_news_cache
+from src.utils.sentiment_scorer import SentimentScorer
+
+DEFAULT_SIZES = (1, 10, 100, 1000)
+DEFAULT_STARTUP_REPEATS = 5
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+# A result regresses when it is this much worse than the baseline...
+DEFAULT_TOLERANCE = 0.25
+# ...and the difference is larger than noise: 1 ms of latency or 1 MB of memory
+MIN_LATENCY_DELTA_MS = 1.0
+MIN_MEMORY_DELTA_MB = 1.0
+
+# A stage prepares its (untimed) state for a watchlist and returns the timed runner;
+# the runner processes the watchlist and returns one latency per ticker in seconds
+Stage = Callable[[list[str], Fixtures, Latency], Callable[[], list[float]]]
+
+
+def _timed_each(tickers: list[str], func: Callable[[str], object]) -> list[float]:
+    latencies = []
+    for ticker in tickers:
+        start = time.perf_counter()
+        func(ticker)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def validation_stage(tickers: list[str], fixtures: Fixtures, latency: Latency) -> Callable[[], list[float]]:
+    validation.reset_validation_defaults()
+    return lambda: _timed_each(tickers, validation.validate_ticker_symbol)
+
+
+def price_stage(tickers: list[str], fixtures: Fixtures, latency: Latency) -> Callable[[], list[float]]:
+    loader = price_loader.PriceLoader()
+
+    def run() -> list[float]:
+        loader.prefetch(tickers)
+        return _timed_each(tickers, loader.get_price_data)
+
+    return run
+
+
+def sentiment_stage(tickers: list[str], fixtures: Fixtures, latency: Latency) -> Callable[[], list[float]]:
+    scorer = SentimentScorer()
+    return lambda: _timed_each(tickers, lambda ticker: scorer.score(fixtures.headlines(ticker)))
+
+
+def analyze_stage(tickers: list[str], fixtures: Fixtures, latency: Latency) -> Callable[[], list[float]]:
+    validation.reset_validation_defaults()
+    price_loader.set_price_loader(price_loader.PriceLoader())
+    set_news_cache(NewsSearchCache(backend=ReplaySearchBackend(fixtures, latency)))
+    llm = ReplayLLM(fixtures, latency)
+    session = AnalyzerSession(llm=llm, planning=False)
+
+    def analyze(ticker: str) -> None:
+        llm.ticker = ticker
+        success, error = analyze_ticker(ticker, session=session)
+        if not success:
+            raise RuntimeError(error)
+
+    return lambda: _timed_each(tickers, analyze)
+
+
+STAGES: dict[str, Stage] = {
+    "validation": validation_stage,
+    "price": price_stage,
+    "sentiment": sentiment_stage,
+    "analyze": analyze_stage,
+}
+
+# Cold-start cost of one-shot invocations, each measured in a fresh interpreter
+STARTUP_STAGE = "startup"
+STARTUP_STATEMENTS = {
+    "startup.import": "import src.controller",
+    "startup.help": "import src.controller\ntry:\n    src.controller.main(['--help'])\nexcept SystemExit:\n    pass",
+}
+# Modules a one-shot invocation must not load before an analysis actually runs
+HEAVY_MODULES = ("crewai", "crewai_tools", "litellm", "yfinance", "pandas", "numpy")
+
+# ru_maxrss survives exec on Linux (it would report the benchmark's own peak), so the
+# child's high-water mark is read from /proc when available
+_STARTUP_PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+exec(compile(sys.argv[1], "<startup>", "exec"))
+seconds = time.perf_counter() - start
+try:
+    with open("/proc/self/status") as status:
+        peak_kb = next(int(line.split()[1]) for line in status if line.startswith("VmHWM:"))
+except (OSError, StopIteration):
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    "seconds": seconds,
+    "max_rss_kb": peak_kb,
+    "heavy_modules": sorted(set(sys.argv[2:]) & set(sys.modules)),
+}), file=sys.stderr)
+"""
+
+
+@dataclass
+class BenchmarkResult:
+    """Latency, throughput and memory of one stage over one watchlist size."""
+    stage: str
+    size: int
+    p50_ms: float
+    p95_ms: float
+    throughput_per_s: float
+    peak_memory_mb: float
+
+
+@contextlib.contextmanager
+def offline_environment(fixtures: Fixtures, latency: Latency):
+    """Replay recorded responses, disable on-disk caches and silence crew output."""
+    with tempfile.TemporaryDirectory() as cache_dir, \
+            mock.patch.dict(os.environ, {
+                CACHE_DIR_ENV: cache_dir,
+                NO_CACHE_ENV: "1",
+            }), \
+            replayed_yahoo(fixtures, latency), \
+            contextlib.redirect_stdout(io.StringIO()):
+        os.environ.pop(validation.SYMBOL_DIRECTORY_ENV, None)
+        # Replayed providers never throttle: measure the limiter's overhead, not its waits
+        for name in rate_limit.DEFAULT_LIMITS:
+            rate_limit.set_provider(name, rate_limit.Provider(name, rate_limit.TokenBucket(math.inf)))
+        previous_level = logging.root.level
+        logging.root.setLevel(logging.WARNING)
+        try:
+            yield
+        finally:
+            logging.root.setLevel(previous_level)
+            price_loader.set_price_loader(None)
+            set_news_cache(None)
+            validation.reset_validation_defaults()
+            rate_limit.reset_providers()
+
+
+def run_stage(name: str, size: int, fixtures: Fixtures, latency: Latency) -> BenchmarkResult:
+    """Run one stage over a watchlist of ``size`` symbols and summarize it."""
+    tickers = fixtures.watchlist(size)
+    # Warm up lazy imports and model loading so they do not count as latency
+    STAGES[name](tickers[:1], fixtures, latency)()
+    runner = STAGES[name](tickers, fixtures, latency)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        latencies = np.array(runner()) * 1000
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        stage=name,
+        size=size,
+        p50_ms=round(float(np.percentile(latencies, 50)), 3),
+        p95_ms=round(float(np.percentile(latencies, 95)), 3),
+        throughput_per_s=round(size / elapsed, 3) if elapsed > 0 else float("inf"),
+        peak_memory_mb=round(peak / 2**20, 3),
+    )
+
+
+def probe_startup(statement: str) -> dict:
+    """Run ``statement`` in a fresh interpreter and return its duration, peak RSS and heavy imports."""
+    completed = subprocess.run(
+        [sys.executable, "-c", _STARTUP_PROBE, statement, *HEAVY_MODULES],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stderr.strip().splitlines()[-1])
+
+
+def run_startup(repeats: int = DEFAULT_STARTUP_REPEATS) -> list[BenchmarkResult]:
+    """Measure each startup statement ``repeats`` times; the size of each result is the repeat count."""
+    results = []
+    for name, statement in STARTUP_STATEMENTS.items():
+        start = time.perf_counter()
+        probes = [probe_startup(statement) for _ in range(repeats)]
+        elapsed = time.perf_counter() - start
+        latencies = np.array([probe["seconds"] for probe in probes]) * 1000
+        results.append(BenchmarkResult(
+            stage=name,
+            size=repeats,
+            p50_ms=round(float(np.percentile(latencies, 50)), 3),
+            p95_ms=round(float(np.percentile(latencies, 95)), 3),
+            throughput_per_s=round(repeats / elapsed, 3) if elapsed > 0 else float("inf"),
+            peak_memory_mb=round(max(probe["max_rss_kb"] for probe in probes) / 1024, 3),
+        ))
+    return results
+
+
+def run_benchmarks(
+    stages: list[str] | None = None,
+    sizes: tuple[int, ...] = DEFAULT_SIZES,
+    latency: Latency | None = None,
+    fixtures: Fixtures | None = None,
+    startup_repeats: int = DEFAULT_STARTUP_REPEATS,
+) -> list[BenchmarkResult]:
+    """Run every requested stage at every watchlist size against the recorded fixtures.
+
+    The 'startup' stage is not sized by watchlist: it runs ``startup_repeats`` fresh
+    interpreters per statement instead.
+    """
+    latency = latency or Latency()
+    fixtures = fixtures or Fixtures()
+    stages = stages or [*STAGES, STARTUP_STAGE]
+    results = []
+    with offline_environment(fixtures, latency):
+        for name in stages:
+            if name != STARTUP_STAGE:
+                for size in sizes:
+                    results.append(run_stage(name, size, fixtures, latency))
+    if STARTUP_STAGE in stages:
+        results.extend(run_startup(startup_repeats))
+    return results
+
+
+def find_regressions(
+    results: list[BenchmarkResult], baseline: list[dict], tolerance: float = DEFAULT_TOLERANCE
+) -> list[str]:
+    """Compare results with a stored baseline and describe every regression found."""
+    previous = {(entry["stage"], entry["size"]): entry for entry in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get((result.stage, result.size))
+        if base is None:
+            continue
+        label = f"{result.stage}[{result.size}]"
+        if result.p95_ms > base["p95_ms"] * (1 + tolerance) and result.p95_ms - base["p95_ms"] > MIN_LATENCY_DELTA_MS:
+            regressions.append(f"{label}: p95 {result.p95_ms:.3f} ms vs baseline {base['p95_ms']:.3f} ms")
+        if result.throughput_per_s * (1 + tolerance) < base["throughput_per_s"] and \
+                1000 / result.throughput_per_s - 1000 / base["throughput_per_s"] > MIN_LATENCY_DELTA_MS:
+            regressions.append(
+                f"{label}: throughput {result.throughput_per_s:.1f}/s vs baseline {base['throughput_per_s']:.1f}/s"
+            )
+        if result.peak_memory_mb > base["peak_memory_mb"] * (1 + tolerance) and \
+                result.peak_memory_mb - base["peak_memory_mb"] > MIN_MEMORY_DELTA_MB:
+            regressions.append(
+                f"{label}: peak memory {result.peak_memory_mb:.1f} MB vs baseline {base['peak_memory_mb']:.1f} MB"
+            )
+    return regressions
+
+
+def format_table(results: list[BenchmarkResult]) -> str:
+    lines = [f"{'stage':<16}{'size':>6}{'p50 ms':>12}{'p95 ms':>12}{'items/s':>12}{'peak MB':>10}"]
+    for r in results:
+        lines.append(
+            f"{r.stage:<16}{r.size:>6}{r.p50_ms:>12.3f}{r.p95_ms:>12.3f}{r.throughput_per_s:>12.1f}{r.peak_memory_mb:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the ticker pipeline offline against recorded responses.")
+    parser.add_argument("--stages", nargs="+", choices=[*STAGES, STARTUP_STAGE], help="Stages to run (default: all)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES), help="Watchlist sizes")
+    parser.add_argument("--startup-repeats", type=int, default=DEFAULT_STARTUP_REPEATS,
+                        help="Fresh interpreters started per startup measurement")
+    parser.add_argument("--yahoo-latency-ms", type=float, default=0.0, help="Delay added to each Yahoo call")
+    parser.add_argument("--brave-latency-ms", type=float, default=0.0, help="Delay added to each Brave search")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Delay added to each LLM completion")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed slowdown before failing (default: {DEFAULT_TOLERANCE:.0%})")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    latency = Latency(
+        yahoo=args.yahoo_latency_ms / 1000, brave=args.brave_latency_ms / 1000, llm=args.llm_latency_ms / 1000
+    )
+    results = run_benchmarks(args.stages, tuple(args.sizes), latency, startup_repeats=args.startup_repeats)
+    print(format_table(results))
+
+    report = {"latency": asdict(latency), "results": [asdict(result) for result in results]}
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline written to {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --update-baseline to create one.")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text())
+    if baseline.get("latency") != asdict(latency):
+        print("Warning: the baseline was recorded with different injected latencies.")
+    regressions = find_regressions(results, baseline["results"], args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,68 @@
+import logging
+
 from crewai import Agent
-from crewai_tools import BraveSearchTool
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr
+
+from src.utils import events
+from src.utils.events import NewsItems
+from src.utils.news_cache import NewsSearchCache, format_articles, get_news_cache
+
+logger = logging.getLogger(__name__)
+
+
+class NewsSearchToolSchema(BaseModel):
+    """Input for NewsSearchTool."""
+
+    search_query: str = Field(
+        ..., description="Mandatory search query you want to use to search the internet"
+    )
+
+
+class NewsSearchTool(BaseTool):
+    """
+    Web search tool backed by a NewsSearchCache: repeated searches within the cache TTL
+    are free, duplicate articles are dropped and each article carries a cached summary.
+    """
+    name: str = "Search the internet for news"
+    description: str = (
+        "A tool that can be used to search the internet with a search_query. "
+        "Returns distinct articles, each with a title, link and short summary."
+    )
+    args_schema: type[BaseModel] = NewsSearchToolSchema
+    n_results: int = 10
+    _cache: NewsSearchCache = PrivateAttr()
+
+    def __init__(self, cache: NewsSearchCache | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self._cache = cache or get_news_cache()
+
+    def _run(self, search_query: str, **kwargs) -> str:
+        try:
+            articles = self._cache.search(search_query, self.n_results)
+        except Exception as e:
+            logger.error(f"Error performing search for '{search_query}': {e}")
+            return f"Error performing search: {str(e)}"
+        if not articles:
+            return "No results found."
+        if events.publishing():
+            events.publish(NewsItems, query=search_query, articles=[
+                {"title": article.title, "url": article.url, "summary": article.summary} for article in articles
+            ])
+        return format_articles(articles)
 
 
 class NewsAgent:
     """
     CrewAI agent for searching and summarizing news using the Brave Search API.
     """
-    def __init__(self, role: str = "News Researcher", goal: str = "Find and summarize the latest news about a stock ticker.", llm=None):
-        self.brave_search_tool = BraveSearchTool()
+    def __init__(self, role: str = "News Researcher", goal: str = "Find and summarize the latest news about a stock ticker.", llm=None, search_cache: NewsSearchCache | None = None):
+        self.search_tool = NewsSearchTool(cache=search_cache)
         self.agent = Agent(
             role=role,
             goal=goal,
             backstory="An expert in financial news research, skilled at finding and summarizing relevant news articles for stock analysis.",
-            tools=[self.brave_search_tool],
+            tools=[self.search_tool],
             llm=llm,
             verbose=True,
-        ) 
\ No newline at end of file
+        )
@@ -1,45 +1,28 @@
 import logging
 from typing import Any
 
-import yfinance as yf
 from crewai import Agent
 from crewai.tools import tool
 
+from src.utils import events
+from src.utils.events import PriceSummary
+from src.utils.price_loader import get_price_loader
+
 logger = logging.getLogger(__name__)
 
 @tool("Fetch Price Data Tool")
 def fetch_price_data_tool(ticker: str, days: int = 30) -> dict[str, Any] | None:
-    """Fetch historical price data for a given ticker using Yahoo Finance."""
+    """Fetch a summary of a ticker's recent price history from Yahoo Finance: open/close, high/low with dates, returns, moving average, volatility, volume, a few sampled closes and technical indicators (SMA, EMA, RSI, MACD, ATR, drawdown)."""
     logger.info(f"Fetching price data for ticker: {ticker}, days: {days}")
     
     try:
-        ticker_obj = yf.Ticker(ticker)
-        hist = ticker_obj.history(period=f"{days}d")
-        if hist.empty:
+        # Served from the prefetched watchlist batch when available
+        price_data = get_price_loader().get_price_data(ticker, days)
+        if price_data is None:
             logger.error(f"No price data found for ticker: {ticker}")
-            return None
-        
-        data = []
-        for idx, row in hist.iterrows():
-            data_point = {
-                "date": str(idx.date()),
-                "open": row["Open"],
-                "close": row["Close"],
-                "high": row["High"],
-                "low": row["Low"],
-                "volume": int(row["Volume"])
-            }
-            data.append(data_point)
-            
-        moving_average = hist["Close"].mean()
-        volatility = hist["Close"].std()
-        
-        return {
-            "ticker": ticker,
-            "data": data,
-            "moving_average": moving_average,
-            "volatility": volatility
-        }
+        else:
+            events.publish(PriceSummary, summary=price_data)
+        return price_data
     except Exception as e:
         logger.error(f"Error fetching price data for {ticker}: {e}")
         return None
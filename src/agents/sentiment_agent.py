@@ -1,13 +1,39 @@
 import logging
+from typing import Any
 
 from crewai import Agent
+from crewai.tools import tool
+
+from src.utils import events
+from src.utils.events import SentimentScore
+from src.utils.sentiment_scorer import SentimentScorer
 
 logger = logging.getLogger(__name__)
 
+_scorer = SentimentScorer()
+
+@tool("Score Sentiment Tool")
+def score_sentiment_tool(texts: list[str]) -> dict[str, Any]:
+    """Score news headlines or snippets from -1.0 (very negative) to 1.0 (very positive) with a local finance lexicon. Items listed as ambiguous need your own judgement."""
+    logger.info(f"Scoring sentiment locally for {len(texts)} texts")
+    batch = _scorer.score(texts)
+    events.publish(
+        SentimentScore, score=round(batch.overall, 3), texts=len(batch.texts), ambiguous=int(sum(batch.ambiguous))
+    )
+    return {
+        "overall_score": round(batch.overall, 3),
+        "scores": [
+            {"text": text, "score": round(float(score), 3)}
+            for text, score in zip(batch.texts, batch.scores, strict=True)
+        ],
+        "ambiguous": [text for text, flag in zip(batch.texts, batch.ambiguous, strict=True) if flag],
+    }
+
 class SentimentAgent:
     """
     CrewAI agent for analyzing sentiment of news articles.
-    Uses the LLM's inherent capabilities for sentiment analysis.
+    Scores headlines with the local lexicon tool first and uses the LLM's own
+    judgement only for the ambiguous ones.
     """
     def __init__(self, role: str = "Sentiment Analyst", goal: str = "Analyze sentiment of news articles.", llm=None):
         self.agent = Agent(
@@ -19,14 +45,15 @@ class SentimentAgent:
                 You can identify subtle indicators of market sentiment in text that might not use obvious sentiment words.
                 
                 When analyzing sentiment:
-                1. Consider the overall tone (positive, negative, or neutral)
-                2. Identify key phrases that signal sentiment
+                1. Score all headlines and summaries with the Score Sentiment Tool first and trust its scores
+                2. Only re-assess the items the tool lists as ambiguous, considering the overall tone
                 3. Recognize financial context and industry-specific language
                 4. Assess the implied sentiment beyond just the words used
                 5. Quantify sentiment on a scale from -1.0 (very negative) to 1.0 (very positive)
                 
                 Always provide reasoning for your sentiment assessments and highlight specific phrases that influenced your analysis.
             """,
+            tools=[score_sentiment_tool],
             llm=llm,
             verbose=True,
-        ) 
\ No newline at end of file
+        )
@@ -0,0 +1,560 @@
+import argparse
+import contextlib
+import io
+import json
+import logging
+import math
+import os
+import re
+import sys
+import tempfile
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Protocol
+
+import numpy as np
+import pandas as pd
+
+from src.controller import configure_environment
+from src.utils.indicators import TRADING_DAYS_PER_YEAR
+
+logger = logging.getLogger(__name__)
+
+# Bars between the as-of close and the close the recommendation is judged at
+DEFAULT_HORIZON_BARS = 5
+# A Hold is right when the price moves less than this (in percent) over the horizon
+DEFAULT_HOLD_BAND_PCT = 2.0
+# Bars of history required before the first as-of date
+DEFAULT_WARMUP_BARS = 30
+# As-of dates per task sent to a worker process
+DEFAULT_CHUNK_DAYS = 20
+# Recorded completions are kept for as long as the backtest needs them
+RECORDED_MAX_ENTRIES = 10**9
+
+POSITIONS = {"Buy": 1.0, "Sell": -1.0, "Hold": 0.0}
+
+
+class Recommender(Protocol):
+    """Strategy whose past decisions are replayed by the backtest.
+
+    Recommenders are pickled into the worker processes, so they must not hold
+    unpicklable state (build it lazily instead).
+    """
+
+    def recommend(self, ticker: str, as_of: date, history: pd.DataFrame) -> str | None:
+        """Return 'Buy', 'Sell' or 'Hold' given the bars up to ``as_of``, or None to skip the day."""
+        ...
+
+
+@dataclass(frozen=True)
+class MomentumRecommender:
+    """Naive baseline: Buy after a rise and Sell after a fall of ``threshold_pct`` over ``lookback`` bars."""
+    lookback: int = 20
+    threshold_pct: float = 5.0
+
+    def recommend(self, ticker: str, as_of: date, history: pd.DataFrame) -> str | None:
+        close = history["Close"].to_numpy(dtype=float)
+        if len(close) <= self.lookback:
+            return None
+        change = (close[-1] / close[-1 - self.lookback] - 1.0) * 100.0
+        if change >= self.threshold_pct:
+            return "Buy"
+        return "Sell" if change <= -self.threshold_pct else "Hold"
+
+
+class RecordedRecommender:
+    """Replays recommendations recorded by earlier runs.
+
+    Reads JSON lines written by ``--events-file`` (the recommendation of each
+    ``final_recommendation``/``analysis_finished`` event is used for the local date
+    of its timestamp) or plain ``{"ticker", "date", "action"}`` rows. The last
+    recommendation of a ticker on a date wins.
+    """
+
+    def __init__(self, path: str | Path):
+        self.actions: dict[tuple[str, str], str] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(row, dict):
+                    continue
+                if "type" in row:
+                    recommendation = row.get("recommendation")
+                    if row["type"] not in ("final_recommendation", "analysis_finished") or not recommendation:
+                        continue
+                    day = datetime.fromtimestamp(row["timestamp"]).date().isoformat()
+                    action = recommendation.get("action")
+                else:
+                    day, action = row.get("date"), row.get("action")
+                if row.get("ticker") and day and action in POSITIONS:
+                    self.actions[(row["ticker"].upper(), day)] = action
+
+    def recommend(self, ticker: str, as_of: date, history: pd.DataFrame) -> str | None:
+        return self.actions.get((ticker.upper(), as_of.isoformat()))
+
+
+class RecordedSearchBackend:
+    """Search backend answering any query about a ticker with that ticker's recorded results.
+
+    Results carrying a ``date`` later than ``as_of`` are dropped; undated results are
+    always returned, so recorded news may leak information from after the as-of date.
+    """
+
+    def __init__(self, results: dict[str, list[dict]], as_of: date | None = None):
+        self.results = {ticker.upper(): items for ticker, items in results.items()}
+        self.as_of = as_of
+
+    def search(self, query: str, count: int = 10) -> list[dict]:
+        for word in re.findall(r"[A-Z0-9.^=-]+", query.upper()):
+            if word in self.results:
+                items = self.results[word]
+                if self.as_of is not None:
+                    items = [item for item in items if str(item.get("date", "")) <= self.as_of.isoformat()]
+                return list(items)[:count]
+        return []
+
+
+class PipelineRecommender:
+    """Runs the full analysis (validation, crew and recommendation parsing) as of each date.
+
+    Everything is offline: prices are cut at the as-of date, news comes from
+    recorded search results per ticker, validation uses a listing of the ticker
+    itself, and every LLM completion is answered from the ``llm_cache`` database.
+    A prompt that was never recorded fails that day, which is then skipped; with
+    ``record`` such prompts reach ``llm`` instead and are stored for later runs.
+    """
+
+    def __init__(
+        self,
+        llm_cache: str | Path,
+        news: dict[str, list[dict]] | None = None,
+        llm: Any = None,
+        record: bool = False,
+    ):
+        """
+        Args:
+            llm_cache: SQLite response cache holding (or receiving) the recorded completions
+            news: Recorded search results per ticker
+            llm: The LLM or model name the completions were recorded with (CrewAI default when None)
+            record: Whether prompts missing from the cache may call ``llm``
+        """
+        self.llm_cache = str(llm_cache)
+        self.news = news or {}
+        self.llm = llm
+        self.record = record
+        self._session = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Each worker process builds its own agents
+        return {**self.__dict__, "_session": None}
+
+    def session(self):
+        if self._session is None:
+            from src.session import AnalyzerSession
+            from src.utils.llm_cache import OfflineLLM, ResponseCache
+
+            cache = ResponseCache(self.llm_cache, ttl=math.inf, max_entries=RECORDED_MAX_ENTRIES)
+            llm = self.llm if self.record else OfflineLLM(self.llm)
+            self._session = AnalyzerSession(llm=llm, planning=False, llm_cache=cache)
+        return self._session
+
+    @contextlib.contextmanager
+    def _offline(self, ticker: str, as_of: date, history: pd.DataFrame) -> Iterator[None]:
+        from src.utils import price_loader, validation
+        from src.utils.cache_config import NO_CACHE_ENV
+        from src.utils.news_cache import NewsSearchCache, set_news_cache
+
+        with tempfile.TemporaryDirectory() as directory:
+            listing = Path(directory) / "symbols.csv"
+            listing.write_text(f"Symbol,Name\n{ticker},{ticker}\n", encoding="utf-8")
+            overrides = {validation.SYMBOL_DIRECTORY_ENV: str(listing), NO_CACHE_ENV: "1"}
+            previous = {name: os.environ.get(name) for name in overrides}
+            os.environ.update(overrides)
+            validation.reset_validation_defaults()
+            price_loader.set_price_loader(price_loader.PriceLoader(
+                source=price_loader.DataFramePriceSource({ticker: history}), clock=lambda: as_of,
+            ))
+            set_news_cache(NewsSearchCache(RecordedSearchBackend(self.news, as_of)))
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    yield
+            finally:
+                price_loader.set_price_loader(None)
+                set_news_cache(None)
+                for name, value in previous.items():
+                    if value is None:
+                        os.environ.pop(name, None)
+                    else:
+                        os.environ[name] = value
+                validation.reset_validation_defaults()
+
+    def recommend(self, ticker: str, as_of: date, history: pd.DataFrame) -> str | None:
+        from src.controller import analyze_ticker
+        from src.utils.events import AnalysisFinished
+
+        finished: list[AnalysisFinished] = []
+
+        def on_event(event) -> None:
+            if isinstance(event, AnalysisFinished):
+                finished.append(event)
+
+        with self._offline(ticker, as_of, history):
+            analyze_ticker(ticker, session=self.session(), on_event=on_event)
+        recommendation = finished[-1].recommendation if finished else None
+        return recommendation.action if recommendation else None
+
+
+def normalize_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Index a daily OHLCV frame by naive, sorted calendar dates."""
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    frame = frame.set_axis(index.normalize())
+    return frame[~frame.index.duplicated(keep="last")].sort_index()
+
+
+def load_recorded_prices(path: str | Path) -> dict[str, pd.DataFrame]:
+    """Load daily bars recorded as ``{ticker: {"dates": [...], "Open": [...], ...}}`` JSON."""
+    with open(path, encoding="utf-8") as f:
+        recorded = json.load(f)
+    frames = {}
+    for ticker, columns in recorded.items():
+        columns = dict(columns)
+        index = pd.DatetimeIndex(pd.to_datetime(columns.pop("dates")))
+        frames[ticker.upper()] = normalize_frame(pd.DataFrame(columns, index=index))
+    return frames
+
+
+def load_cached_prices(tickers: Iterable[str], directory: str | Path | None = None) -> dict[str, pd.DataFrame]:
+    """Load the daily bars stored in the local price cache; tickers without bars are left out."""
+    from src.utils.price_cache import PriceCache
+
+    cache = PriceCache(directory)
+    frames = {}
+    for ticker in dict.fromkeys(ticker.upper() for ticker in tickers):
+        frame, _ = cache.read(ticker)
+        if frame is not None and not frame.empty:
+            frames[ticker] = normalize_frame(frame)
+    return frames
+
+
+def as_of_dates(
+    frame: pd.DataFrame,
+    start: date | None = None,
+    end: date | None = None,
+    every: int = 1,
+    horizon: int = DEFAULT_HORIZON_BARS,
+    warmup: int = DEFAULT_WARMUP_BARS,
+) -> list[date]:
+    """Return the trading dates of a ticker that can be backtested.
+
+    Every ``every``-th bar within [start, end] with at least ``warmup`` earlier bars
+    and ``horizon`` later bars to judge the recommendation against.
+    """
+    dates = frame.index[warmup:len(frame) - horizon].date
+    if start is not None:
+        dates = dates[dates >= start]
+    if end is not None:
+        dates = dates[dates <= end]
+    return list(dates[::max(1, every)])
+
+
+_worker_state: dict[str, Any] = {}
+
+
+def _init_worker(recommender: Recommender, frames: dict[str, pd.DataFrame]) -> None:
+    _worker_state["recommender"] = recommender
+    _worker_state["frames"] = frames
+
+
+def _recommend_days(ticker: str, dates: list[date]) -> list[tuple[str, date, str | None]]:
+    """Run the recommender of this process for one ticker over some as-of dates."""
+    recommender: Recommender = _worker_state["recommender"]
+    frame: pd.DataFrame = _worker_state["frames"][ticker]
+    ends = frame.index.searchsorted(pd.DatetimeIndex(dates), side="right")
+    results = []
+    for as_of, end in zip(dates, ends, strict=True):
+        try:
+            action = recommender.recommend(ticker, as_of, frame.iloc[:end])
+        except Exception as e:
+            logger.warning(f"Recommendation for {ticker} as of {as_of} failed: {e}")
+            action = None
+        results.append((ticker, as_of, action if action in POSITIONS else None))
+    return results
+
+
+def forward_returns(frames: dict[str, pd.DataFrame], horizon: int = DEFAULT_HORIZON_BARS) -> pd.Series:
+    """Return each ticker's close-to-close return over the next ``horizon`` bars, indexed by (ticker, date)."""
+    tickers, dates, returns = [], [], []
+    for ticker, frame in frames.items():
+        close = frame["Close"].to_numpy(dtype=float)
+        forward = np.full(len(close), np.nan)
+        if len(close) > horizon:
+            forward[:-horizon] = close[horizon:] / close[:-horizon] - 1.0
+        tickers.extend([ticker] * len(close))
+        dates.extend(frame.index.date)
+        returns.append(forward)
+    values = np.concatenate(returns) if returns else np.array([])
+    return pd.Series(values, index=pd.MultiIndex.from_arrays([tickers, dates], names=["ticker", "date"]))
+
+
+def _ratio(numerator: float, denominator: float) -> float | None:
+    return round(float(numerator) / float(denominator), 4) if denominator else None
+
+
+def _pct(values: np.ndarray) -> float | None:
+    return round(float(values.mean()) * 100.0, 4) if len(values) else None
+
+
+def evaluate(
+    recommendations: pd.DataFrame,
+    frames: dict[str, pd.DataFrame],
+    horizon: int = DEFAULT_HORIZON_BARS,
+    hold_band_pct: float = DEFAULT_HOLD_BAND_PCT,
+) -> tuple[pd.DataFrame, dict[str, Any]]:
+    """Score recommendations against what the price did next.
+
+    Buy and Sell are positions of +1 and -1 held for ``horizon`` bars from the as-of
+    close; Hold is flat. A call is a hit when a Buy was followed by a rise, a Sell
+    by a fall, or a Hold by a move smaller than ``hold_band_pct``. All statistics
+    are computed over whole arrays at once.
+
+    Args:
+        recommendations: Rows of ticker, date and action (None for skipped days)
+
+    Returns:
+        The recommendations with forward_return, position, pnl and hit columns, and the statistics
+    """
+    scored = recommendations.copy()
+    returns = forward_returns(frames, horizon)
+    keys = pd.MultiIndex.from_arrays([scored["ticker"], scored["date"]])
+    scored["forward_return"] = returns.reindex(keys).to_numpy()
+    scored["position"] = scored["action"].map(POSITIONS).astype(float)
+
+    position = scored["position"].to_numpy()
+    forward = scored["forward_return"].to_numpy(dtype=float)
+    valid = ~np.isnan(position) & ~np.isnan(forward)
+    pnl = np.where(valid, position * forward, np.nan)
+    hit = np.where(
+        position == 0.0, np.abs(forward) * 100.0 < hold_band_pct, np.sign(forward) == position
+    ) & valid
+    scored["pnl"] = pnl
+    scored["hit"] = np.where(valid, hit, np.nan)
+
+    actions = scored["action"].to_numpy()
+    by_action = {}
+    for action in POSITIONS:
+        mask = valid & (actions == action)
+        by_action[action] = {
+            "count": int(mask.sum()),
+            "mean_forward_return_pct": _pct(forward[mask]),
+            "hit_rate": _ratio(hit[mask].sum(), mask.sum()),
+        }
+
+    directional = valid & (position != 0.0)
+    calls = pnl[directional]
+    sharpe = None
+    if len(calls) > 1 and calls.std(ddof=1) > 0:
+        sharpe = round(float(calls.mean() / calls.std(ddof=1) * math.sqrt(TRADING_DAYS_PER_YEAR / horizon)), 4)
+
+    tickers = scored["ticker"].to_numpy()
+    per_ticker = {}
+    for ticker in dict.fromkeys(tickers):
+        mask = valid & (tickers == ticker)
+        per_ticker[ticker] = {
+            "ticker_days": int(mask.sum()),
+            "hit_rate": _ratio(hit[mask].sum(), mask.sum()),
+            "total_pnl_pct": round(float(np.nansum(pnl[mask])) * 100.0, 4),
+        }
+
+    stats = {
+        "horizon_bars": horizon,
+        "hold_band_pct": hold_band_pct,
+        "ticker_days": int(valid.sum()),
+        "skipped": int((~valid).sum()),
+        "hit_rate": _ratio(hit.sum(), valid.sum()),
+        "actions": by_action,
+        "directional": {
+            "count": int(directional.sum()),
+            "hit_rate": _ratio(hit[directional].sum(), directional.sum()),
+            "mean_pnl_pct": _pct(calls),
+            "total_pnl_pct": round(float(calls.sum()) * 100.0, 4),
+            "sharpe": sharpe,
+        },
+        "tickers": per_ticker,
+    }
+    return scored, stats
+
+
+@dataclass
+class BacktestReport:
+    """Scored recommendations of every backtested ticker-day and their statistics."""
+    recommendations: pd.DataFrame
+    stats: dict[str, Any]
+
+    def to_dict(self) -> dict[str, Any]:
+        rows = self.recommendations.assign(date=self.recommendations["date"].astype(str))
+        return {
+            "stats": self.stats,
+            "recommendations": json.loads(rows.to_json(orient="records")),
+        }
+
+
+def run_backtest(
+    frames: dict[str, pd.DataFrame],
+    recommender: Recommender,
+    start: date | None = None,
+    end: date | None = None,
+    every: int = 1,
+    horizon: int = DEFAULT_HORIZON_BARS,
+    hold_band_pct: float = DEFAULT_HOLD_BAND_PCT,
+    workers: int = 1,
+    chunk_days: int = DEFAULT_CHUNK_DAYS,
+) -> BacktestReport:
+    """Replay ``recommender`` over past dates of every ticker and score the results.
+
+    Ticker-days are split into chunks of ``chunk_days`` dates that run on a pool of
+    ``workers`` processes (in this process when ``workers`` is 1); each worker
+    receives the price frames and the recommender once.
+
+    Args:
+        frames: Daily OHLCV bars per ticker
+        recommender: Strategy being evaluated
+        start: First as-of date (default: as early as the warm-up allows)
+        end: Last as-of date (default: as late as the horizon allows)
+        every: Only use every n-th trading day as an as-of date
+        horizon: Bars after the as-of date at which each call is judged
+        hold_band_pct: Largest move, in percent, that still makes a Hold right
+        workers: Number of worker processes
+        chunk_days: As-of dates per worker task
+    """
+    frames = {ticker.upper(): normalize_frame(frame) for ticker, frame in frames.items()}
+    tasks = [
+        (ticker, dates[i:i + chunk_days])
+        for ticker, frame in frames.items()
+        for dates in [as_of_dates(frame, start, end, every, horizon)]
+        for i in range(0, len(dates), chunk_days)
+    ]
+    logger.info(f"Backtesting {sum(len(dates) for _, dates in tasks)} ticker-days with {workers} worker(s)")
+
+    rows: list[tuple[str, date, str | None]] = []
+    if workers <= 1:
+        _init_worker(recommender, frames)
+        try:
+            for ticker, dates in tasks:
+                rows.extend(_recommend_days(ticker, dates))
+        finally:
+            _worker_state.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(recommender, frames)) as pool:
+            for chunk in pool.map(_recommend_days, *zip(*tasks, strict=True)) if tasks else []:
+                rows.extend(chunk)
+
+    recommendations = pd.DataFrame(rows, columns=["ticker", "date", "action"])
+    scored, stats = evaluate(recommendations, frames, horizon, hold_band_pct)
+    return BacktestReport(scored, stats)
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r}, expected YYYY-MM-DD") from None
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay recommendations over stored price data and score them, offline.")
+    parser.add_argument(
+        "--strategy", choices=("pipeline", "recorded", "momentum"), default="pipeline",
+        help="pipeline: rerun the analysis from recorded news and LLM completions; recorded: replay an "
+             "events file; momentum: naive baseline (default: pipeline)",
+    )
+    parser.add_argument("--tickers", nargs="+", help="Tickers to backtest (default: every ticker in --prices)")
+    parser.add_argument(
+        "--prices",
+        help="Recorded daily bars as {ticker: {dates, Open, High, Low, Close, Volume}} JSON "
+             "(default: the local price cache)",
+    )
+    parser.add_argument("--start", type=_parse_date, help="First as-of date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=_parse_date, help="Last as-of date (YYYY-MM-DD)")
+    parser.add_argument("--every", type=int, default=1, help="Use every n-th trading day as an as-of date (default: 1)")
+    parser.add_argument(
+        "--horizon", type=int, default=DEFAULT_HORIZON_BARS,
+        help=f"Trading days after which each call is judged (default: {DEFAULT_HORIZON_BARS})",
+    )
+    parser.add_argument(
+        "--hold-band", type=float, default=DEFAULT_HOLD_BAND_PCT,
+        help=f"Largest move in percent that still makes a Hold right (default: {DEFAULT_HOLD_BAND_PCT})",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="Number of worker processes (default: one per CPU)",
+    )
+    parser.add_argument("--events", help="Events file of earlier runs, for --strategy recorded")
+    parser.add_argument("--news", help="Recorded search results as {ticker: [results]} JSON, for --strategy pipeline")
+    parser.add_argument(
+        "--llm-cache", help="LLM response database with the recorded completions, for --strategy pipeline",
+    )
+    parser.add_argument("--model", help="Model the completions were recorded with (default: CrewAI's default)")
+    parser.add_argument(
+        "--record", action="store_true",
+        help="Let prompts missing from --llm-cache call the LLM and store the answers (needs network and API keys)",
+    )
+    parser.add_argument("--output", help="Write the statistics and every scored recommendation to this JSON file")
+    args = parser.parse_args(argv)
+    if args.every < 1 or args.horizon < 1 or args.workers < 1:
+        parser.error("--every, --horizon and --workers must be at least 1")
+    if args.strategy == "recorded" and not args.events:
+        parser.error("--strategy recorded needs --events")
+    if args.strategy == "pipeline" and not args.llm_cache:
+        parser.error("--strategy pipeline needs --llm-cache")
+    if not args.prices and not args.tickers:
+        parser.error("--tickers is required when prices come from the local price cache")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv or [])
+    configure_environment()
+
+    if args.prices:
+        frames = load_recorded_prices(args.prices)
+        if args.tickers:
+            frames = {ticker.upper(): frames[ticker.upper()] for ticker in args.tickers if ticker.upper() in frames}
+    else:
+        frames = load_cached_prices(args.tickers)
+    if not frames:
+        print("No price data found for the requested tickers.")
+        return 1
+
+    if args.strategy == "momentum":
+        recommender: Recommender = MomentumRecommender()
+    elif args.strategy == "recorded":
+        recommender = RecordedRecommender(args.events)
+    else:
+        news = {}
+        if args.news:
+            with open(args.news, encoding="utf-8") as f:
+                news = json.load(f)
+        recommender = PipelineRecommender(args.llm_cache, news=news, llm=args.model, record=args.record)
+
+    report = run_backtest(
+        frames, recommender, start=args.start, end=args.end, every=args.every,
+        horizon=args.horizon, hold_band_pct=args.hold_band, workers=args.workers,
+    )
+    print(json.dumps(report.stats, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=2)
+        print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,101 +1,612 @@
+import argparse
+import contextlib
+import contextvars
+import json
 import logging
+import queue
+import sys
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING
 
-from crewai import Crew, Task
-from dotenv import load_dotenv
+from src.utils import events
+from src.utils.batch_prompts import DEFAULT_TOKEN_BUDGET, BatchPrompter, TickerBrief
+from src.utils.events import (
+    AnalysisEvent,
+    AnalysisFinished,
+    EventCallback,
+    FinalRecommendation,
+    NewsItems,
+    PriceSummary,
+    Screened,
+    SentimentScore,
+    StageFinished,
+    StageStarted,
+)
+from src.utils.http_session import sharing_tickers
+from src.utils.metrics import BatchMetrics, RunMetrics, recording
+from src.utils.recommendation import Recommendation, parse_recommendation
+from src.utils.results_store import combine_callbacks, recording_results
+from src.utils.screening import ScreenRules, fast_hold, screen_ticker
+from src.utils.validation import check_ticker_format, validate_ticker_symbol
 
-from src.agents.news_agent import NewsAgent
-from src.agents.price_agent import PriceAgent
-from src.agents.recommendation_agent import RecommendationAgent
-from src.agents.sentiment_agent import SentimentAgent
-from src.utils.validation import validate_ticker_symbol
+# CrewAI, the agents, yfinance and pandas take seconds to import, so they are only
+# imported once an analysis actually runs; '--help' and input checks stay fast
+if TYPE_CHECKING:
+    from src.session import AnalyzerSession, SessionPool
 
-# Load environment variables
-load_dotenv()
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def analyze_ticker(ticker: str) -> tuple[bool, str | None]:
+# Default number of crews allowed to run at the same time in batch mode
+DEFAULT_MAX_WORKERS = 4
+
+def configure_environment() -> None:
+    """Load environment variables from .env and set up logging for a command-line run."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+def analyze_ticker(
+    ticker: str,
+    session: "AnalyzerSession | None" = None,
+    run_metrics: RunMetrics | None = None,
+    on_event: EventCallback | None = None,
+    screen: ScreenRules | None = None,
+) -> tuple[bool, str | None]:
     """Analyze a stock ticker using the CrewAI agents.
     
     Args:
         ticker: The stock ticker symbol to analyze
+        session: Session whose agents are reused; a new one is created when None
+        run_metrics: Collects stage timings, request counts and token usage of this run
+        on_event: Receives each event of the analysis as it happens, ending with AnalysisFinished
+        screen: When given, tickers for which none of these rules trigger get a rule-based
+            Hold instead of running the crew
         
     Returns:
         Tuple containing:
         - success (bool): Whether the analysis was successful
         - error_message (Optional[str]): Error message if analysis failed, None otherwise
     """
-    logger.info(f"Starting analysis for ticker: {ticker}")
+    run_metrics = run_metrics if run_metrics is not None else RunMetrics(ticker)
+    with contextlib.ExitStack() as stack:
+        if on_event is not None:
+            stack.enter_context(events.listening(ticker, on_event))
+        # Validation and the price stage share one yf.Ticker (and its info) per analysis
+        with recording(run_metrics), sharing_tickers(), run_metrics.stage("total"):
+            success, error, recommendation = _run_analysis(ticker, session, run_metrics, screen)
+        run_metrics.finish(success, error)
+        timings = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in run_metrics.stages.items())
+        logger.info(f"Stage timings for {ticker}: {timings}")
+        events.publish(AnalysisFinished, success=success, error=error, recommendation=recommendation)
+    return success, error
 
-    # Validate ticker before proceeding
-    validation_result = validate_ticker_symbol(ticker)
+def _validate(ticker: str, run_metrics: RunMetrics) -> str | None:
+    """Validate a ticker as the 'validation' stage; return the error message of an invalid one."""
+    events.publish(StageStarted, stage="validation")
+    with run_metrics.stage("validation"):
+        validation_result = validate_ticker_symbol(ticker)
+    events.publish(StageFinished, stage="validation", seconds=run_metrics.stages.get("validation"))
     if not validation_result.is_valid:
         logger.debug(f"Ticker validation failed: {ticker}")
         # Only print user-facing message
         print(f"Error: {validation_result.error_message}")
-        return False, validation_result.error_message
+        return validation_result.error_message
+    return None
+
+def _screen(ticker: str, run_metrics: RunMetrics, screen: ScreenRules) -> Recommendation | None:
+    """Screen a ticker as the 'screening' stage; return its rule-based Hold if it was screened out."""
+    events.publish(StageStarted, stage="screening")
+    with run_metrics.stage("screening"):
+        screened = screen_ticker(ticker, screen)
+    events.publish(StageFinished, stage="screening", seconds=run_metrics.stages.get("screening"))
+    events.publish(
+        Screened, needs_analysis=screened.needs_analysis,
+        triggered=screened.triggered, measurements=screened.measurements,
+    )
+    if screened.needs_analysis:
+        logger.info(f"{ticker} passed screening: {', '.join(screened.triggered)}")
+        return None
+    # Nothing moved: a rule-based Hold instead of four LLM agents
+    recommendation = fast_hold(screened)
+    raw = json.dumps(recommendation.to_dict())
+    logger.info(f"{ticker} screened out; no crew run")
+    print("Final Results:", raw)
+    events.publish(FinalRecommendation, recommendation=recommendation, raw=raw)
+    return recommendation
+
+def _run_analysis(
+    ticker: str, session: "AnalyzerSession | None", run_metrics: RunMetrics, screen: ScreenRules | None = None
+) -> tuple[bool, str | None, Recommendation | None]:
+    logger.info(f"Starting analysis for ticker: {ticker}")
+
+    # Validate ticker before proceeding
+    error = _validate(ticker, run_metrics)
+    if error is not None:
+        return False, error, None
 
     try:
-        # Initialize agents (default LLM: OpenAI GPT-3.5-turbo if OPENAI_API_KEY is set)
-        price_agent = PriceAgent().agent
-        news_agent = NewsAgent().agent
-        sentiment_agent = SentimentAgent().agent
-        recommendation_agent = RecommendationAgent().agent
-
-        # Define tasks
-        price_task = Task(
-            description=f"Fetch recent price data for {ticker}.",
-            expected_output="A summary of price data.",
-            agent=price_agent
-        )
-        news_task = Task(
-            description=f"Find and summarize the latest news about {ticker}.",
-            expected_output="A summary of the top 3 news articles with links.",
-            agent=news_agent,
-            context=[price_task]
-        )
-        sentiment_task = Task(
-            description="Analyze the sentiment of the summarized news articles.",
-            expected_output="A sentiment score and summary.",
-            agent=sentiment_agent,
-            context=[news_task]
-        )
-        recommendation_task = Task(
-            description=(
-                "Given the price summary and sentiment score, provide a final investment recommendation. "
-                "Output a JSON object with: 'ticker', 'action' (Buy/Sell/Hold), 'explanation', and 'references'. "
-                "Be concise and base your answer on the provided analysis."
-            ),
-            expected_output="A JSON object with the recommendation and explanation.",
-            agent=recommendation_agent,
-            context=[price_task, sentiment_task]
-        )
+        if screen is not None:
+            recommendation = _screen(ticker, run_metrics, screen)
+            if recommendation is not None:
+                return True, None, recommendation
 
-        # Create the Crew
-        crew = Crew(
-            agents=[price_agent, news_agent, sentiment_agent, recommendation_agent],
-            tasks=[price_task, news_task, sentiment_task, recommendation_task],
-            verbose=True,
-            planning=True
-        )
+        if session is None:
+            from src.session import AnalyzerSession
+            from src.utils.llm_cache import get_response_cache
+
+            session = AnalyzerSession(llm_cache=get_response_cache())
 
         # Run the Crew
-        results = crew.kickoff()
+        results = session.run(ticker)
         logger.info(f"Analysis completed successfully for {ticker}")
         print("Final Results:", results)
-        return True, None
+        raw = str(getattr(results, "raw", results))
+        recommendation = parse_recommendation(raw, ticker)
+        if recommendation is None:
+            logger.warning(f"No valid recommendation JSON in the final answer for {ticker}")
+        events.publish(FinalRecommendation, recommendation=recommendation, raw=raw)
+        return True, None, recommendation
         
     except Exception as e:
         error_msg = f"Error analyzing ticker {ticker}: {str(e)}"
         logger.error(error_msg, exc_info=True)
-        return False, error_msg
+        return False, error_msg, None
+
+def stream_analysis(
+    ticker: str, session: "AnalyzerSession | None" = None, run_metrics: RunMetrics | None = None
+) -> Iterator[AnalysisEvent]:
+    """Analyze a ticker and yield its events as they happen.
+
+    The analysis runs on a background thread. Stages, the price summary, news items
+    and sentiment scores arrive while the crew is still working; the last event is
+    always AnalysisFinished, carrying the parsed recommendation on success. Closing
+    the generator early stops the events, not the running crew.
+
+    Args:
+        ticker: The stock ticker symbol to analyze
+        session: Session whose agents are reused; a new one is created when None
+        run_metrics: Collects stage timings, request counts and token usage of this run
+
+    Yields:
+        AnalysisEvent instances in the order they were published
+    """
+    pending: queue.SimpleQueue[AnalysisEvent | None] = queue.SimpleQueue()
+
+    def run() -> None:
+        try:
+            analyze_ticker(ticker, session=session, run_metrics=run_metrics, on_event=pending.put)
+        except Exception as e:
+            logger.error(f"Error analyzing ticker {ticker}: {e}", exc_info=True)
+            pending.put(AnalysisFinished(ticker=ticker, success=False, error=f"Error analyzing ticker {ticker}: {e}"))
+        finally:
+            pending.put(None)
+
+    threading.Thread(
+        target=contextvars.copy_context().run, args=(run,), name=f"stream-{ticker}", daemon=True
+    ).start()
+    while (event := pending.get()) is not None:
+        yield event
+
+def _unique_tickers(tickers: Iterable[str]) -> list[str]:
+    return list(dict.fromkeys(ticker.strip().upper() for ticker in tickers if ticker and ticker.strip()))
+
+def _prefetch_prices(tickers: list[str], download: bool = True) -> None:
+    """Download the whole watchlist's prices at once; each price lookup is then served from it.
+
+    The watchlist's peer statistics (correlations, beta, relative strength) are
+    computed from the same batch in one pass and added to every price payload.
+    Without ``download`` the caller has just prefetched the batch itself.
+    """
+    from src.utils.cross_section import get_benchmark
+    from src.utils.price_loader import get_price_loader
+
+    loader = get_price_loader()
+    if download:
+        try:
+            loader.prefetch(tickers)
+        except Exception as e:
+            logger.warning(f"Price prefetch failed, falling back to per-ticker fetches: {e}")
+    try:
+        loader.compute_peers(tickers, get_benchmark())
+    except Exception as e:
+        logger.warning(f"Peer statistics unavailable for this batch: {e}")
+
+def analyze_tickers(
+    tickers: Iterable[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    planning: bool = True,
+    batch_metrics: BatchMetrics | None = None,
+    on_event: EventCallback | None = None,
+    screen: ScreenRules | None = None,
+    sessions: "SessionPool | None" = None,
+    prefetched: bool = False,
+) -> Iterator[tuple[str, bool, str | None]]:
+    """Analyze several stock tickers concurrently.
+
+    Each ticker runs its own crew on a thread pool bounded by ``max_workers``.
+    Results are yielded as soon as each analysis finishes, so callers can
+    report progress without waiting for the whole batch. Workers borrow
+    AnalyzerSessions from a pool for each ticker, and the planning step is
+    shared by all of them.
+
+    Args:
+        tickers: The stock ticker symbols to analyze (duplicates are ignored)
+        max_workers: Maximum number of analyses running at the same time
+        planning: Whether to run the (cached) planning step
+        batch_metrics: When given, receives the metrics of every analysis
+        on_event: Receives the events of every analysis; called from the worker threads
+        screen: When given, only tickers triggering one of these rules run the crew
+        sessions: Pool to borrow sessions from, kept by callers running many batches
+            (a new pool with the ``planning`` setting when None)
+        prefetched: Whether the caller has just prefetched the watchlist's prices
+
+    Yields:
+        Tuples of (ticker, success, error_message) in completion order
+    """
+    unique_tickers = _unique_tickers(tickers)
+    if not unique_tickers:
+        return
+
+    _prefetch_prices(unique_tickers, download=not prefetched)
+
+    workers = max(1, min(max_workers, len(unique_tickers)))
+    logger.info(f"Starting batch analysis of {len(unique_tickers)} tickers with {workers} workers")
+
+    if sessions is None:
+        from src.session import SessionPool
+        from src.utils.llm_cache import get_response_cache
+
+        sessions = SessionPool(planning=planning, llm_cache=get_response_cache())
+
+    def analyze_in_worker(ticker: str) -> tuple[bool, str | None]:
+        run_metrics = RunMetrics(ticker)
+        if batch_metrics is not None:
+            batch_metrics.add(run_metrics)
+        with sessions.session() as session:
+            return analyze_ticker(
+                ticker, session=session, run_metrics=run_metrics, on_event=on_event, screen=screen
+            )
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analyze")
+    try:
+        futures = {executor.submit(analyze_in_worker, ticker): ticker for ticker in unique_tickers}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                success, error = future.result()
+            except Exception as e:
+                error = f"Error analyzing ticker {ticker}: {str(e)}"
+                logger.error(error, exc_info=True)
+                success = False
+            yield ticker, success, error
+    finally:
+        # Drop queued work if the consumer stops iterating early
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def analyze_tickers_batched(
+    tickers: Iterable[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    batch_metrics: BatchMetrics | None = None,
+    on_event: EventCallback | None = None,
+    screen: ScreenRules | None = None,
+    llm=None,
+) -> Iterator[tuple[str, bool, str | None]]:
+    """Analyze several stock tickers with batched sentiment and recommendation prompts.
+
+    Instead of a crew per ticker, validation, screening, prices and news are gathered
+    per ticker on a thread pool without any LLM call. The ambiguous headlines of all
+    tickers are then scored in shared sentiment requests and every ticker's
+    recommendation is asked in shared requests, each holding as many tickers as
+    ``token_budget`` allows; tickers whose answer did not parse are asked again.
+
+    Args:
+        tickers: The stock ticker symbols to analyze (duplicates are ignored)
+        max_workers: Maximum number of tickers gathered at the same time
+        token_budget: Maximum estimated prompt tokens per batched LLM request
+        batch_metrics: When given, receives the metrics of every analysis
+        on_event: Receives the events of every analysis
+        screen: When given, only tickers triggering one of these rules get an LLM recommendation
+        llm: LLM used for the batched requests (CrewAI default when None)
+
+    Yields:
+        Tuples of (ticker, success, error_message); tickers ending before the LLM
+        stage come first, in completion order
+    """
+    unique_tickers = _unique_tickers(tickers)
+    if not unique_tickers:
+        return
+
+    from src.utils.llm_cache import get_response_cache, limited_llm
+    from src.utils.news_cache import get_news_cache
+    from src.utils.price_loader import get_price_loader
+
+    _prefetch_prices(unique_tickers)
+    prompter = BatchPrompter(limited_llm(llm, get_response_cache()), token_budget=token_budget)
+    runs = {ticker: RunMetrics(ticker) for ticker in unique_tickers}
+    if batch_metrics is not None:
+        for run_metrics in runs.values():
+            batch_metrics.add(run_metrics)
+
+    @contextlib.contextmanager
+    def scope(ticker: str) -> Iterator[RunMetrics]:
+        with contextlib.ExitStack() as stack:
+            if on_event is not None:
+                stack.enter_context(events.listening(ticker, on_event))
+            yield stack.enter_context(recording(runs[ticker]))
+
+    def finish(ticker: str, success: bool, error: str | None, recommendation: Recommendation | None = None):
+        with scope(ticker) as run_metrics:
+            run_metrics.finish(success, error)
+            timings = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in run_metrics.stages.items())
+            logger.info(f"Stage timings for {ticker}: {timings}")
+            events.publish(AnalysisFinished, success=success, error=error, recommendation=recommendation)
+        return ticker, success, error
+
+    def gather(ticker: str) -> TickerBrief | tuple[bool, str | None, Recommendation | None]:
+        # Everything but the LLM; returns the result of a ticker ending before the LLM stage
+        with scope(ticker) as run_metrics, sharing_tickers():
+            logger.info(f"Gathering data for ticker: {ticker}")
+            error = _validate(ticker, run_metrics)
+            if error is not None:
+                return False, error, None
+            if screen is not None:
+                recommendation = _screen(ticker, run_metrics, screen)
+                if recommendation is not None:
+                    return True, None, recommendation
+
+            brief = TickerBrief(ticker)
+            with run_metrics.stage("price"):
+                brief.price = get_price_loader().get_price_data(ticker)
+            if brief.price is not None:
+                events.publish(PriceSummary, summary=brief.price)
+            query = f"{ticker} stock news"
+            try:
+                with run_metrics.stage("news"):
+                    articles = get_news_cache().search(query)
+            except Exception as e:
+                logger.warning(f"News search for {ticker} failed: {e}")
+                articles = []
+            brief.articles = [
+                {"title": article.title, "url": article.url, "summary": article.summary} for article in articles
+            ]
+            if brief.articles:
+                events.publish(NewsItems, query=query, articles=brief.articles)
+            return brief
+
+    workers = max(1, min(max_workers, len(unique_tickers)))
+    logger.info(f"Gathering {len(unique_tickers)} tickers with {workers} workers for batched prompts")
+    briefs = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gather") as executor:
+        futures = {executor.submit(gather, ticker): ticker for ticker in unique_tickers}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                error = f"Error analyzing ticker {ticker}: {str(e)}"
+                logger.error(error, exc_info=True)
+                result = (False, error, None)
+            if isinstance(result, tuple):
+                yield finish(ticker, *result)
+            else:
+                briefs.append(result)
+    if not briefs:
+        return
+
+    # Stages shared by the batch are added to every ticker's timings
+    start = time.perf_counter()
+    prompter.score_sentiment(briefs)
+    sentiment_seconds = time.perf_counter() - start
+    for brief in briefs:
+        runs[brief.ticker].add_stage("batch.sentiment", sentiment_seconds)
+        with scope(brief.ticker):
+            events.publish(
+                SentimentScore, score=round(brief.sentiment or 0.0, 3),
+                texts=len(brief.articles), ambiguous=brief.ambiguous,
+            )
+
+    start = time.perf_counter()
+    recommendations = prompter.recommend(briefs)
+    recommendation_seconds = time.perf_counter() - start
+    logger.info(f"Batched prompts for {len(briefs)} tickers took {prompter.requests} LLM requests")
+    for brief in briefs:
+        ticker = brief.ticker
+        runs[ticker].add_stage("batch.recommendation", recommendation_seconds)
+        recommendation = recommendations.get(ticker)
+        if recommendation is None:
+            yield finish(ticker, False, f"No valid batched recommendation for ticker {ticker}")
+            continue
+        raw = json.dumps(recommendation.to_dict())
+        print(f"Final Results for {ticker}:", raw)
+        with scope(ticker):
+            events.publish(FinalRecommendation, recommendation=recommendation, raw=raw)
+        yield finish(ticker, True, None, recommendation)
+
+def read_tickers(source: str) -> list[str]:
+    """Read ticker symbols from a file, or from stdin when source is '-'.
+
+    Symbols may be separated by whitespace or commas; text after '#' is ignored.
+
+    Args:
+        source: Path to a watchlist file, or '-' for stdin
+
+    Returns:
+        List of upper-cased ticker symbols in file order
+    """
+    if source == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+    tickers = []
+    for line in lines:
+        line = line.split("#", 1)[0]
+        tickers.extend(token.upper() for token in line.replace(",", " ").split())
+    return tickers
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Analyze stock tickers and provide investment recommendations.")
+    parser.add_argument(
+        "-f", "--file",
+        help="Analyze every ticker listed in FILE ('-' reads from stdin) instead of prompting interactively",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=DEFAULT_MAX_WORKERS,
+        help=f"Maximum number of tickers analyzed concurrently in batch mode (default: {DEFAULT_MAX_WORKERS})",
+    )
+    parser.add_argument(
+        "--no-planning", dest="planning", action="store_false",
+        help="Skip the crew planning step (saves one LLM call per run)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="Write per-run stage timings, request counts, token usage and batch histograms to this JSON file",
+    )
+    parser.add_argument(
+        "--events-file",
+        help="Append every analysis event, including the parsed recommendations, to this file as JSON lines",
+    )
+    parser.add_argument(
+        "--results-db",
+        help="Record every finished analysis (price digest, news, sentiment, recommendation) in this SQLite results store",
+    )
+    parser.add_argument(
+        "--screen", action="store_true",
+        help="Give tickers without notable price, volatility, volume or news activity a rule-based Hold instead of running the crew",
+    )
+    parser.add_argument(
+        "--screen-rules", metavar="FILE",
+        help="JSON file overriding the screening thresholds (implies --screen)",
+    )
+    parser.add_argument(
+        "--batch-prompts", action="store_true",
+        help="In batch mode, ask for the sentiment and recommendations of many tickers per LLM request instead of running a crew per ticker",
+    )
+    parser.add_argument(
+        "--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET,
+        help=f"Maximum estimated prompt tokens per batched LLM request (default: {DEFAULT_TOKEN_BUDGET})",
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.token_budget < 1:
+        parser.error("--token-budget must be at least 1")
+    try:
+        args.screen = (
+            ScreenRules.from_file(args.screen_rules) if args.screen_rules
+            else ScreenRules() if args.screen else None
+        )
+    except (OSError, ValueError, TypeError) as e:
+        parser.error(f"Invalid --screen-rules file: {e}")
+    return args
+
+def write_metrics(batch_metrics: BatchMetrics, path: str) -> None:
+    """Write the runs and aggregate histograms collected so far as a JSON report."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(batch_metrics.to_json())
+
+@contextlib.contextmanager
+def event_log(path: str | None) -> Iterator[EventCallback | None]:
+    """Yield a callback appending each event to ``path`` as one JSON line (None without a path)."""
+    if not path:
+        yield None
+        return
+    lock = threading.Lock()
+    with open(path, "a", encoding="utf-8") as f:
+        def write(event: AnalysisEvent) -> None:
+            line = event.to_json()
+            with lock:
+                f.write(line + "\n")
+                f.flush()
+        yield write
+
+@contextlib.contextmanager
+def event_sinks(events_file: str | None, results_db: str | None) -> Iterator[EventCallback | None]:
+    """Yield one callback feeding the event log and the results store (None when neither is used)."""
+    with event_log(events_file) as log, recording_results(results_db) as record:
+        yield combine_callbacks(log, record)
+
+def run_batch(
+    tickers: list[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    planning: bool = True,
+    metrics_file: str | None = None,
+    events_file: str | None = None,
+    screen: ScreenRules | None = None,
+    batch_prompts: bool = False,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    results_db: str | None = None,
+) -> bool:
+    """Analyze a watchlist and print each result as it completes.
+
+    With ``batch_prompts`` the tickers share batched LLM requests of at most
+    ``token_budget`` estimated tokens instead of each running a crew. With
+    ``results_db`` every finished analysis is also recorded in that results store.
+
+    Returns:
+        True if every ticker was analyzed successfully, False otherwise
+    """
+    batch_metrics = BatchMetrics() if metrics_file else None
+    failed = 0
+    completed = 0
+    with event_sinks(events_file, results_db) as on_event:
+        if batch_prompts:
+            results = analyze_tickers_batched(
+                tickers, max_workers=max_workers, token_budget=token_budget, batch_metrics=batch_metrics,
+                on_event=on_event, screen=screen,
+            )
+        else:
+            results = analyze_tickers(
+                tickers, max_workers=max_workers, planning=planning, batch_metrics=batch_metrics,
+                on_event=on_event, screen=screen,
+            )
+        for ticker, success, error in results:
+            completed += 1
+            if success:
+                print(f"[{completed}] Analysis for {ticker} completed.")
+            else:
+                failed += 1
+                print(f"[{completed}] Analysis for {ticker} failed: {error}")
+
+    print("-" * 80)
+    print(f"Batch finished: {completed - failed} succeeded, {failed} failed.")
+    print("-" * 80)
+    if batch_metrics is not None:
+        write_metrics(batch_metrics, metrics_file)
+        print(f"Metrics written to {metrics_file}")
+    return failed == 0
+
+def main(argv: list[str] | None = None):
+    """Main function to run the stock ticker analysis with the ability to analyze multiple tickers.
+
+    Args:
+        argv: Command-line arguments; without arguments the interactive prompt is used
+    """
+    args = _parse_args(argv or [])
+    configure_environment()
+    if args.file:
+        tickers = read_tickers(args.file)
+        if not tickers:
+            print("No ticker symbols found.")
+            return
+        run_batch(
+            tickers, max_workers=args.workers, planning=args.planning,
+            metrics_file=args.metrics_file, events_file=args.events_file, screen=args.screen,
+            batch_prompts=args.batch_prompts, token_budget=args.token_budget, results_db=args.results_db,
+        )
+        return
 
-def main():
-    """Main function to run the stock ticker analysis with the ability to analyze multiple tickers."""
     print("Welcome to Ticker Analysis Assistant!")
     print("This tool analyzes stock tickers and provides investment recommendations.")
+    # Created on first use and reused for every following ticker
+    session = None
+    batch_metrics = BatchMetrics() if args.metrics_file else None
     
     while True:
         ticker = input("\nEnter a stock ticker symbol (e.g., AAPL) or 'quit' to exit: ").strip().upper()
@@ -107,8 +618,32 @@ def main():
         if not ticker:
             print("Please enter a valid ticker symbol.")
             continue
+
+        # Reject malformed input before paying for the agents
+        malformed = check_ticker_format(ticker)
+        if malformed is not None:
+            print(f"Error: {malformed.error_message}")
+            continue
         
-        success, error = analyze_ticker(ticker)
+        if session is None:
+            try:
+                from src.session import AnalyzerSession
+                from src.utils.llm_cache import get_response_cache
+
+                session = AnalyzerSession(planning=args.planning, llm_cache=get_response_cache())
+            except Exception as e:
+                logger.error(f"Failed to initialize agents: {e}", exc_info=True)
+                print(f"Failed to initialize agents: {e}")
+                break
+
+        run_metrics = RunMetrics(ticker)
+        with event_sinks(args.events_file, args.results_db) as on_event:
+            success, error = analyze_ticker(
+                ticker, session=session, run_metrics=run_metrics, on_event=on_event, screen=args.screen
+            )
+        if batch_metrics is not None:
+            batch_metrics.add(run_metrics)
+            write_metrics(batch_metrics, args.metrics_file)
         
         if success:
             print("\n" + "-" * 80)
@@ -120,4 +655,4 @@ def main():
             print("-" * 80)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main(sys.argv[1:]) 
\ No newline at end of file
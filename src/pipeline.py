@@ -0,0 +1,138 @@
+from dataclasses import dataclass
+
+from src.utils.digest import DigestLimits
+
+
+@dataclass(frozen=True)
+class TaskSpec:
+    """Declarative description of one crew task and the task outputs it really needs.
+
+    Attributes:
+        name: Unique task name, referenced by other tasks' inputs
+        agent: Key of the agent that runs the task ('price', 'news', 'sentiment', 'recommendation')
+        description: Task description; '{ticker}' is replaced with the analyzed symbol
+        expected_output: Description of the expected task output
+        inputs: Names of the tasks whose output is passed to this task as context
+        digest: Caps of the digest passed to dependent tasks instead of the raw output
+            (None passes the raw output unchanged)
+    """
+    name: str
+    agent: str
+    description: str
+    expected_output: str
+    inputs: tuple[str, ...] = ()
+    digest: DigestLimits | None = None
+
+
+# Price and news have no inputs and run in parallel. Sentiment is the first synchronous task, so
+# the crew joins both before it starts: it waits for price too, and the critical path is
+# max(price, news) + sentiment + recommendation.
+# Downstream tasks get size-capped digests of their inputs, so their prompts stay flat
+# however long the price window or the news list is.
+ANALYSIS_GRAPH: tuple[TaskSpec, ...] = (
+    TaskSpec(
+        name="price",
+        agent="price",
+        description="Fetch recent price data for {ticker}.",
+        expected_output="A summary of price data.",
+        digest=DigestLimits(max_chars=600),
+    ),
+    TaskSpec(
+        name="news",
+        agent="news",
+        description="Find and summarize the latest news about {ticker}.",
+        expected_output="A summary of the top 3 news articles with links.",
+        digest=DigestLimits(max_chars=400, max_items=5),
+    ),
+    TaskSpec(
+        name="sentiment",
+        agent="sentiment",
+        description="Analyze the sentiment of the summarized news articles.",
+        expected_output="A sentiment score and summary.",
+        inputs=("news",),
+        digest=DigestLimits(max_chars=600),
+    ),
+    TaskSpec(
+        name="recommendation",
+        agent="recommendation",
+        description=(
+            "Given the price summary and sentiment score, provide a final investment recommendation. "
+            "Output a JSON object with: 'ticker', 'action' (Buy/Sell/Hold), 'explanation', and 'references'. "
+            "Be concise and base your answer on the provided analysis."
+        ),
+        expected_output="A JSON object with the recommendation and explanation.",
+        inputs=("price", "sentiment"),
+    ),
+)
+
+
+def task_levels(graph: tuple[TaskSpec, ...]) -> list[list[TaskSpec]]:
+    """Group tasks into dependency levels; tasks in the same level are independent.
+
+    A task's level is the length of the longest input chain leading to it. Within a
+    level, tasks keep their declaration order.
+
+    Raises:
+        ValueError: If a task has an unknown input, a duplicate name, or the graph has a cycle
+    """
+    specs = {}
+    for spec in graph:
+        if spec.name in specs:
+            raise ValueError(f"Duplicate task name '{spec.name}'")
+        specs[spec.name] = spec
+    for spec in graph:
+        for name in spec.inputs:
+            if name not in specs:
+                raise ValueError(f"Task '{spec.name}' depends on unknown task '{name}'")
+
+    depth: dict[str, int] = {}
+    visiting: set[str] = set()
+
+    def resolve(name: str) -> int:
+        if name in depth:
+            return depth[name]
+        if name in visiting:
+            raise ValueError(f"Task graph has a cycle through '{name}'")
+        visiting.add(name)
+        inputs = specs[name].inputs
+        depth[name] = 1 + max((resolve(dep) for dep in inputs), default=-1)
+        visiting.discard(name)
+        return depth[name]
+
+    levels: list[list[TaskSpec]] = []
+    for spec in graph:
+        level = resolve(spec.name)
+        while len(levels) <= level:
+            levels.append([])
+        levels[level].append(spec)
+    return levels
+
+
+def schedule(graph: tuple[TaskSpec, ...]) -> list[tuple[TaskSpec, bool]]:
+    """Order the graph for a sequential CrewAI crew and choose which tasks run asynchronously.
+
+    CrewAI starts asynchronous tasks immediately and joins all pending ones before the
+    next synchronous task. Tasks sharing a level therefore run asynchronously, and the
+    first task of the following level acts as the join. When two parallel levels follow
+    each other, the first task of the second one stays synchronous so it can join the
+    previous level, and the crew always ends with a synchronous task.
+
+    The join covers every pending task, not only the inputs of the joining task: in
+    the analysis graph, sentiment waits for price as well as news, so a branch cannot
+    overlap with a later level of another branch.
+
+    Returns:
+        List of (task spec, async_execution) in execution order
+    """
+    ordered: list[tuple[TaskSpec, bool]] = []
+    previous_parallel = False
+    for level in task_levels(graph):
+        parallel = len(level) > 1
+        for index, spec in enumerate(level):
+            is_async = parallel and not (previous_parallel and index == 0)
+            ordered.append((spec, is_async))
+        previous_parallel = parallel
+
+    if ordered and ordered[-1][1]:
+        ordered[-1] = (ordered[-1][0], False)
+    return ordered
@@ -0,0 +1,79 @@
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from src.utils.results_store import ResultsStore, StoredResult, parse_time
+
+
+def _parse_time(value: str) -> float:
+    try:
+        return parse_time(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date or date-time: {value!r}") from None
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Query and export the analyses recorded with --results-db.")
+    parser.add_argument("--db", required=True, help="Results store written with --results-db")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    latest = commands.add_parser("latest", help="Latest recommendation per ticker")
+    latest.add_argument("tickers", nargs="*", help="Only these tickers (default: every recorded ticker)")
+
+    query = commands.add_parser("query", help="Recorded analyses matching the filters, newest first")
+    query.add_argument("--ticker", help="Only this ticker")
+    query.add_argument("--action", choices=("Buy", "Sell", "Hold"), type=str.capitalize, help="Only this action")
+    query.add_argument("--since", type=_parse_time, help="Only analyses finished at or after this ISO date or date-time")
+    query.add_argument("--until", type=_parse_time, help="Only analyses finished before this ISO date or date-time")
+    query.add_argument("--days", type=float, help="Only analyses of the last DAYS days (overrides --since)")
+    query.add_argument("--limit", type=int, help="Maximum number of analyses listed")
+
+    export = commands.add_parser("export", help="Write every recorded analysis to a file")
+    export.add_argument("--format", choices=("jsonl", "csv"), default="jsonl", help="Output format (default: jsonl)")
+    export.add_argument("--output", default="-", help="Output file ('-' writes to stdout, the default)")
+    return parser.parse_args(argv)
+
+
+def format_result(result: StoredResult) -> str:
+    """Format one recorded analysis as a single line."""
+    finished = datetime.fromtimestamp(result.finished_at).isoformat(sep=" ", timespec="seconds")
+    if not result.success:
+        return f"{finished}  {result.ticker:<6} failed: {result.error}"
+    close = (result.price or {}).get("close")
+    sentiment = "" if result.sentiment is None else f"  sentiment {result.sentiment:+.2f}"
+    price = "" if close is None else f"  close {close}"
+    return f"{finished}  {result.ticker:<6} {result.action or '-':<4}{price}{sentiment}  {result.explanation}"
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv or [])
+    store = ResultsStore(args.db)
+    try:
+        if args.command == "latest":
+            results = list(store.latest(args.tickers or None).values())
+        elif args.command == "query":
+            since = (datetime.now() - timedelta(days=args.days)).timestamp() if args.days is not None else args.since
+            results = store.query(
+                ticker=args.ticker, action=args.action, since=since, until=args.until, limit=args.limit
+            )
+        else:
+            if args.output == "-":
+                count = store.export(sys.stdout, args.format)
+            else:
+                with open(args.output, "w", encoding="utf-8", newline="") as f:
+                    count = store.export(f, args.format)
+            print(f"Exported {count} analyses.", file=sys.stderr)
+            return 0
+    finally:
+        store.close()
+
+    if not results:
+        print("No recorded analyses found.")
+        return 1
+    for result in results:
+        print(format_result(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
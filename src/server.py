@@ -0,0 +1,285 @@
+import argparse
+import asyncio
+import logging
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from aiohttp import web
+
+from src.controller import DEFAULT_MAX_WORKERS, analyze_ticker, configure_environment
+from src.session import AnalyzerSession, TaskPlanner
+from src.utils.events import AnalysisEvent, AnalysisFinished
+from src.utils.llm_cache import get_response_cache
+from src.utils.metrics import RunMetrics
+from src.utils.price_loader import get_price_loader
+from src.utils.validation import validate_ticker_symbol
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+# Distinct tickers allowed to wait for a free crew before new ones are rejected
+DEFAULT_MAX_PENDING = 32
+DEFAULT_PRICE_DAYS = 30
+
+
+class Overloaded(Exception):
+    """Raised when an analysis cannot be admitted because too many are queued."""
+
+
+class InFlightAnalysis:
+    """One running analysis shared by every request for its ticker.
+
+    Events are kept so that requests joining late still see the whole stream.
+    Only touched from the event loop thread.
+    """
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.history: list[AnalysisEvent] = []
+        self.result: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+        self._subscribers: set[asyncio.Queue] = set()
+
+    def publish(self, event: AnalysisEvent) -> None:
+        self.history.append(event)
+        for subscriber in self._subscribers:
+            subscriber.put_nowait(event)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Return a queue receiving every event so far and to come, then None."""
+        subscriber: asyncio.Queue = asyncio.Queue()
+        for event in self.history:
+            subscriber.put_nowait(event)
+        if self.result.done():
+            subscriber.put_nowait(None)
+        else:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def finish(self, result: dict[str, Any] | None, error: BaseException | None = None) -> None:
+        if error is not None:
+            self.result.set_exception(error)
+            # Retrieved by awaiting requests; do not log it when every one of them went away
+            self.result.exception()
+        else:
+            self.result.set_result(result)
+        for subscriber in self._subscribers:
+            subscriber.put_nowait(None)
+        self._subscribers.clear()
+
+
+class AnalysisService:
+    """Runs analyses for the HTTP service with warm agents, coalescing and admission control.
+
+    Crews run on a pool of ``max_crews`` threads, each keeping one AnalyzerSession (all
+    sharing the planner and LLM response cache), so requests skip agent construction.
+    Requests for a ticker that is already being analyzed join that analysis instead of
+    starting another one. Once ``max_crews + max_pending`` distinct tickers are in
+    flight, further tickers are rejected with Overloaded.
+    """
+
+    def __init__(
+        self,
+        max_crews: int = DEFAULT_MAX_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        planning: bool = True,
+    ):
+        self.max_crews = max_crews
+        self.max_pending = max_pending
+        self.planning = planning
+        self.stats: Counter[str] = Counter()
+        self._llm_cache = get_response_cache()
+        self._planner = TaskPlanner(llm_cache=self._llm_cache)
+        self._worker_state = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=max_crews, thread_name_prefix="crew")
+        self._in_flight: dict[str, InFlightAnalysis] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def start(self, ticker: str) -> InFlightAnalysis:
+        """Return the in-flight analysis of ``ticker``, starting one if needed.
+
+        Raises:
+            Overloaded: If a new analysis would exceed the admission limit
+        """
+        self.stats["requests"] += 1
+        analysis = self._in_flight.get(ticker)
+        if analysis is not None:
+            self.stats["coalesced"] += 1
+            return analysis
+        if len(self._in_flight) >= self.max_crews + self.max_pending:
+            self.stats["rejected"] += 1
+            raise Overloaded(f"{len(self._in_flight)} analyses in flight")
+
+        loop = asyncio.get_running_loop()
+        analysis = InFlightAnalysis(ticker)
+        self._in_flight[ticker] = analysis
+        self.stats["started"] += 1
+        future = loop.run_in_executor(self._executor, self._run, ticker, analysis, loop)
+
+        def done(future: asyncio.Future) -> None:
+            del self._in_flight[ticker]
+            if future.cancelled():
+                analysis.finish(None, asyncio.CancelledError())
+            else:
+                analysis.finish(future.result() if future.exception() is None else None, future.exception())
+
+        future.add_done_callback(done)
+        return analysis
+
+    async def analyze(self, ticker: str) -> dict[str, Any]:
+        """Analyze a ticker (or join its running analysis) and return the result."""
+        # Shielded so that one client disconnecting does not cancel the shared result
+        return await asyncio.shield(self.start(ticker).result)
+
+    def _session(self) -> AnalyzerSession:
+        if not hasattr(self._worker_state, "session"):
+            self._worker_state.session = AnalyzerSession(
+                planning=self.planning, planner=self._planner, llm_cache=self._llm_cache
+            )
+        return self._worker_state.session
+
+    def _run(self, ticker: str, analysis: InFlightAnalysis, loop: asyncio.AbstractEventLoop) -> dict[str, Any]:
+        """Run one analysis on a crew thread, forwarding its events to the event loop."""
+        finished: list[AnalysisFinished] = []
+
+        def on_event(event: AnalysisEvent) -> None:
+            if isinstance(event, AnalysisFinished):
+                finished.append(event)
+            loop.call_soon_threadsafe(analysis.publish, event)
+
+        run_metrics = RunMetrics(ticker)
+        success, error = analyze_ticker(ticker, session=self._session(), run_metrics=run_metrics, on_event=on_event)
+        recommendation = finished[-1].recommendation if finished else None
+        return {
+            "ticker": ticker,
+            "success": success,
+            "error": error,
+            "recommendation": recommendation.to_dict() if recommendation else None,
+            "metrics": run_metrics.to_dict(),
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+SERVICE = web.AppKey("service", AnalysisService)
+
+
+def _ticker(request: web.Request) -> str:
+    ticker = request.match_info["ticker"].strip().upper()
+    if not ticker:
+        raise web.HTTPBadRequest(text="Missing ticker symbol")
+    return ticker
+
+
+def _overloaded(error: Overloaded) -> web.Response:
+    return web.json_response({"error": f"Too many analyses queued ({error})"}, status=503, headers={"Retry-After": "5"})
+
+
+async def health(request: web.Request) -> web.Response:
+    service: AnalysisService = request.app[SERVICE]
+    return web.json_response({
+        "status": "ok",
+        "in_flight": service.in_flight,
+        "max_crews": service.max_crews,
+        "max_pending": service.max_pending,
+        "requests": dict(service.stats),
+    })
+
+
+async def validate(request: web.Request) -> web.Response:
+    result = await asyncio.to_thread(validate_ticker_symbol, _ticker(request))
+    return web.json_response(result._asdict())
+
+
+async def price(request: web.Request) -> web.Response:
+    ticker = _ticker(request)
+    try:
+        days = int(request.query.get("days", DEFAULT_PRICE_DAYS))
+    except ValueError:
+        raise web.HTTPBadRequest(text="'days' must be an integer") from None
+    if days < 1:
+        raise web.HTTPBadRequest(text="'days' must be at least 1")
+    data = await asyncio.to_thread(get_price_loader().get_price_data, ticker, days)
+    if data is None:
+        return web.json_response({"error": f"No price data found for {ticker}"}, status=404)
+    return web.json_response(data)
+
+
+async def analyze(request: web.Request) -> web.StreamResponse:
+    """Analyze a ticker; with ``?stream=1`` the events are streamed as JSON lines."""
+    service: AnalysisService = request.app[SERVICE]
+    ticker = _ticker(request)
+    if request.query.get("stream", "").lower() not in ("1", "true", "yes"):
+        try:
+            return web.json_response(await service.analyze(ticker))
+        except Overloaded as e:
+            return _overloaded(e)
+
+    try:
+        events = service.start(ticker).subscribe()
+    except Overloaded as e:
+        return _overloaded(e)
+    response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+    await response.prepare(request)
+    while (event := await events.get()) is not None:
+        await response.write(event.to_json().encode() + b"\n")
+    await response.write_eof()
+    return response
+
+
+def create_app(service: AnalysisService | None = None) -> web.Application:
+    """Create the HTTP application serving analyses from ``service``."""
+    app = web.Application()
+    app[SERVICE] = service or AnalysisService()
+    app.router.add_get("/health", health)
+    app.router.add_get("/validate/{ticker}", validate)
+    app.router.add_get("/price/{ticker}", price)
+    app.router.add_post("/analyze/{ticker}", analyze)
+
+    async def close_service(app: web.Application) -> None:
+        app[SERVICE].close()
+
+    app.on_cleanup.append(close_service)
+    return app
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve ticker analyses over HTTP with warm agents and caches.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Interface to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument(
+        "--max-crews", type=int, default=DEFAULT_MAX_WORKERS,
+        help=f"Maximum number of analyses running at the same time (default: {DEFAULT_MAX_WORKERS})",
+    )
+    parser.add_argument(
+        "--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+        help=f"Tickers allowed to wait for a free crew before requests are rejected (default: {DEFAULT_MAX_PENDING})",
+    )
+    parser.add_argument(
+        "--no-planning", dest="planning", action="store_false",
+        help="Skip the crew planning step (saves one LLM call per run)",
+    )
+    args = parser.parse_args(argv)
+    if args.max_crews < 1:
+        parser.error("--max-crews must be at least 1")
+    if args.max_pending < 0:
+        parser.error("--max-pending must not be negative")
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv or [])
+    configure_environment()
+    service = AnalysisService(max_crews=args.max_crews, max_pending=args.max_pending, planning=args.planning)
+    web.run_app(create_app(service), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
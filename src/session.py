@@ -0,0 +1,277 @@
+import contextlib
+import contextvars
+import logging
+import threading
+from collections.abc import Iterator
+from concurrent.futures import Future
+
+from crewai import Crew, Task
+from crewai.tasks.task_output import TaskOutput
+from crewai.types.usage_metrics import UsageMetrics
+from crewai.utilities.planning_handler import CrewPlanner
+from pydantic import Field, PrivateAttr
+
+from src.agents.news_agent import NewsAgent
+from src.agents.price_agent import PriceAgent
+from src.agents.recommendation_agent import RecommendationAgent
+from src.agents.sentiment_agent import SentimentAgent
+from src.pipeline import ANALYSIS_GRAPH, TaskSpec, schedule
+from src.utils import events, metrics
+from src.utils.digest import DigestLimits, build_digest
+from src.utils.events import StageFinished, StageStarted
+from src.utils.llm_cache import ResponseCache, limited_llm
+
+logger = logging.getLogger(__name__)
+
+# Stand-in ticker used when planning the task templates
+TICKER_PLACEHOLDER = "{ticker}"
+# Separator CrewAI puts between the outputs of a task's context tasks
+CONTEXT_DIVIDER = "\n\n----------\n\n"
+# CrewPlanner's own default planning model, used when the planner gets no LLM
+PLANNING_MODEL = "gpt-4o-mini"
+
+
+class ContextTask(Task):
+    """Task that runs asynchronous execution in a copy of the caller's context.
+
+    CrewAI starts async tasks on plain threads, which begin with an empty context;
+    copying it lets tools record into the metrics of the run that started them and
+    publish to its event listener. Each execution is also published as a
+    ``task.<name>`` stage.
+
+    With ``digest_limits`` set, the task also builds a size-capped digest of its
+    answer and of the events its tools published; tasks depending on it receive
+    that digest as context instead of the raw answer.
+    """
+    digest_limits: DigestLimits | None = Field(
+        default=None, description="Caps of the digest passed to dependent tasks instead of the raw output"
+    )
+    _digest: str | None = PrivateAttr(default=None)
+
+    def execute_sync(self, agent=None, context=None, tools=None) -> TaskOutput:
+        return self._execute_with_events(agent, context, tools)
+
+    def execute_async(self, agent=None, context=None, tools=None) -> Future[TaskOutput]:
+        future: Future[TaskOutput] = Future()
+        threading.Thread(
+            daemon=True,
+            target=contextvars.copy_context().run,
+            args=(self._execute_task_async, agent, context, tools, future),
+        ).start()
+        return future
+
+    def _execute_task_async(self, agent, context, tools, future: Future[TaskOutput]) -> None:
+        try:
+            future.set_result(self._execute_with_events(agent, context, tools))
+        except Exception as e:
+            # Fail the crew's join instead of leaving it waiting forever
+            future.set_exception(e)
+
+    def _execute_with_events(self, agent, context, tools) -> TaskOutput:
+        stage = f"task.{self.name}"
+        events.publish(StageStarted, stage=stage)
+        with events.capturing() as captured:
+            output = self._execute_core(agent, self._compact_context(context), tools)
+        if self.digest_limits is not None:
+            self._digest = build_digest(output.raw, captured, self.digest_limits)
+        events.publish(StageFinished, stage=stage, seconds=self.execution_duration, output=output.raw)
+        return output
+
+    def _compact_context(self, context: str | None) -> str | None:
+        """Rebuild the context from the digests of the context tasks that made one."""
+        if not isinstance(self.context, list):
+            return context
+        parts = [
+            getattr(task, "_digest", None) or task.output.raw
+            for task in self.context if task.output is not None
+        ]
+        return CONTEXT_DIVIDER.join(parts) if parts else context
+
+
+def build_tasks(
+    graph: tuple[TaskSpec, ...], agents: dict, ticker: str, plans: dict[str, str] | None = None
+) -> list[Task]:
+    """Create the crew tasks for a ticker from a task graph.
+
+    Each task only receives the outputs of its declared inputs as context, and
+    independent tasks are marked for asynchronous execution so they run in parallel.
+
+    Args:
+        graph: Task specifications with their declared inputs
+        agents: Mapping of agent keys used in the graph to CrewAI agents
+        ticker: The stock ticker symbol being analyzed
+        plans: Optional step plans per task name, appended to the task descriptions
+
+    Returns:
+        Tasks in the order they must be given to the Crew
+    """
+    plans = plans or {}
+    tasks: dict[str, Task] = {}
+    for spec, is_async in schedule(graph):
+        description = spec.description + plans.get(spec.name, "")
+        tasks[spec.name] = ContextTask(
+            name=spec.name,
+            description=description.replace(TICKER_PLACEHOLDER, ticker),
+            expected_output=spec.expected_output,
+            agent=agents[spec.agent],
+            context=[tasks[name] for name in spec.inputs],
+            async_execution=is_async,
+            digest_limits=spec.digest,
+        )
+    return list(tasks.values())
+
+
+def _token_usage(agent) -> dict[str, int]:
+    """Return an agent's cumulative LLM token usage (empty if it does not track any)."""
+    process = getattr(agent, "_token_process", None)
+    summary = process.get_summary() if process is not None else None
+    return summary.model_dump() if isinstance(summary, UsageMetrics) else {}
+
+
+class TaskPlanner:
+    """Runs the CrewAI planning step once for a task graph and reuses the plans for every ticker.
+
+    Plans are generated for the ticker-agnostic task templates, so a single planning
+    LLM call serves every analysis (and every session sharing the planner). Like the
+    agents' LLMs, the planning LLM goes through the shared rate limit and, with
+    ``llm_cache``, plans for an unchanged task graph are answered from the cache.
+    """
+
+    def __init__(self, llm=None, llm_cache: ResponseCache | None = None):
+        self.llm = llm
+        self.llm_cache = llm_cache
+        self._plans: dict[str, str] | None = None
+        self._lock = threading.Lock()
+
+    def plans(self, graph: tuple[TaskSpec, ...], agents: dict) -> dict[str, str]:
+        """Return step plans per task name, planning the graph on first use."""
+        with self._lock:
+            if self._plans is None:
+                logger.info("Planning the crew execution for the task templates")
+                tasks = build_tasks(graph, agents, TICKER_PLACEHOLDER)
+                planning_llm = limited_llm(self.llm or PLANNING_MODEL, self.llm_cache)
+                result = CrewPlanner(tasks=tasks, planning_agent_llm=planning_llm)._handle_crew_planning()
+                ordered_specs = [spec for spec, _ in schedule(graph)]
+                self._plans = {
+                    spec.name: step_plan.plan
+                    for spec, step_plan in zip(ordered_specs, result.list_of_plans_per_task, strict=False)
+                }
+            return self._plans
+
+
+class AnalyzerSession:
+    """Long-lived set of agents and tools reused across ticker analyses.
+
+    Agents (and their tools, such as the Brave search client) are built once; each
+    analysis only creates lightweight tasks from the graph templates and a Crew.
+    CrewAI agents are not safe to share between crews running at the same time, so
+    concurrent workers should each use their own session (they may share a planner).
+    """
+
+    def __init__(
+        self,
+        llm=None,
+        planning: bool = True,
+        planner: TaskPlanner | None = None,
+        graph: tuple[TaskSpec, ...] = ANALYSIS_GRAPH,
+        llm_cache: ResponseCache | None = None,
+    ):
+        """
+        Args:
+            llm: LLM passed to every agent (CrewAI default when None)
+            planning: Whether to add the cached planning step to task descriptions
+            planner: Planner to share between sessions; a new one is created when None
+            graph: Task graph describing the analysis
+            llm_cache: When given, every agent's LLM answers repeated prompts from this cache
+        """
+        self.graph = graph
+        self.planning = planning
+        self.planner = planner or TaskPlanner(llm, llm_cache)
+        self.llm_cache = llm_cache
+
+        def agent_llm():
+            # One wrapper per agent: CrewAI mutates the LLM's stop words per agent
+            return limited_llm(llm, llm_cache)
+
+        # Initialize agents (default LLM: OpenAI GPT-3.5-turbo if OPENAI_API_KEY is set)
+        self.agents = {
+            "price": PriceAgent(llm=agent_llm()).agent,
+            "news": NewsAgent(llm=agent_llm()).agent,
+            "sentiment": SentimentAgent(llm=agent_llm()).agent,
+            "recommendation": RecommendationAgent(llm=agent_llm()).agent,
+        }
+
+    def create_crew(self, ticker: str) -> Crew:
+        """Create the Crew analyzing a ticker with this session's agents."""
+        plans = None
+        if self.planning:
+            with metrics.stage("planning"):
+                plans = self.planner.plans(self.graph, self.agents)
+        tasks = build_tasks(self.graph, self.agents, ticker, plans)
+        return Crew(
+            agents=list(self.agents.values()),
+            tasks=tasks,
+            verbose=True,
+            planning=False  # Plans are computed once by the session's planner
+        )
+
+    def run(self, ticker: str):
+        """Run the full crew for a ticker and return the CrewAI output.
+
+        When called inside a recorded run, the planning step, each task's duration and
+        each agent's token usage are added to that run's metrics.
+        """
+        run_metrics = metrics.current_run()
+        crew = self.create_crew(ticker)
+        tokens_before = {key: _token_usage(agent) for key, agent in self.agents.items()}
+        try:
+            return crew.kickoff()
+        finally:
+            if run_metrics is not None:
+                self._record_usage(run_metrics, crew, tokens_before)
+
+    def _record_usage(self, run_metrics: metrics.RunMetrics, crew: Crew, tokens_before: dict) -> None:
+        names = [spec.name for spec, _ in schedule(self.graph)]
+        for name, task in zip(names, crew.tasks, strict=False):
+            duration = task.execution_duration
+            if isinstance(duration, float):
+                run_metrics.add_stage(f"task.{name}", duration)
+        # Agents are reused across runs, so their token counters are cumulative
+        for key, agent in self.agents.items():
+            after = _token_usage(agent)
+            if after:
+                before = tokens_before.get(key, {})
+                run_metrics.add_tokens(key, {field: after[field] - before.get(field, 0) for field in after})
+
+
+class SessionPool:
+    """Idle AnalyzerSessions lent to worker threads one analysis at a time.
+
+    Keeping a pool across batches (e.g. the cycles of a watcher) reuses the agents and
+    the planner's plans instead of rebuilding them every batch. A session is only
+    ever used by one worker at a time, so at most as many sessions exist as analyses
+    ran concurrently.
+    """
+
+    def __init__(self, planning: bool = True, llm=None, llm_cache: ResponseCache | None = None):
+        self.planning = planning
+        self.llm = llm
+        self.llm_cache = llm_cache
+        self.planner = TaskPlanner(llm, llm_cache)
+        self._idle: list[AnalyzerSession] = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def session(self) -> Iterator[AnalyzerSession]:
+        """Lend an idle session (creating one if none is idle) for the duration of the block."""
+        with self._lock:
+            session = self._idle.pop() if self._idle else None
+        if session is None:
+            session = AnalyzerSession(
+                llm=self.llm, planning=self.planning, planner=self.planner, llm_cache=self.llm_cache
+            )
+        try:
+            yield session
+        finally:
+            with self._lock:
+                self._idle.append(session)
@@ -0,0 +1,259 @@
+import json
+import logging
+import math
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from src.utils.digest import key_numbers
+from src.utils.recommendation import (
+    Recommendation,
+    json_objects,
+    recommendation_from_dict,
+)
+
+logger = logging.getLogger(__name__)
+
+# Prompt tokens allowed per batched request, instructions included
+DEFAULT_TOKEN_BUDGET = 6000
+# Requests per batch: the first one plus re-asks for the tickers whose answer did not parse
+DEFAULT_MAX_ATTEMPTS = 3
+# Rough size of a token in English text; good enough to stay under a budget
+CHARS_PER_TOKEN = 4
+# Headlines per ticker included in the recommendation prompt
+MAX_HEADLINES = 5
+
+T = TypeVar("T")
+
+SENTIMENT_INSTRUCTIONS = (
+    "You are an expert in sentiment analysis for financial news. Each line below is a news "
+    "headline or snippet prefixed with its id in square brackets. Score the sentiment of every "
+    "line for the stock it concerns from -1.0 (very negative) to 1.0 (very positive), considering "
+    "financial context and implicit tone. Answer with only a JSON array of objects with the keys "
+    "'id' and 'score', one object per line."
+)
+
+RECOMMENDATION_INSTRUCTIONS = (
+    "You are a senior analyst making Buy/Sell/Hold recommendations. Each section below holds one "
+    "ticker's price summary, news sentiment score (-1.0 to 1.0) and headlines. Judge every ticker "
+    "on its own section only. Answer with only a JSON array holding one object per ticker with "
+    "the keys 'ticker', 'action' (Buy/Sell/Hold), 'explanation' (one or two sentences) and "
+    "'references' (list of the headline links you relied on)."
+)
+
+
+@dataclass
+class TickerBrief:
+    """Everything the batched sentiment and recommendation prompts know about one ticker.
+
+    Attributes:
+        ticker: The stock ticker symbol
+        price: The price tool payload (None when no price data was found)
+        articles: News articles as dicts with 'title', 'url' and 'summary'
+        sentiment: Overall news sentiment from -1.0 to 1.0, once scored (None without news)
+        ambiguous: Number of headlines the local scorer left to the LLM
+    """
+    ticker: str
+    price: dict[str, Any] | None = None
+    articles: list[dict[str, Any]] = field(default_factory=list)
+    sentiment: float | None = None
+    ambiguous: int = 0
+
+    def headlines(self) -> list[str]:
+        """Return the text scored for each article: its title and summary."""
+        return [
+            " - ".join(part for part in (article.get("title"), article.get("summary")) if part)
+            for article in self.articles
+        ]
+
+    def section(self) -> str:
+        """Render the compact recommendation prompt section of this ticker."""
+        lines = [f"## {self.ticker}"]
+        if self.price:
+            numbers = json.dumps(key_numbers(self.price))
+            lines.append(f"Price ({self.price.get('start')} to {self.price.get('end')}): {numbers}")
+        else:
+            lines.append("Price: no data")
+        lines.append(f"Sentiment: {'no news' if self.sentiment is None else round(self.sentiment, 3)}")
+        for article in self.articles[:MAX_HEADLINES]:
+            lines.append(f"- {article.get('title', '')} ({article.get('url', '')})")
+        return "\n".join(lines)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of prompt tokens of ``text``."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def pack(sections: dict[str, str], budget: int, overhead: int = 0) -> list[list[str]]:
+    """Group section keys into batches whose estimated tokens fit the budget.
+
+    Sections keep their order. A section that alone exceeds the budget is sent in
+    a batch of its own rather than dropped.
+
+    Args:
+        sections: Prompt section per key
+        budget: Maximum estimated tokens per batch
+        overhead: Tokens every batch spends on the instructions
+
+    Returns:
+        Lists of keys, one per request
+    """
+    batches: list[list[str]] = []
+    current: list[str] = []
+    used = overhead
+    for key, text in sections.items():
+        # Sections are joined with blank lines
+        tokens = estimate_tokens(text) + 1
+        if current and used + tokens > budget:
+            batches.append(current)
+            current, used = [], overhead
+        current.append(key)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _json_items(text: str) -> Iterator[dict[str, Any]]:
+    """Yield the objects of the first JSON array in ``text``, or its loose objects otherwise."""
+    decoder = json.JSONDecoder()
+    start = text.find("[")
+    while start != -1:
+        try:
+            value, _ = decoder.raw_decode(text, start)
+        except json.JSONDecodeError:
+            start = text.find("[", start + 1)
+            continue
+        if isinstance(value, list) and any(isinstance(item, dict) for item in value):
+            yield from (item for item in value if isinstance(item, dict))
+            return
+        start = text.find("[", start + 1)
+    yield from json_objects(text)
+
+
+def parse_recommendations(text: str, tickers: list[str]) -> dict[str, Recommendation]:
+    """Extract the valid recommendations for ``tickers`` from a batched answer.
+
+    Objects naming another ticker or holding an invalid action are ignored, so the
+    affected tickers can be asked again.
+    """
+    wanted = {ticker.upper() for ticker in tickers}
+    parsed: dict[str, Recommendation] = {}
+    for item in _json_items(text or ""):
+        try:
+            recommendation = recommendation_from_dict(item)
+        except ValueError:
+            continue
+        if recommendation.ticker in wanted:
+            parsed.setdefault(recommendation.ticker, recommendation)
+    return parsed
+
+
+def parse_scores(text: str, ids: list[str]) -> dict[str, float]:
+    """Extract the sentiment scores of ``ids`` from a batched answer, clipped to [-1, 1]."""
+    wanted = set(ids)
+    parsed: dict[str, float] = {}
+    for item in _json_items(text or ""):
+        item_id = str(item.get("id", ""))
+        try:
+            score = float(item.get("score"))
+        except (TypeError, ValueError):
+            continue
+        if item_id in wanted and math.isfinite(score):
+            parsed.setdefault(item_id, min(1.0, max(-1.0, score)))
+    return parsed
+
+
+class BatchPrompter:
+    """Asks one LLM about many tickers at once instead of running one agent per ticker.
+
+    Each request carries the fixed instructions once and as many ticker sections as
+    the token budget allows. The answer must be a JSON array with one object per
+    section; only the sections whose object is missing or invalid are asked again,
+    up to ``max_attempts`` times in total.
+    """
+
+    def __init__(self, llm, token_budget: int = DEFAULT_TOKEN_BUDGET, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        """
+        Args:
+            llm: Object with a CrewAI-style ``call(messages)`` returning the answer text
+            token_budget: Maximum estimated prompt tokens per request
+            max_attempts: Requests per section before giving up on it
+        """
+        self.llm = llm
+        self.token_budget = token_budget
+        self.max_attempts = max_attempts
+        self.requests = 0
+
+    def ask(
+        self,
+        instructions: str,
+        sections: dict[str, str],
+        parse: Callable[[str, list[str]], dict[str, T]],
+    ) -> dict[str, T]:
+        """Send ``sections`` in budget-sized batches and return the parsed answer per key.
+
+        Keys that never got a valid answer are missing from the result; a failed
+        request only loses the answers of its own batch.
+        """
+        answers: dict[str, T] = {}
+        pending = dict(sections)
+        overhead = estimate_tokens(instructions)
+        for attempt in range(self.max_attempts):
+            if not pending:
+                break
+            if attempt:
+                logger.info(f"Asking again for {len(pending)} batched answers that did not parse: {', '.join(pending)}")
+            for keys in pack(pending, self.token_budget, overhead):
+                prompt = "\n\n".join(pending[key] for key in keys)
+                messages = [{"role": "system", "content": instructions}, {"role": "user", "content": prompt}]
+                self.requests += 1
+                try:
+                    answer = self.llm.call(messages)
+                except Exception as e:
+                    logger.warning(f"Batched request for {len(keys)} items failed: {e}")
+                    continue
+                answers.update(parse(str(answer or ""), keys))
+            pending = {key: text for key, text in pending.items() if key not in answers}
+        if pending:
+            logger.warning(f"No valid batched answer for: {', '.join(pending)}")
+        return answers
+
+    def score_sentiment(self, briefs: list[TickerBrief]) -> None:
+        """Set each brief's sentiment from its headlines.
+
+        Headlines are scored with the local lexicon first; only the ambiguous ones
+        of all tickers together are sent to the LLM.
+        """
+        from src.utils.sentiment_scorer import SentimentScorer
+
+        scorer = SentimentScorer()
+        batches = {}
+        sections: dict[str, str] = {}
+        for brief in briefs:
+            texts = brief.headlines()
+            if not texts:
+                brief.sentiment = None
+                continue
+            batch = batches[brief.ticker] = scorer.score(texts)
+            brief.ambiguous = int(batch.ambiguous.sum())
+            for index in batch.ambiguous.nonzero()[0]:
+                item_id = f"{brief.ticker}-{index}"
+                sections[item_id] = f"[{item_id}] ({brief.ticker}) {batch.texts[index]}"
+
+        if sections:
+            logger.info(f"Sending {len(sections)} ambiguous headlines of {len(batches)} tickers to the LLM for sentiment")
+            for item_id, score in self.ask(SENTIMENT_INSTRUCTIONS, sections, parse_scores).items():
+                ticker, index = item_id.rsplit("-", 1)
+                batches[ticker].scores[int(index)] = score
+                batches[ticker].ambiguous[int(index)] = False
+
+        for brief in briefs:
+            if brief.ticker in batches:
+                brief.sentiment = batches[brief.ticker].overall
+
+    def recommend(self, briefs: list[TickerBrief]) -> dict[str, Recommendation]:
+        """Return a recommendation per ticker; tickers that never got a valid one are missing."""
+        sections = {brief.ticker: brief.section() for brief in briefs}
+        return self.ask(RECOMMENDATION_INSTRUCTIONS, sections, parse_recommendations)
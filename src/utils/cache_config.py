@@ -0,0 +1,21 @@
+import os
+from pathlib import Path
+
+# Root directory for all on-disk caches (defaults to ~/.cache/ticker-analyzer)
+CACHE_DIR_ENV = "TICKER_ANALYZER_CACHE_DIR"
+# Set to 1/true/yes to disable the on-disk caches entirely
+NO_CACHE_ENV = "TICKER_ANALYZER_NO_CACHE"
+
+
+def get_cache_dir(*parts: str) -> Path:
+    """Return (and create) a cache directory, optionally a named subdirectory of the root."""
+    value = os.environ.get(CACHE_DIR_ENV)
+    root = Path(value).expanduser() if value else Path.home() / ".cache" / "ticker-analyzer"
+    path = Path(root, *parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def caching_enabled() -> bool:
+    """Return False when the on-disk caches have been disabled through the environment."""
+    return os.environ.get(NO_CACHE_ENV, "").strip().lower() not in ("1", "true", "yes")
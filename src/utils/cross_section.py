@@ -0,0 +1,145 @@
+import math
+import os
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from src.utils.price_cache import naive_index
+
+# Index the watchlist is compared against; an empty value disables beta and excess return
+BENCHMARK_ENV = "TICKER_ANALYZER_BENCHMARK"
+DEFAULT_BENCHMARK = "SPY"
+# Daily returns used for correlations, betas and relative strength
+DEFAULT_WINDOW_BARS = 60
+# Fewer overlapping returns than this leave a correlation or beta undefined
+MIN_OVERLAP_BARS = 10
+
+
+def get_benchmark() -> str | None:
+    """Return the benchmark symbol from the environment (None when disabled)."""
+    value = os.environ.get(BENCHMARK_ENV, DEFAULT_BENCHMARK).strip().upper()
+    return value or None
+
+
+def returns_matrix(frames: dict[str, pd.DataFrame], window: int = DEFAULT_WINDOW_BARS) -> tuple[list[str], np.ndarray]:
+    """Align every ticker's closes on the union of dates and return their daily log returns.
+
+    Args:
+        frames: OHLCV frame per ticker
+        window: Number of latest returns kept
+
+    Returns:
+        The tickers (columns, in input order) and a (bars x tickers) matrix of log
+        returns; NaN where a ticker did not trade on both days
+    """
+    tickers = [ticker for ticker, frame in frames.items() if frame is not None and not frame.empty]
+    if not tickers:
+        return [], np.empty((0, 0))
+    # Exchange-local and naive indexes (single vs batch downloads) are aligned on their dates
+    closes = pd.concat(
+        {ticker: naive_index(frames[ticker])["Close"].astype(float) for ticker in tickers}, axis=1, sort=True
+    ).to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.diff(np.log(closes), axis=0)
+    return tickers, returns[-window:]
+
+
+def _round(value: float, digits: int = 4) -> float | None:
+    return round(float(value), digits) if math.isfinite(value) else None
+
+
+def compute_cross_section(
+    frames: dict[str, pd.DataFrame],
+    benchmark: str | None = None,
+    window: int = DEFAULT_WINDOW_BARS,
+) -> dict[str, dict[str, Any]]:
+    """Compute peer statistics for a whole watchlist in one vectorized pass.
+
+    All returns are stacked into one aligned matrix. Correlations come from a single
+    product of the NaN-masked z-scores, betas from the covariances with the benchmark
+    column, and ranks and z-scores from the cross-section of window and last-day
+    returns.
+
+    Args:
+        frames: OHLCV frame per ticker; the benchmark's frame may be among them
+        benchmark: Symbol whose frame is the market reference (not ranked as a peer)
+        window: Number of latest daily returns used
+
+    Returns:
+        Per watchlist ticker: window return, rank among the watchlist (1 = strongest),
+        percentile, z-scores of the window and last-day returns, average and
+        strongest peer correlation, and beta and excess return against the benchmark
+    """
+    tickers, returns = returns_matrix(frames, window)
+    if not tickers:
+        return {}
+    bench = tickers.index(benchmark) if benchmark in tickers else None
+    peers = np.array([i for i in range(len(tickers)) if i != bench], dtype=int)
+    valid = ~np.isnan(returns)
+    filled = np.where(valid, returns, 0.0)
+    counts = valid.sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Correlations over each pair's overlapping days, from one matrix product
+        means = filled.sum(axis=0) / counts
+        centered = np.where(valid, returns - means, 0.0)
+        stds = np.sqrt((centered ** 2).sum(axis=0) / (counts - 1))
+        scaled = centered / stds
+        overlap = valid.T.astype(float) @ valid.astype(float)
+        correlation = np.clip((scaled.T @ scaled) / (overlap - 1), -1.0, 1.0)
+        correlation[overlap < MIN_OVERLAP_BARS] = np.nan
+
+        window_returns = np.expm1(filled.sum(axis=0))
+        window_returns[counts == 0] = np.nan
+        last = returns[-1] if len(returns) else np.full(len(tickers), np.nan)
+
+        def zscores(values: np.ndarray) -> np.ndarray:
+            sample = values[peers]
+            if np.sum(~np.isnan(sample)) < 2:
+                return np.full(len(values), np.nan)
+            return (values - np.nanmean(sample)) / np.nanstd(sample, ddof=1)
+
+        return_z, last_z = zscores(window_returns), zscores(last)
+        betas = np.full(len(tickers), np.nan)
+        if bench is not None:
+            covariance = (centered * centered[:, [bench]]).sum(axis=0) / (overlap[bench] - 1)
+            betas = covariance / stds[bench] ** 2
+            betas[overlap[bench] < MIN_OVERLAP_BARS] = np.nan
+
+    # Strongest window return first; tickers without returns are not ranked
+    ranked = [i for i in peers[np.argsort(-np.nan_to_num(window_returns[peers], nan=-np.inf))]
+              if not np.isnan(window_returns[i])]
+    ranks = {index: position + 1 for position, index in enumerate(ranked)}
+    peer_correlation = correlation[np.ix_(peers, peers)].copy()
+    np.fill_diagonal(peer_correlation, np.nan)
+
+    results = {}
+    for position, index in enumerate(peers):
+        row = peer_correlation[position]
+        known = ~np.isnan(row)
+        closest = int(np.nanargmax(row)) if known.any() else None
+        rank = ranks.get(index)
+        stats = {
+            "peer_count": len(peers) - 1,
+            "window_bars": int(counts[index]),
+            "return_pct": _round(window_returns[index] * 100.0, 2),
+            "relative_strength_rank": rank,
+            "relative_strength_percentile": (
+                _round(100.0 * (len(ranked) - rank) / (len(ranked) - 1), 1) if rank and len(ranked) > 1 else None
+            ),
+            "return_zscore": _round(return_z[index], 2),
+            "last_move_zscore": _round(last_z[index], 2),
+            "avg_peer_correlation": _round(np.nanmean(row), 3) if known.any() else None,
+            "most_correlated": (
+                {"ticker": tickers[peers[closest]], "correlation": _round(row[closest], 3)}
+                if closest is not None else None
+            ),
+        }
+        if bench is not None:
+            stats["benchmark"] = tickers[bench]
+            stats["beta"] = _round(betas[index], 3)
+            stats["benchmark_correlation"] = _round(correlation[index, bench], 3)
+            stats["excess_return_pct"] = _round((window_returns[index] - window_returns[bench]) * 100.0, 2)
+        results[tickers[index]] = stats
+    return results
@@ -0,0 +1,89 @@
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from src.utils.events import AnalysisEvent, NewsItems, PriceSummary, SentimentScore
+
+# Price summary fields worth their tokens in a downstream prompt
+PRICE_FIELDS = (
+    "close", "change_pct", "return_1d_pct", "return_5d_pct", "moving_average",
+    "daily_return_volatility_pct", "recent_high", "recent_low",
+)
+INDICATOR_FIELDS = ("rsi_14", "atr_pct", "drawdown_pct", "annualized_volatility_pct")
+PEER_FIELDS = (
+    "relative_strength_rank", "peer_count", "return_zscore", "last_move_zscore",
+    "avg_peer_correlation", "beta", "excess_return_pct",
+)
+# Characters kept of each news item's summary
+ITEM_SUMMARY_CHARS = 200
+
+
+@dataclass(frozen=True)
+class DigestLimits:
+    """Size caps of the digest a task hands to the tasks depending on it.
+
+    Attributes:
+        max_chars: Characters kept of the task's own answer
+        max_items: News items kept from the task's searches
+    """
+    max_chars: int = 600
+    max_items: int = 3
+
+
+def key_numbers(summary: dict[str, Any]) -> dict[str, Any]:
+    """Pick the headline statistics, indicators and peer statistics out of a price tool payload."""
+    numbers = {key: summary[key] for key in PRICE_FIELDS if summary.get(key) is not None}
+    indicators = summary.get("indicators") or {}
+    numbers.update({key: indicators[key] for key in INDICATOR_FIELDS if indicators.get(key) is not None})
+    peers = summary.get("peers") or {}
+    numbers.update({key: peers[key] for key in PEER_FIELDS if peers.get(key) is not None})
+    return numbers
+
+
+def truncate(text: str, max_chars: int) -> str:
+    """Cut ``text`` to at most ``max_chars`` characters, preferring a sentence or word boundary."""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 2]
+    boundary = max(cut.rfind(". "), cut.rfind("; "))
+    if boundary < max_chars // 2:
+        boundary = cut.rfind(" ")
+    return (cut[:boundary + 1] if boundary > 0 else cut).rstrip() + " …"
+
+
+def build_digest(answer: str, captured: Iterable[AnalysisEvent], limits: DigestLimits) -> str:
+    """Build the size-capped JSON digest of a finished task.
+
+    The digest holds the key numbers of the last price summary, the first
+    ``max_items`` distinct news items and the last local sentiment score published
+    by the task's tools, plus its answer cut to ``max_chars``. Its size therefore
+    does not grow with the price window or the number of articles found.
+
+    Args:
+        answer: The task's raw answer
+        captured: Events published while the task ran
+        limits: Caps applied to the answer and the news items
+    """
+    digest: dict[str, Any] = {}
+    items: dict[str, dict[str, str]] = {}
+    for event in captured:
+        if isinstance(event, PriceSummary):
+            digest["period"] = f"{event.summary.get('start')} to {event.summary.get('end')}"
+            digest["key_numbers"] = key_numbers(event.summary)
+        elif isinstance(event, SentimentScore):
+            digest["local_sentiment_score"] = event.score
+        elif isinstance(event, NewsItems):
+            for article in event.articles:
+                url = str(article.get("url") or "")
+                if len(items) < limits.max_items and url not in items:
+                    items[url] = {
+                        "title": str(article.get("title") or ""),
+                        "url": url,
+                        "summary": truncate(str(article.get("summary") or ""), ITEM_SUMMARY_CHARS),
+                    }
+    if items:
+        digest["news"] = list(items.values())
+    digest["answer"] = truncate(answer or "", limits.max_chars)
+    return json.dumps(digest, ensure_ascii=False)
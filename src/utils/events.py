@@ -0,0 +1,152 @@
+import json
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, TypeVar
+
+from src.utils.recommendation import Recommendation
+
+
+@dataclass(frozen=True)
+class AnalysisEvent:
+    """Base class of the events published while a ticker is analyzed."""
+    ticker: str
+    timestamp: float = field(default_factory=time.time, kw_only=True)
+
+    @property
+    def type(self) -> str:
+        return _EVENT_TYPES[type(self)]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"type": self.type, **asdict(self)}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), default=str)
+
+
+@dataclass(frozen=True)
+class StageStarted(AnalysisEvent):
+    """A stage ('validation' or 'task.<name>') began."""
+    stage: str
+
+
+@dataclass(frozen=True)
+class StageFinished(AnalysisEvent):
+    """A stage ended; ``output`` is the task's raw answer, when it has one."""
+    stage: str
+    seconds: float | None = None
+    output: str | None = None
+
+
+@dataclass(frozen=True)
+class Screened(AnalysisEvent):
+    """Outcome of the numeric screen; ``triggered`` names the rules that sent the ticker to the crew."""
+    needs_analysis: bool
+    triggered: list[str]
+    measurements: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class PriceSummary(AnalysisEvent):
+    """The price tool's payload: summary statistics, sampled closes and indicators."""
+    summary: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class NewsItems(AnalysisEvent):
+    """Distinct articles returned by one news search."""
+    query: str
+    articles: list[dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class SentimentScore(AnalysisEvent):
+    """Local lexicon score of a batch of headlines, from -1.0 to 1.0."""
+    score: float
+    texts: int
+    ambiguous: int
+
+
+@dataclass(frozen=True)
+class FinalRecommendation(AnalysisEvent):
+    """The recommendation task's answer; ``recommendation`` is None if it held no valid JSON."""
+    recommendation: Recommendation | None
+    raw: str
+
+
+@dataclass(frozen=True)
+class AnalysisFinished(AnalysisEvent):
+    """Last event of every analysis."""
+    success: bool
+    error: str | None = None
+    recommendation: Recommendation | None = None
+
+
+_EVENT_TYPES: dict[type, str] = {
+    StageStarted: "stage_started",
+    StageFinished: "stage_finished",
+    Screened: "screened",
+    PriceSummary: "price_summary",
+    NewsItems: "news_items",
+    SentimentScore: "sentiment_score",
+    FinalRecommendation: "final_recommendation",
+    AnalysisFinished: "analysis_finished",
+}
+
+EventCallback = Callable[[AnalysisEvent], None]
+E = TypeVar("E", bound=AnalysisEvent)
+
+
+@dataclass(frozen=True)
+class _Listener:
+    ticker: str
+    callback: EventCallback
+
+
+_listener: ContextVar[_Listener | None] = ContextVar("event_listener", default=None)
+_captured: ContextVar[list[AnalysisEvent] | None] = ContextVar("captured_events", default=None)
+
+
+@contextmanager
+def listening(ticker: str, callback: EventCallback) -> Iterator[None]:
+    """Send the events published inside the block, tagged with ``ticker``, to ``callback``."""
+    token = _listener.set(_Listener(ticker, callback))
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+@contextmanager
+def capturing() -> Iterator[list[AnalysisEvent]]:
+    """Collect the events published inside the block into the yielded list.
+
+    Events are collected whether or not anything listens; without a listener their
+    ticker is empty.
+    """
+    captured: list[AnalysisEvent] = []
+    token = _captured.set(captured)
+    try:
+        yield captured
+    finally:
+        _captured.reset(token)
+
+
+def publishing() -> bool:
+    """Return whether anything listens to or captures events in this context."""
+    return _listener.get() is not None or _captured.get() is not None
+
+
+def publish(event_type: type[E], **fields: Any) -> None:
+    """Create an event for the current ticker and hand it to the listener and capture (no-op without either)."""
+    listener = _listener.get()
+    captured = _captured.get()
+    if listener is None and captured is None:
+        return
+    event = event_type(ticker=listener.ticker if listener is not None else "", **fields)
+    if captured is not None:
+        captured.append(event)
+    if listener is not None:
+        listener.callback(event)
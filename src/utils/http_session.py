@@ -0,0 +1,117 @@
+import contextlib
+import threading
+from collections.abc import Iterator
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import requests
+
+# Keep-alive connections kept per host; enough for every worker of a large batch
+DEFAULT_POOL_SIZE = 32
+# Yahoo rejects clients that do not look like a browser
+YAHOO_IMPERSONATE = "chrome"
+
+_http_session: "requests.Session | None" = None
+_yahoo_session: Any = None
+_sessions_lock = threading.Lock()
+
+# Ticker objects of the running analysis by symbol, shared by its stages
+_tickers: ContextVar[dict[str, Any] | None] = ContextVar("yahoo_tickers", default=None)
+_tickers_lock = threading.Lock()
+
+
+def get_http_session() -> "requests.Session":
+    """Return the process-wide pooled session used for plain HTTP APIs such as Brave.
+
+    Connections are kept alive and pooled per host, so concurrent workers reuse TLS
+    connections instead of opening one per request.
+    """
+    global _http_session
+    with _sessions_lock:
+        if _http_session is None:
+            # Imported here to keep the CLI's startup free of HTTP libraries
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=DEFAULT_POOL_SIZE, pool_maxsize=DEFAULT_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_session = session
+        return _http_session
+
+
+def get_yahoo_session():
+    """Return the process-wide curl_cffi session handed to every yfinance call.
+
+    yfinance creates a new session for each ``Ticker`` it is not given one; sharing
+    one keeps Yahoo's cookie and crumb and each thread's keep-alive connection
+    (curl_cffi uses one curl handle per thread, so workers can share the session).
+    """
+    global _yahoo_session
+    with _sessions_lock:
+        if _yahoo_session is None:
+            # Imported here: curl_cffi comes with yfinance and is only needed once Yahoo is queried
+            from curl_cffi import requests as curl_requests
+
+            _yahoo_session = curl_requests.Session(impersonate=YAHOO_IMPERSONATE)
+        return _yahoo_session
+
+
+def reset_sessions() -> None:
+    """Close and forget the shared sessions so they are recreated on next use."""
+    global _http_session, _yahoo_session
+    with _sessions_lock:
+        sessions = [_http_session, _yahoo_session]
+        _http_session = _yahoo_session = None
+    for session in sessions:
+        if session is not None:
+            with contextlib.suppress(Exception):
+                session.close()
+
+
+@contextlib.contextmanager
+def sharing_tickers() -> Iterator[None]:
+    """Share ``yf.Ticker`` objects by symbol between the stages run in this block.
+
+    Within one analysis the validation and price stages then use the same object,
+    so the info fetched during validation (and the exchange timezone it contains)
+    is not requested from Yahoo again when the price history is loaded.
+    """
+    token = _tickers.set({})
+    try:
+        yield
+    finally:
+        _tickers.reset(token)
+
+
+def yahoo_ticker(symbol: str):
+    """Return a ``yf.Ticker`` on the shared Yahoo session, reused within ``sharing_tickers``."""
+    # Imported here: yfinance (and pandas) are only needed once Yahoo is queried
+    import yfinance as yf
+
+    shared = _tickers.get()
+    if shared is None:
+        return yf.Ticker(symbol, session=get_yahoo_session())
+    key = symbol.upper()
+    with _tickers_lock:
+        ticker = shared.get(key)
+        if ticker is None:
+            ticker = shared[key] = yf.Ticker(symbol, session=get_yahoo_session())
+        return ticker
+
+
+def ticker_info(ticker) -> dict:
+    """Return a ticker's info, remembering its exchange timezone for later history calls.
+
+    ``Ticker.history`` otherwise makes an extra request just to look the timezone up
+    when yfinance's timezone cache does not have it yet.
+    """
+    info = ticker.info
+    timezone = info.get("exchangeTimezoneName") if isinstance(info, dict) else None
+    # Private yfinance attribute (TickerBase._tz, checked by _get_ticker_tz as of yfinance
+    # 0.2.61); when a release drops it, history simply looks the timezone up again
+    if isinstance(timezone, str) and hasattr(ticker, "_tz") and ticker._tz is None:
+        ticker._tz = timezone
+    return info
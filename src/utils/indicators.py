@@ -0,0 +1,227 @@
+import copy
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from src.utils.price_series import PriceSeries
+
+DEFAULT_SMA_WINDOWS = (5, 10, 20, 50)
+DEFAULT_EMA_SPANS = (12, 26)
+DEFAULT_RSI_PERIOD = 14
+DEFAULT_MACD = (12, 26, 9)
+DEFAULT_ATR_PERIOD = 14
+DEFAULT_VOLATILITY_WINDOW = 20
+TRADING_DAYS_PER_YEAR = 252
+# Calendar days of history needed for the slowest default indicator (SMA 50) to be defined
+INDICATOR_LOOKBACK_DAYS = 120
+
+
+@dataclass
+class IndicatorState:
+    """Everything needed to advance the indicators by one bar without the full history.
+
+    Moving averages are exponential (``adjust=False``) recursions seeded with the first
+    bar; RSI and ATR use Wilder's smoothing. Drawdown is measured from the highest close
+    since the state started.
+    """
+    bars: int = 0
+    last_date: np.datetime64 | None = None
+    closes: deque = field(default_factory=deque)
+    returns: deque = field(default_factory=deque)
+    ema: dict[int, float] = field(default_factory=dict)
+    macd_signal: float = 0.0
+    avg_gain: float | None = None
+    avg_loss: float | None = None
+    atr: float = 0.0
+    prev_close: float = 0.0
+    peak: float = 0.0
+    max_drawdown: float = 0.0
+
+
+def _ewm(values: np.ndarray, alpha: float) -> np.ndarray:
+    return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+class IndicatorEngine:
+    """Vectorized technical indicators with incremental updates per ticker.
+
+    The first call for a ticker computes every indicator over the whole history in
+    NumPy/pandas. Later calls only advance the cached state over bars that arrived
+    since, so refreshing a watchlist costs O(new bars) instead of O(history). The
+    most recent bar may still be forming, so it is never folded into the cache.
+    """
+
+    def __init__(
+        self,
+        sma_windows: tuple[int, ...] = DEFAULT_SMA_WINDOWS,
+        ema_spans: tuple[int, ...] = DEFAULT_EMA_SPANS,
+        rsi_period: int = DEFAULT_RSI_PERIOD,
+        macd: tuple[int, int, int] = DEFAULT_MACD,
+        atr_period: int = DEFAULT_ATR_PERIOD,
+        volatility_window: int = DEFAULT_VOLATILITY_WINDOW,
+    ):
+        self.sma_windows = sma_windows
+        self.ema_spans = ema_spans
+        self.rsi_period = rsi_period
+        self.macd_fast, self.macd_slow, self.macd_signal = macd
+        self.atr_period = atr_period
+        self.volatility_window = volatility_window
+        self._spans = sorted({*ema_spans, self.macd_fast, self.macd_slow})
+        # ticker -> state as of the last settled (not most recent) bar
+        self._settled: dict[str, IndicatorState] = {}
+        self._lock = threading.Lock()
+
+    def _empty_state(self) -> IndicatorState:
+        return IndicatorState(
+            closes=deque(maxlen=max(self.sma_windows, default=1)),
+            returns=deque(maxlen=self.volatility_window),
+        )
+
+    def compute(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, dates: np.ndarray) -> IndicatorState:
+        """Compute the indicator state over a whole history in one vectorized pass."""
+        state = self._empty_state()
+        close = np.asarray(close, dtype=float)
+        if len(close) == 0:
+            return state
+        high = np.asarray(high, dtype=float)
+        low = np.asarray(low, dtype=float)
+
+        emas = {span: _ewm(close, 2.0 / (span + 1)) for span in self._spans}
+        state.ema = {span: float(values[-1]) for span, values in emas.items()}
+        macd_line = emas[self.macd_fast] - emas[self.macd_slow]
+        state.macd_signal = float(_ewm(macd_line, 2.0 / (self.macd_signal + 1))[-1])
+
+        delta = np.diff(close)
+        if len(delta):
+            state.avg_gain = float(_ewm(np.clip(delta, 0, None), 1.0 / self.rsi_period)[-1])
+            state.avg_loss = float(_ewm(np.clip(-delta, 0, None), 1.0 / self.rsi_period)[-1])
+
+        previous = np.concatenate(([close[0]], close[:-1]))
+        true_range = np.maximum.reduce([high - low, np.abs(high - previous), np.abs(low - previous)])
+        state.atr = float(_ewm(true_range, 1.0 / self.atr_period)[-1])
+
+        peaks = np.maximum.accumulate(close)
+        state.peak = float(peaks[-1])
+        state.max_drawdown = float(np.min(close / peaks - 1.0))
+
+        state.closes.extend(close[-state.closes.maxlen:].tolist())
+        state.returns.extend(np.diff(np.log(close))[-state.returns.maxlen:].tolist())
+        state.prev_close = float(close[-1])
+        state.bars = len(close)
+        state.last_date = dates[-1]
+        return state
+
+    def update(self, state: IndicatorState, high: float, low: float, close: float, date: np.datetime64) -> None:
+        """Advance ``state`` in place by one bar."""
+        high, low, close = float(high), float(low), float(close)
+        if state.bars == 0:
+            state.ema = dict.fromkeys(self._spans, close)
+            state.atr = high - low
+            state.peak = close
+        else:
+            for span, value in state.ema.items():
+                state.ema[span] = value + 2.0 / (span + 1) * (close - value)
+            macd = state.ema[self.macd_fast] - state.ema[self.macd_slow]
+            state.macd_signal += 2.0 / (self.macd_signal + 1) * (macd - state.macd_signal)
+
+            delta = close - state.prev_close
+            gain, loss = max(delta, 0.0), max(-delta, 0.0)
+            if state.avg_gain is None:
+                state.avg_gain, state.avg_loss = gain, loss
+            else:
+                state.avg_gain += (gain - state.avg_gain) / self.rsi_period
+                state.avg_loss += (loss - state.avg_loss) / self.rsi_period
+
+            true_range = max(high - low, abs(high - state.prev_close), abs(low - state.prev_close))
+            state.atr += (true_range - state.atr) / self.atr_period
+            state.returns.append(math.log(close / state.prev_close))
+            state.peak = max(state.peak, close)
+            state.max_drawdown = min(state.max_drawdown, close / state.peak - 1.0)
+
+        state.closes.append(close)
+        state.prev_close = close
+        state.bars += 1
+        state.last_date = date
+
+    def state_for(self, series: PriceSeries) -> IndicatorState:
+        """Return the indicator state after the series' last bar, reusing cached work."""
+        bars = len(series)
+        with self._lock:
+            settled = self._settled.get(series.ticker)
+        start = None
+        if settled is not None and settled.last_date is not None:
+            position = int(np.searchsorted(series.dates, settled.last_date))
+            if position < bars and series.dates[position] == settled.last_date:
+                start = position + 1
+
+        if start is None:
+            # No usable cache: one vectorized pass over everything but the forming bar
+            settled = self.compute(series.high[:-1], series.low[:-1], series.close[:-1], series.dates[:-1])
+            start = bars - 1
+        else:
+            settled = copy.deepcopy(settled)
+        for i in range(start, bars - 1):
+            self.update(settled, series.high[i], series.low[i], series.close[i], series.dates[i])
+        with self._lock:
+            self._settled[series.ticker] = settled
+
+        state = copy.deepcopy(settled)
+        if bars > 0 and start <= bars - 1:
+            self.update(state, series.high[-1], series.low[-1], series.close[-1], series.dates[-1])
+        return state
+
+    def snapshot(self, state: IndicatorState) -> dict[str, Any]:
+        """Summarize a state as the compact indicator payload given to the LLM."""
+        if state.bars == 0:
+            return {}
+        closes = np.array(state.closes)
+        close = state.prev_close
+
+        def pct(value: float | None) -> float | None:
+            return None if value is None else round(value * 100.0, 2)
+
+        sma = {
+            str(window): round(float(closes[-window:].mean()), 4) if state.bars >= window else None
+            for window in self.sma_windows
+        }
+        rsi = None
+        if state.avg_gain is not None:
+            rsi = 100.0 if state.avg_loss == 0 else 100.0 - 100.0 / (1.0 + state.avg_gain / state.avg_loss)
+        macd = state.ema[self.macd_fast] - state.ema[self.macd_slow]
+        volatility = None
+        if len(state.returns) >= 2:
+            volatility = float(np.std(np.array(state.returns), ddof=1))
+
+        return {
+            "sma": sma,
+            "ema": {str(span): round(state.ema[span], 4) for span in self.ema_spans},
+            f"rsi_{self.rsi_period}": round(rsi, 2) if rsi is not None else None,
+            "macd": {
+                "macd": round(macd, 4),
+                "signal": round(state.macd_signal, 4),
+                "histogram": round(macd - state.macd_signal, 4),
+            },
+            f"atr_{self.atr_period}": round(state.atr, 4),
+            "atr_pct": pct(state.atr / close) if close else None,
+            "drawdown_pct": pct(close / state.peak - 1.0),
+            "max_drawdown_pct": pct(state.max_drawdown),
+            f"volatility_{self.volatility_window}d_pct": pct(volatility),
+            "annualized_volatility_pct": pct(volatility * math.sqrt(TRADING_DAYS_PER_YEAR)) if volatility is not None else None,
+            "close_vs_sma_pct": {
+                window: pct(close / value - 1.0) for window, value in sma.items() if value
+            },
+        }
+
+    def indicators(self, series: PriceSeries) -> dict[str, Any]:
+        """Return the compact indicator payload for a series."""
+        return self.snapshot(self.state_for(series))
+
+    def clear(self) -> None:
+        """Forget every cached state."""
+        with self._lock:
+            self._settled.clear()
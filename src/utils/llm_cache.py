@@ -0,0 +1,242 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from crewai.llms.base_llm import BaseLLM
+from crewai.utilities.llm_utils import create_llm
+
+from src.utils import metrics, rate_limit
+from src.utils.cache_config import caching_enabled, get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Re-runs within one trading session should hit; older answers are recomputed
+DEFAULT_TTL_SECONDS = 6 * 60 * 60.0
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+class ResponseCache:
+    """Content-addressed store of LLM completions in a local SQLite database.
+
+    Entries expire after ``ttl`` seconds and the least recently used ones are
+    evicted once more than ``max_entries`` are stored. Hit and miss counters are
+    kept per instance.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = Path(path) if path else get_cache_dir("llm") / "responses.sqlite3"
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT, created_at REAL, last_access REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, messages: Any, **params: Any) -> str:
+        """Hash the model, the full prompt (including tool observations) and call parameters."""
+        payload = json.dumps(
+            {"model": model, "messages": messages, "params": params},
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Return a cached response, counting the lookup as a hit or a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """Store a response and evict expired and least recently used entries."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self) -> None:
+        """Remove every cached response and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, float]:
+        """Return hit/miss counters and the hit rate since this cache was created."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class LLMWrapper(BaseLLM):
+    """Base for LLMs that delegate to another one.
+
+    Accepts anything an agent's ``llm`` parameter accepts (None, a model name or an
+    LLM instance); attributes not defined by the wrapper come from the wrapped LLM.
+    """
+
+    def __init__(self, llm=None):
+        self.llm = create_llm(llm)
+        super().__init__(model=self.llm.model, temperature=getattr(self.llm, "temperature", None))
+
+    # CrewAI sets stop words on the agent's LLM; they must reach the wrapped one
+    @property
+    def stop(self):
+        return self.llm.stop
+
+    @stop.setter
+    def stop(self, value):
+        self.llm.stop = value
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def call(
+        self,
+        messages: str | list[dict[str, str]],
+        tools: list[dict] | None = None,
+        callbacks: list[Any] | None = None,
+        available_functions: dict[str, Any] | None = None,
+    ) -> str | Any:
+        return self.llm.call(messages, tools, callbacks, available_functions)
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size()
+
+
+class RateLimitedLLM(LLMWrapper):
+    """LLM wrapper sending every call through the shared 'llm' rate limit and retry policy."""
+
+    def call(
+        self,
+        messages: str | list[dict[str, str]],
+        tools: list[dict] | None = None,
+        callbacks: list[Any] | None = None,
+        available_functions: dict[str, Any] | None = None,
+    ) -> str | Any:
+        return rate_limit.call("llm", self.llm.call, messages, tools, callbacks, available_functions)
+
+
+class OfflineLLM(LLMWrapper):
+    """LLM wrapper that never reaches the provider.
+
+    Placed under a CachedLLM it replays recorded completions only: the wrapped LLM
+    just supplies the model name and parameters the cache keys on, and a prompt
+    that was never recorded raises LookupError.
+    """
+
+    def call(
+        self,
+        messages: str | list[dict[str, str]],
+        tools: list[dict] | None = None,
+        callbacks: list[Any] | None = None,
+        available_functions: dict[str, Any] | None = None,
+    ) -> str | Any:
+        raise LookupError(f"No recorded {self.model} completion for this prompt")
+
+
+class CachedLLM(LLMWrapper):
+    """LLM wrapper that answers repeated prompts from a ResponseCache.
+
+    Calls that let the LLM execute functions itself are never cached.
+    """
+
+    def __init__(self, llm=None, cache: ResponseCache | None = None):
+        super().__init__(llm)
+        self.cache = cache if cache is not None else ResponseCache()
+
+    def call(
+        self,
+        messages: str | list[dict[str, str]],
+        tools: list[dict] | None = None,
+        callbacks: list[Any] | None = None,
+        available_functions: dict[str, Any] | None = None,
+    ) -> str | Any:
+        if available_functions:
+            return self.llm.call(messages, tools, callbacks, available_functions)
+
+        key = ResponseCache.make_key(
+            self.model, messages, tools=tools, temperature=self.temperature, stop=self.stop
+        )
+        cached = self.cache.get(key)
+        metrics.count_cache("llm", hit=cached is not None)
+        if cached is not None:
+            logger.debug(f"LLM cache hit for {self.model}")
+            return cached
+
+        response = self.llm.call(messages, tools, callbacks, available_functions)
+        if isinstance(response, str) and response:
+            self.cache.put(key, self.model, response)
+        return response
+
+
+def limited_llm(llm=None, cache: ResponseCache | None = None) -> LLMWrapper:
+    """Wrap an LLM in the shared rate limit and, when a cache is given, answer repeated prompts from it.
+
+    Cache hits are answered before any rate limit is consumed.
+    """
+    limited = RateLimitedLLM(llm)
+    return CachedLLM(limited, cache) if cache is not None else limited
+
+
+_default_cache: ResponseCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache | None:
+    """Return the process-wide LLM response cache, or None when caching is disabled."""
+    global _default_cache
+    if not caching_enabled():
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
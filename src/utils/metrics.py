@@ -0,0 +1,227 @@
+import json
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from typing import Any
+
+# Upper bounds (seconds) of the stage duration histogram buckets; the last bucket is open-ended
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+TOKEN_FIELDS = ("total_tokens", "prompt_tokens", "cached_prompt_tokens", "completion_tokens", "successful_requests")
+
+_current_run: ContextVar["RunMetrics | None"] = ContextVar("current_run", default=None)
+
+
+def _prefixed(counters: Counter[str], prefix: str) -> dict[str, int]:
+    return {
+        name.removeprefix(prefix): value
+        for name, value in sorted(counters.items()) if name.startswith(prefix)
+    }
+
+
+def _http_requests(counters: Counter[str]) -> dict[str, int]:
+    return _prefixed(counters, "http.")
+
+
+def _provider_errors(counters: Counter[str]) -> dict[str, dict[str, int]]:
+    """Retries, throttled responses and calls refused by an open circuit, per provider."""
+    return {
+        kind: counts
+        for kind in ("retry", "throttled", "circuit_open")
+        if (counts := _prefixed(counters, f"{kind}."))
+    }
+
+
+def _cache_stats(counters: Counter[str]) -> dict[str, dict[str, float]]:
+    caches: dict[str, dict[str, float]] = {}
+    for name, value in sorted(counters.items()):
+        parts = name.split(".")
+        if len(parts) == 3 and parts[0] == "cache" and parts[2] in ("hits", "misses"):
+            caches.setdefault(parts[1], {"hits": 0, "misses": 0})[parts[2]] = value
+    for stats in caches.values():
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return caches
+
+
+class RunMetrics:
+    """Stage timings, counters and LLM token usage collected while analyzing one ticker.
+
+    Stage durations with the same name add up (e.g. several price fetches in one run).
+    Counters use dotted names: ``http.<provider>`` for network requests,
+    ``retry.<provider>`` / ``throttled.<provider>`` / ``circuit_open.<provider>`` for
+    the rate limit layer and ``cache.<name>.hits`` / ``cache.<name>.misses`` for cache
+    lookups.
+    """
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.started_at = datetime.now(UTC)
+        self.success: bool | None = None
+        self.error: str | None = None
+        self.stages: dict[str, float] = {}
+        self.counters: Counter[str] = Counter()
+        self.tokens: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as stage ``name``, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - start)
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def add_tokens(self, name: str, usage: dict[str, int]) -> None:
+        """Add LLM token usage attributed to ``name`` (usually an agent)."""
+        with self._lock:
+            totals = self.tokens.setdefault(name, dict.fromkeys(TOKEN_FIELDS, 0))
+            for field in TOKEN_FIELDS:
+                totals[field] += int(usage.get(field, 0))
+
+    def finish(self, success: bool, error: str | None = None) -> None:
+        self.success = success
+        self.error = error
+
+    def cache_stats(self) -> dict[str, dict[str, float]]:
+        """Return hits, misses and hit rate for every cache consulted during the run."""
+        with self._lock:
+            return _cache_stats(self.counters)
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            total_tokens = dict.fromkeys(TOKEN_FIELDS, 0)
+            for usage in self.tokens.values():
+                for field in TOKEN_FIELDS:
+                    total_tokens[field] += usage[field]
+            return {
+                "ticker": self.ticker,
+                "started_at": self.started_at.isoformat(),
+                "success": self.success,
+                "error": self.error,
+                "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+                "http_requests": _http_requests(self.counters),
+                "provider_errors": _provider_errors(self.counters),
+                "llm_tokens": {**{name: dict(usage) for name, usage in self.tokens.items()}, "total": total_tokens},
+                "caches": _cache_stats(self.counters),
+            }
+
+    def to_json(self, indent: int | None = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+
+class BatchMetrics:
+    """Collects the RunMetrics of a batch and summarizes them as histograms."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.runs: list[RunMetrics] = []
+        self._lock = threading.Lock()
+
+    def add(self, run: RunMetrics) -> None:
+        with self._lock:
+            self.runs.append(run)
+
+    def histograms(self) -> dict[str, dict[str, Any]]:
+        """Return count, percentiles and bucketed counts of every stage's duration across runs."""
+        with self._lock:
+            reports = [run.to_dict() for run in self.runs]
+        durations: dict[str, list[float]] = {}
+        for report in reports:
+            for name, seconds in report["stages"].items():
+                durations.setdefault(name, []).append(seconds)
+
+        # Imported here so that the metrics hooks stay cheap to import for the CLI
+        import numpy as np
+
+        edges = np.array(self.buckets)
+        histograms = {}
+        for name, values in durations.items():
+            samples = np.array(values)
+            # Bucket i counts samples <= buckets[i]; the last one counts everything slower
+            counts = np.bincount(np.searchsorted(edges, samples, side="left"), minlength=len(edges) + 1)
+            histograms[name] = {
+                "count": len(samples),
+                "mean": float(samples.mean()),
+                "p50": float(np.percentile(samples, 50)),
+                "p95": float(np.percentile(samples, 95)),
+                "max": float(samples.max()),
+                "buckets": {
+                    **{f"le_{edge:g}": int(count) for edge, count in zip(self.buckets, counts, strict=False)},
+                    "inf": int(counts[-1]),
+                },
+            }
+        return histograms
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            runs = [run.to_dict() for run in self.runs]
+            totals: Counter[str] = Counter()
+            for run in self.runs:
+                totals.update(run.counters)
+        return {
+            "runs": runs,
+            "succeeded": sum(1 for run in runs if run["success"]),
+            "failed": sum(1 for run in runs if run["success"] is False),
+            "histograms": self.histograms(),
+            "http_requests": _http_requests(totals),
+            "provider_errors": _provider_errors(totals),
+            "llm_tokens": {
+                field: sum(run["llm_tokens"]["total"][field] for run in runs) for field in TOKEN_FIELDS
+            },
+            "caches": _cache_stats(totals),
+        }
+
+    def to_json(self, indent: int | None = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+
+def current_run() -> RunMetrics | None:
+    """Return the metrics of the run being executed in this context, if any."""
+    return _current_run.get()
+
+
+@contextmanager
+def recording(run: RunMetrics) -> Iterator[RunMetrics]:
+    """Make ``run`` the current run for code executed inside the block."""
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+def count(name: str, value: int = 1) -> None:
+    """Increment a counter of the current run (no-op outside a recorded run)."""
+    run = _current_run.get()
+    if run is not None:
+        run.count(name, value)
+
+
+def count_cache(name: str, hit: bool) -> None:
+    """Record a lookup in cache ``name`` for the current run."""
+    count(f"cache.{name}.{'hits' if hit else 'misses'}")
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as a stage of the current run (no-op outside a recorded run)."""
+    run = _current_run.get()
+    if run is None:
+        yield
+        return
+    with run.stage(name):
+        yield
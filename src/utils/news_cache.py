@@ -0,0 +1,282 @@
+import html
+import logging
+import os
+import re
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Protocol
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+
+from src.utils import metrics, rate_limit
+from src.utils.http_session import get_http_session
+
+logger = logging.getLogger(__name__)
+
+BRAVE_SEARCH_URL = "https://api.search.brave.com/res/v1/web/search"
+# News moves quickly, so search results are only reused for a short while
+DEFAULT_SEARCH_TTL_SECONDS = 10 * 60.0
+# Titles sharing this fraction of their words are treated as the same story
+DEFAULT_TITLE_SIMILARITY = 0.8
+MAX_SUMMARY_CHARS = 300
+
+_TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "cmpid", "ref"}
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class SearchBackend(Protocol):
+    """Anything that can run a web search and return result dicts with title, url and description."""
+
+    def search(self, query: str, count: int = 10) -> list[dict]:
+        ...
+
+
+class BraveSearchBackend:
+    """Search backend calling the Brave Search API directly.
+
+    Requests share the process-wide 'brave' rate limit (one per second on the free
+    tier); 429s and server errors are retried with backoff. Connections come from the
+    shared keep-alive pool unless a session is given.
+    """
+
+    def __init__(self, country: str = "", session: requests.Session | None = None):
+        if "BRAVE_API_KEY" not in os.environ:
+            raise ValueError("BRAVE_API_KEY environment variable is required for BraveSearchBackend")
+        self.country = country
+        self.session = session or get_http_session()
+
+    def search(self, query: str, count: int = 10) -> list[dict]:
+        return rate_limit.call("brave", self._search, query, count)
+
+    def _search(self, query: str, count: int) -> list[dict]:
+        metrics.count("http.brave")
+        params = {"q": query, "count": count}
+        if self.country:
+            params["country"] = self.country
+        headers = {
+            "X-Subscription-Token": os.environ["BRAVE_API_KEY"],
+            "Accept": "application/json",
+        }
+        response = self.session.get(BRAVE_SEARCH_URL, headers=headers, params=params, timeout=10)
+        response.raise_for_status()
+        results = response.json().get("web", {}).get("results", [])
+        return [
+            {"title": r["title"], "url": r["url"], "description": r.get("description", "")}
+            for r in results if "title" in r and "url" in r
+        ]
+
+
+class StubSearchBackend:
+    """Search backend returning canned results per query, for tests and offline runs."""
+
+    def __init__(self, results: dict[str, list[dict]] | None = None, default: list[dict] | None = None):
+        self.results = results or {}
+        self.default = default or []
+        self.queries: list[str] = []
+
+    def search(self, query: str, count: int = 10) -> list[dict]:
+        self.queries.append(query)
+        return list(self.results.get(query, self.default))[:count]
+
+
+@dataclass
+class NewsArticle:
+    """One news article, shared by every search (and ticker) that returns it."""
+    title: str
+    url: str
+    description: str
+    summary: str | None = None
+    queries: set[str] = field(default_factory=set)
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so the same article is recognised across sources and tracking links."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    path = parts.path.rstrip("/") or "/"
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    ]
+    canonical = f"{host}{path}"
+    if query:
+        canonical += "?" + urlencode(sorted(query))
+    return canonical
+
+
+def clean_text(text: str) -> str:
+    """Strip HTML tags and entities from search snippets."""
+    return " ".join(html.unescape(_TAG_PATTERN.sub("", text or "")).split())
+
+
+def title_words(title: str) -> frozenset[str]:
+    """Return the set of words in a title, ignoring a trailing ' - Publisher' suffix."""
+    title = clean_text(title).lower()
+    if " - " in title:
+        title = title.rsplit(" - ", 1)[0]
+    return frozenset(_WORD_PATTERN.findall(title))
+
+
+def extractive_summary(article: NewsArticle) -> str:
+    """Summarize an article from its snippet: leading sentences up to MAX_SUMMARY_CHARS."""
+    text = clean_text(article.description) or clean_text(article.title)
+    if len(text) <= MAX_SUMMARY_CHARS:
+        return text
+    cut = text[:MAX_SUMMARY_CHARS]
+    sentence_end = cut.rfind(". ")
+    return cut[:sentence_end + 1] if sentence_end > 0 else cut.rstrip() + "..."
+
+
+class NewsSearchCache:
+    """Caches search results for a short TTL and deduplicates articles across searches.
+
+    Articles are matched by canonical URL or by near-identical titles, so the same
+    story found for several tickers of a basket is stored once and summarized once.
+    An article is forgotten once no search has returned it for ``ttl`` seconds, like
+    the search results themselves, so a long-running process keeps only recent news.
+    """
+
+    def __init__(
+        self,
+        backend: SearchBackend | None = None,
+        ttl: float = DEFAULT_SEARCH_TTL_SECONDS,
+        summarizer: Callable[[NewsArticle], str] = extractive_summary,
+        title_similarity: float = DEFAULT_TITLE_SIMILARITY,
+    ):
+        self.backend = backend or BraveSearchBackend()
+        self.ttl = ttl
+        self.summarizer = summarizer
+        self.title_similarity = title_similarity
+        self.hits = 0
+        self.misses = 0
+        self._results: dict[str, tuple[float, list[dict]]] = {}
+        self._articles: dict[str, NewsArticle] = {}
+        # Title words of each article's own URL key, and when each URL key was last returned
+        self._titles: dict[str, frozenset[str]] = {}
+        self._seen: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _query_key(query: str, count: int) -> str:
+        return f"{' '.join(query.lower().split())}|{count}"
+
+    def _expire(self, now: float) -> None:
+        # Caller holds the lock
+        for key in [key for key, (stored, _) in self._results.items() if now - stored >= self.ttl]:
+            del self._results[key]
+        for url_key in [url_key for url_key, seen in self._seen.items() if now - seen >= self.ttl]:
+            del self._seen[url_key]
+            self._articles.pop(url_key, None)
+            self._titles.pop(url_key, None)
+
+    def _raw_results(self, query: str, count: int) -> list[dict]:
+        key = self._query_key(query, count)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.ttl:
+                self.hits += 1
+                metrics.count_cache("news", hit=True)
+                return cached[1]
+            self._results.pop(key, None)
+            self.misses += 1
+        metrics.count_cache("news", hit=False)
+
+        results = self.backend.search(query, count)
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            self._results[key] = (now, results)
+        return results
+
+    def _find_duplicate(self, url_key: str, words: frozenset[str]) -> NewsArticle | None:
+        # Caller holds the lock
+        article = self._articles.get(url_key)
+        if article is not None or not words:
+            return article
+        for other_key, other_words in self._titles.items():
+            overlap = len(words & other_words) / len(words | other_words)
+            if overlap >= self.title_similarity:
+                return self._articles[other_key]
+        return None
+
+    def _register(self, result: dict, query: str) -> NewsArticle:
+        url_key = canonical_url(result["url"])
+        words = title_words(result["title"])
+        with self._lock:
+            article = self._find_duplicate(url_key, words)
+            if article is None:
+                article = NewsArticle(
+                    title=clean_text(result["title"]),
+                    url=result["url"],
+                    description=result.get("description", ""),
+                )
+                self._articles[url_key] = article
+                self._titles[url_key] = words
+            else:
+                # Alias this URL too so the next lookup skips the title scan
+                self._articles.setdefault(url_key, article)
+            # Keep the article's own URL key (and its title) alive along with any alias
+            now = time.monotonic()
+            self._seen[url_key] = now
+            own_key = canonical_url(article.url)
+            if own_key in self._articles:
+                self._seen[own_key] = now
+            article.queries.add(query)
+        return article
+
+    def search(self, query: str, count: int = 10) -> list[NewsArticle]:
+        """Return the distinct articles for a query, each with a (cached) summary."""
+        articles: list[NewsArticle] = []
+        with metrics.stage("news_search"):
+            results = self._raw_results(query, count)
+        for result in results:
+            article = self._register(result, query)
+            if any(article is seen for seen in articles):
+                continue
+            if article.summary is None:
+                article.summary = self.summarizer(article)
+            articles.append(article)
+        return articles
+
+    def stats(self) -> dict[str, float]:
+        """Return search cache hit/miss counters and the number of distinct articles seen."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "articles": len({id(article) for article in self._articles.values()}),
+            }
+
+
+def format_articles(articles: list[NewsArticle]) -> str:
+    """Render articles in the Title/Link/Summary layout used by the search tool."""
+    return "\n".join(
+        f"Title: {article.title}\nLink: {article.url}\nSummary: {article.summary}\n---"
+        for article in articles
+    )
+
+
+_default_cache: NewsSearchCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def get_news_cache() -> NewsSearchCache:
+    """Return the process-wide news search cache, shared by every NewsAgent."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = NewsSearchCache()
+        return _default_cache
+
+
+def set_news_cache(cache: NewsSearchCache | None) -> None:
+    """Replace the process-wide news search cache (None restores the Brave-backed default)."""
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = cache
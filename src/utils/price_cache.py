@@ -0,0 +1,288 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+from urllib.parse import quote
+
+import pandas as pd
+from filelock import FileLock
+
+from src.utils import metrics
+from src.utils.cache_config import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Intraday bars change constantly; daily bars only while the session is open
+DEFAULT_INTRADAY_TTL_SECONDS = 60.0
+DEFAULT_DAILY_TTL_SECONDS = 15 * 60.0
+
+INTRADAY_INTERVALS = ("1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h")
+
+
+def naive_index(frame: pd.DataFrame) -> pd.DataFrame:
+    """Drop the timezone of a frame's index, keeping the exchange's wall-clock times.
+
+    ``Ticker.history`` returns exchange-local timestamps while ``yf.download`` returns
+    naive ones for daily bars, and the two cannot be compared or joined.
+    """
+    index = frame.index
+    if isinstance(index, pd.DatetimeIndex) and index.tz is not None:
+        return frame.set_axis(index.tz_localize(None))
+    return frame
+
+
+def slice_dates(frame: pd.DataFrame, start: date, end: date | None = None) -> pd.DataFrame:
+    """Return the rows of frame dated within [start, end)."""
+    if frame.empty:
+        return frame
+    dates = frame.index.date
+    mask = dates >= start
+    if end is not None:
+        mask &= dates < end
+    return frame[mask]
+
+
+def merge_frames(old: pd.DataFrame | None, new: pd.DataFrame | None) -> pd.DataFrame | None:
+    """Merge newly fetched bars into cached ones, letting new bars replace old ones.
+
+    Frames whose index timezones differ (e.g. bars cached before a source change) are
+    merged on their naive wall-clock times.
+    """
+    frames = [frame for frame in (old, new) if frame is not None and not frame.empty]
+    if not frames:
+        return old if old is not None else new
+    if len(frames) == 1:
+        return frames[0]
+    if len({str(getattr(frame.index, "tz", None)) for frame in frames}) > 1:
+        frames = [naive_index(frame) for frame in frames]
+    merged = pd.concat(frames)
+    merged = merged[~merged.index.duplicated(keep="last")]
+    return merged.sort_index()
+
+
+class PriceCache:
+    """On-disk Parquet store of OHLCV history, one file per ticker and interval.
+
+    A JSON manifest records which date range each file covers, when it was last
+    refreshed (for the intraday/daily TTLs) and when it was last read (for LRU
+    eviction once the store grows past ``max_bytes``). Several processes may share
+    the directory: every save merges the manifest on disk under a file lock, so no
+    process drops another one's entries.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        intraday_ttl: float = DEFAULT_INTRADAY_TTL_SECONDS,
+        daily_ttl: float = DEFAULT_DAILY_TTL_SECONDS,
+    ):
+        self.directory = Path(directory) if directory else get_cache_dir("prices")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.intraday_ttl = intraday_ttl
+        self.daily_ttl = daily_ttl
+        self._manifest_path = self.directory / "manifest.json"
+        self._file_lock = FileLock(str(self._manifest_path) + ".lock")
+        self._lock = threading.Lock()
+        # Keys this instance dropped since its last save, kept out of the merged manifest
+        self._removed: set[str] = set()
+        self._manifest: dict[str, dict[str, Any]] = self._load_manifest()
+
+    def _load_manifest(self) -> dict[str, dict[str, Any]]:
+        try:
+            with open(self._manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _merge_manifest(self, stored: dict[str, dict[str, Any]]) -> None:
+        # Caller holds both locks; the newer refresh of an entry wins, reads add up
+        for key in self._removed:
+            stored.pop(key, None)
+        for key, entry in self._manifest.items():
+            other = stored.get(key)
+            if other is None:
+                # Entries missing on disk were either never saved or evicted elsewhere
+                if self._path(key).exists():
+                    stored[key] = entry
+            elif entry["fetched_at"] >= other["fetched_at"]:
+                stored[key] = {**entry, "last_access": max(entry["last_access"], other["last_access"])}
+            else:
+                other["last_access"] = max(entry["last_access"], other["last_access"])
+        self._manifest = stored
+        self._removed.clear()
+
+    def _save_manifest(self) -> None:
+        # Caller holds the lock
+        with self._file_lock:
+            self._merge_manifest(self._load_manifest())
+            self._evict()
+            tmp_path = self._manifest_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._manifest, f)
+            os.replace(tmp_path, self._manifest_path)
+
+    @staticmethod
+    def _key(ticker: str, interval: str) -> str:
+        return f"{quote(ticker.upper(), safe='')}_{interval}"
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.parquet"
+
+    def ttl(self, interval: str) -> float:
+        """Return how long cached bars of this interval are considered fresh."""
+        return self.intraday_ttl if interval in INTRADAY_INTERVALS else self.daily_ttl
+
+    def read(self, ticker: str, interval: str = "1d") -> tuple[pd.DataFrame | None, dict[str, Any] | None]:
+        """Return the cached frame and its manifest entry, or (None, None) on a miss."""
+        key = self._key(ticker, interval)
+        with self._lock:
+            entry = self._manifest.get(key)
+            if entry is None:
+                return None, None
+            entry["last_access"] = time.time()
+            entry = dict(entry)
+        try:
+            frame = pd.read_parquet(self._path(key))
+        except Exception as e:
+            logger.debug(f"Discarding unreadable price cache entry {key}: {e}")
+            with self._lock:
+                self._manifest.pop(key, None)
+                self._removed.add(key)
+            return None, None
+        return frame, entry
+
+    def write(self, ticker: str, interval: str, frame: pd.DataFrame, covered_start: date) -> None:
+        """Store a ticker's full cached history and mark it as just refreshed."""
+        key = self._key(ticker, interval)
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        frame.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+        now = time.time()
+        with self._lock:
+            self._manifest[key] = {
+                "covered_start": covered_start.isoformat(),
+                "fetched_at": now,
+                "last_access": now,
+                "size": path.stat().st_size,
+            }
+            self._removed.discard(key)
+            self._save_manifest()
+
+    def touch(self, ticker: str, interval: str = "1d") -> None:
+        """Mark an entry as refreshed without rewriting it (nothing new was available)."""
+        with self._lock:
+            entry = self._manifest.get(self._key(ticker, interval))
+            if entry is not None:
+                entry["fetched_at"] = time.time()
+                self._save_manifest()
+
+    def is_fresh(self, entry: dict[str, Any], interval: str = "1d") -> bool:
+        return time.time() - entry["fetched_at"] < self.ttl(interval)
+
+    def size(self) -> int:
+        """Return the total size in bytes of all cached files."""
+        with self._lock:
+            return sum(entry["size"] for entry in self._manifest.values())
+
+    def _evict(self) -> None:
+        # Caller holds the lock; drop least recently read entries until under budget
+        total = sum(entry["size"] for entry in self._manifest.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self._manifest.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            self._path(key).unlink(missing_ok=True)
+            del self._manifest[key]
+            self._removed.add(key)
+            total -= entry["size"]
+            logger.debug(f"Evicted {key} from price cache")
+
+
+class CachedPriceSource:
+    """Price source that serves history from a PriceCache and only fetches what is missing.
+
+    Missing history before the cached range is backfilled and a stale cache is
+    refreshed from its last bar onwards; tickers needing the same range are
+    fetched from the wrapped source together.
+    """
+
+    def __init__(self, source, cache: PriceCache | None = None):
+        self.source = source
+        self.cache = cache or PriceCache()
+
+    def fetch(
+        self, tickers: list[str], start: date, end: date | None = None, interval: str = "1d"
+    ) -> dict[str, pd.DataFrame]:
+        cached: dict[str, pd.DataFrame | None] = {}
+        covered: dict[str, date] = {}
+        # (fetch start, fetch end) -> tickers needing that range
+        plans: dict[tuple[date, date | None], list[str]] = defaultdict(list)
+
+        for ticker in tickers:
+            frame, entry = self.cache.read(ticker, interval)
+            cached[ticker] = frame
+            if frame is None:
+                plans[(start, end)].append(ticker)
+                continue
+
+            covered[ticker] = date.fromisoformat(entry["covered_start"])
+            if covered[ticker] > start:
+                plans[(start, covered[ticker])].append(ticker)
+
+            last_day = frame.index[-1].date() if not frame.empty else covered[ticker]
+            needs_newer = end is None or end > last_day + timedelta(days=1)
+            if needs_newer and not self.cache.is_fresh(entry, interval):
+                # Refetch the last bar too, it may have been partial
+                plans[(last_day, end)].append(ticker)
+
+        fetching = {ticker for group in plans.values() for ticker in group}
+        for ticker in tickers:
+            metrics.count_cache("prices", hit=ticker not in fetching)
+
+        for (fetch_start, fetch_end), group in plans.items():
+            logger.info(f"Fetching {len(group)} tickers from {fetch_start} (price cache miss)")
+            try:
+                fetched = self.source.fetch(group, fetch_start, fetch_end, interval)
+            except Exception as e:
+                if any(cached[ticker] is None for ticker in group):
+                    raise
+                logger.warning(f"Price refresh failed, serving cached data: {e}")
+                continue
+
+            for ticker in group:
+                new = fetched.get(ticker)
+                if new is not None and new.empty:
+                    new = None
+                if new is None and cached[ticker] is not None:
+                    if fetch_start >= covered[ticker]:
+                        self.cache.touch(ticker, interval)
+                        continue
+                try:
+                    merged = merge_frames(cached[ticker], new)
+                except Exception as e:
+                    # Keep serving the ticker: the fresh bars when they cover the request, else the cache
+                    logger.warning(f"Could not merge fetched {ticker} bars into the price cache: {e}")
+                    if fetch_start > start or new is None:
+                        continue
+                    merged, covered[ticker] = new, fetch_start
+                if merged is None:
+                    continue
+                covered[ticker] = min(fetch_start, covered.get(ticker, fetch_start))
+                self.cache.write(ticker, interval, merged, covered[ticker])
+                cached[ticker] = merged
+
+        return {
+            ticker: slice_dates(frame, start, end)
+            for ticker, frame in cached.items()
+            if frame is not None
+        }
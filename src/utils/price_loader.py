@@ -0,0 +1,277 @@
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import date, timedelta
+from typing import Any, Protocol
+
+import pandas as pd
+import yfinance as yf
+
+from src.utils import metrics, rate_limit
+from src.utils.cache_config import caching_enabled
+from src.utils.cross_section import DEFAULT_WINDOW_BARS, compute_cross_section
+from src.utils.http_session import get_yahoo_session, yahoo_ticker
+from src.utils.indicators import INDICATOR_LOOKBACK_DAYS, IndicatorEngine
+from src.utils.price_cache import (
+    INTRADAY_INTERVALS,
+    CachedPriceSource,
+    naive_index,
+    slice_dates,
+)
+from src.utils.price_series import PriceSeries
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# How long a prefetched batch may serve single-ticker requests
+DEFAULT_BATCH_TTL_SECONDS = 300.0
+
+
+class PriceDataSource(Protocol):
+    """Anything that can return daily OHLCV frames for several tickers at once."""
+
+    def fetch(
+        self, tickers: list[str], start: date, end: date | None = None, interval: str = "1d"
+    ) -> dict[str, pd.DataFrame]:
+        """Return one OHLCV frame per ticker covering [start, end).
+
+        Tickers without data may be missing from the result or map to an empty frame.
+        """
+        ...
+
+
+class YahooPriceSource:
+    """Price source backed by Yahoo Finance.
+
+    A single ticker uses ``Ticker.history``; several tickers are fetched in one
+    multi-ticker ``yf.download`` call. Daily bars come back with a naive index from
+    both paths, so a ticker's frames can be merged however it was fetched.
+    """
+
+    def fetch(
+        self, tickers: list[str], start: date, end: date | None = None, interval: str = "1d"
+    ) -> dict[str, pd.DataFrame]:
+        if not tickers:
+            return {}
+        end = end or date.today() + timedelta(days=1)
+
+        if len(tickers) == 1:
+            ticker = tickers[0]
+            hist = rate_limit.call("yahoo", self._history, ticker, start, end, interval)
+            return {ticker: naive_index(hist) if interval not in INTRADAY_INTERVALS else hist}
+
+        logger.info(f"Downloading price data for {len(tickers)} tickers in one request")
+        data = rate_limit.call("yahoo", self._download, tickers, start, end, interval)
+        frames = {}
+        if data is None or data.empty:
+            return frames
+        available = set(data.columns.get_level_values(0))
+        for ticker in tickers:
+            if ticker in available:
+                frames[ticker] = data[ticker][OHLCV_COLUMNS].dropna(how="all")
+        return frames
+
+    @staticmethod
+    def _history(ticker: str, start: date, end: date, interval: str) -> pd.DataFrame:
+        metrics.count("http.yahoo")
+        return yahoo_ticker(ticker).history(start=start, end=end, interval=interval)
+
+    @staticmethod
+    def _download(tickers: list[str], start: date, end: date, interval: str) -> pd.DataFrame:
+        metrics.count("http.yahoo")
+        return yf.download(
+            tickers, start=start, end=end, interval=interval, group_by="ticker",
+            auto_adjust=True, threads=True, progress=False, session=get_yahoo_session(),
+        )
+
+
+class DataFramePriceSource:
+    """Price source serving pre-loaded frames, e.g. recorded fixtures for tests and benchmarks."""
+
+    def __init__(self, frames: dict[str, pd.DataFrame]):
+        self.frames = {ticker.upper(): frame for ticker, frame in frames.items()}
+        self.calls: list[list[str]] = []
+
+    def fetch(
+        self, tickers: list[str], start: date, end: date | None = None, interval: str = "1d"
+    ) -> dict[str, pd.DataFrame]:
+        self.calls.append(list(tickers))
+        frames = {}
+        for ticker in tickers:
+            frame = self.frames.get(ticker.upper())
+            if frame is not None:
+                frames[ticker] = slice_dates(frame, start, end)
+        return frames
+
+
+class PriceLoader:
+    """Loads price history for many tickers with as few source calls as possible.
+
+    ``prefetch`` downloads a whole watchlist in one request and keeps it in memory
+    for ``batch_ttl`` seconds; ``load`` serves tickers from that batch and fetches
+    whatever is missing in a single additional call.
+    """
+
+    def __init__(
+        self,
+        source: PriceDataSource | None = None,
+        batch_ttl: float = DEFAULT_BATCH_TTL_SECONDS,
+        clock: Callable[[], date] = date.today,
+    ):
+        self.source = source or YahooPriceSource()
+        self.batch_ttl = batch_ttl
+        self.clock = clock
+        self.indicators = IndicatorEngine()
+        # ticker -> (frame, first requested date, monotonic fetch time)
+        self._batch: dict[str, tuple[pd.DataFrame, date, float]] = {}
+        # ticker -> (peer statistics, monotonic computation time)
+        self._peers: dict[str, tuple[dict[str, Any], float]] = {}
+        self._lock = threading.Lock()
+
+    def start_date(self, days: int) -> date:
+        """Return the first date of a window of ``days`` calendar days ending today."""
+        return self.clock() - timedelta(days=days)
+
+    def prefetch(self, tickers: Iterable[str], days: int = INDICATOR_LOOKBACK_DAYS) -> dict[str, pd.DataFrame]:
+        """Fetch all tickers in one source call and keep them for later ``load`` calls."""
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        start = self.start_date(days)
+        frames = self.source.fetch(tickers, start)
+        fetched_at = time.monotonic()
+        with self._lock:
+            for ticker, frame in frames.items():
+                if frame is not None and not frame.empty:
+                    self._batch[ticker] = (frame, start, fetched_at)
+        logger.info(f"Prefetched price data for {len(frames)} of {len(tickers)} tickers")
+        return frames
+
+    def compute_peers(
+        self, tickers: Iterable[str], benchmark: str | None = None, window: int = DEFAULT_WINDOW_BARS
+    ) -> dict[str, dict[str, Any]]:
+        """Compute the watchlist's cross-sectional statistics once and attach them to later payloads.
+
+        Frames come from the prefetched batch; the benchmark (and anything not
+        prefetched) is fetched in one additional call. Each ticker's statistics are
+        added to its ``get_price_data`` payload as ``peers`` for ``batch_ttl`` seconds.
+        """
+        tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        symbols = tickers + [benchmark] if benchmark and benchmark not in tickers else tickers
+        frames = self.load(symbols, INDICATOR_LOOKBACK_DAYS)
+        peers = compute_cross_section(frames, benchmark, window)
+        computed_at = time.monotonic()
+        with self._lock:
+            for ticker, stats in peers.items():
+                self._peers[ticker] = (stats, computed_at)
+        logger.info(f"Computed peer statistics for {len(peers)} of {len(tickers)} tickers")
+        return peers
+
+    def peers(self, ticker: str) -> dict[str, Any] | None:
+        """Return the peer statistics of the last ``compute_peers`` call for a ticker, if still fresh."""
+        with self._lock:
+            entry = self._peers.get(ticker.upper())
+            if entry is None:
+                return None
+            if time.monotonic() - entry[1] > self.batch_ttl:
+                del self._peers[ticker.upper()]
+                return None
+            return entry[0]
+
+    def clear(self) -> None:
+        """Forget any prefetched batch and peer statistics."""
+        with self._lock:
+            self._batch.clear()
+            self._peers.clear()
+
+    def _from_batch(self, ticker: str, start: date) -> pd.DataFrame | None:
+        with self._lock:
+            entry = self._batch.get(ticker.upper())
+            if entry is None:
+                return None
+            frame, batch_start, fetched_at = entry
+            if time.monotonic() - fetched_at > self.batch_ttl:
+                del self._batch[ticker.upper()]
+                return None
+        if batch_start > start:
+            return None
+        return slice_dates(frame, start)
+
+    def load(self, tickers: Iterable[str], days: int = 30) -> dict[str, pd.DataFrame]:
+        """Return non-empty OHLCV frames for the requested tickers.
+
+        Tickers already in the prefetched batch are served from memory; the rest are
+        fetched together in one source call. Tickers without data are omitted.
+        """
+        start = self.start_date(days)
+        frames = {}
+        missing = []
+        for ticker in dict.fromkeys(tickers):
+            frame = self._from_batch(ticker, start)
+            if frame is None:
+                missing.append(ticker)
+            else:
+                frames[ticker] = frame
+
+        if missing:
+            frames.update(self.source.fetch(missing, start))
+
+        return {
+            ticker: frame for ticker, frame in frames.items()
+            if frame is not None and not frame.empty
+        }
+
+    def get_price_series(self, ticker: str, days: int = 30) -> PriceSeries | None:
+        """Return the full-resolution columnar history of one ticker, or None if there is no data."""
+        with metrics.stage("price_fetch"):
+            frames = self.load([ticker], days)
+        if ticker not in frames:
+            return None
+        return PriceSeries.from_frame(ticker, frames[ticker])
+
+    def get_price_data(self, ticker: str, days: int = 30) -> dict[str, Any] | None:
+        """Return the price tool payload for one ticker, or None if there is no data.
+
+        The payload is the compact ``PriceSeries.summary`` (aggregates, returns, key
+        levels and a downsampled close series) of the last ``days`` days rather than
+        every daily bar, plus technical indicators computed over a longer lookback and,
+        after ``compute_peers``, the ticker's statistics relative to its watchlist.
+        """
+        series = self.get_price_series(ticker, max(days, INDICATOR_LOOKBACK_DAYS))
+        if series is None:
+            return None
+        window = series.since(self.start_date(days))
+        if len(window) == 0:
+            return None
+        payload = window.summary()
+        payload["indicators"] = self.indicators.indicators(series)
+        peers = self.peers(ticker)
+        if peers is not None:
+            payload["peers"] = peers
+        return payload
+
+
+_default_loader: PriceLoader | None = None
+_default_loader_lock = threading.Lock()
+
+
+def get_price_loader() -> PriceLoader:
+    """Return the process-wide price loader used by the price tool.
+
+    Unless caching is disabled, Yahoo responses go through the on-disk price cache.
+    """
+    global _default_loader
+    with _default_loader_lock:
+        if _default_loader is None:
+            source = YahooPriceSource()
+            if caching_enabled():
+                source = CachedPriceSource(source)
+            _default_loader = PriceLoader(source=source)
+        return _default_loader
+
+
+def set_price_loader(loader: PriceLoader | None) -> None:
+    """Replace the process-wide price loader (None restores the Yahoo-backed default)."""
+    global _default_loader
+    with _default_loader_lock:
+        _default_loader = loader
@@ -0,0 +1,143 @@
+from datetime import date
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Number of closes kept in the downsampled series given to the LLM
+DEFAULT_SUMMARY_POINTS = 8
+# Bars making up the "recent" window for short-term returns and key levels
+RECENT_BARS = 5
+
+
+def _round(value: float, digits: int = 2) -> float | None:
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+def _pct_change(new: float, old: float) -> float | None:
+    return _round((new / old - 1.0) * 100.0) if old else None
+
+
+class PriceSeries:
+    """Struct-of-arrays view of one ticker's OHLCV history.
+
+    Each column is a NumPy array taken from the source frame without copying, so
+    code-level consumers get full-resolution data at no extra cost. ``summary``
+    condenses the series into the small payload given to the LLM.
+    """
+
+    __slots__ = ("ticker", "dates", "open", "high", "low", "close", "volume")
+
+    def __init__(
+        self,
+        ticker: str,
+        dates: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+    ):
+        self.ticker = ticker
+        self.dates = dates
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def from_frame(cls, ticker: str, frame: pd.DataFrame) -> "PriceSeries":
+        """Wrap the columns of an OHLCV frame (Open, High, Low, Close, Volume)."""
+        index = pd.DatetimeIndex(frame.index)
+        if index.tz is not None:
+            # Keep exchange-local dates, as Yahoo timestamps daily bars at local midnight
+            index = index.tz_localize(None)
+        return cls(
+            ticker=ticker,
+            dates=index.to_numpy(),
+            open=frame["Open"].to_numpy(),
+            high=frame["High"].to_numpy(),
+            low=frame["Low"].to_numpy(),
+            close=frame["Close"].to_numpy(),
+            volume=frame["Volume"].to_numpy(),
+        )
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def since(self, start: date) -> "PriceSeries":
+        """Return the bars on or after ``start`` as views of this series' arrays."""
+        first = int(np.searchsorted(self.dates, np.datetime64(start, "ns")))
+        return PriceSeries(
+            self.ticker, self.dates[first:], self.open[first:], self.high[first:],
+            self.low[first:], self.close[first:], self.volume[first:],
+        )
+
+    def date_strings(self, indices: np.ndarray | None = None) -> list[str]:
+        dates = self.dates if indices is None else self.dates[indices]
+        return [str(day) for day in dates.astype("datetime64[D]")]
+
+    def _date(self, index: int) -> str:
+        return str(self.dates[index].astype("datetime64[D]"))
+
+    def columns(self) -> dict[str, list]:
+        """Return the full series as plain Python lists, one per column."""
+        return {
+            "date": self.date_strings(),
+            "open": self.open.tolist(),
+            "high": self.high.tolist(),
+            "low": self.low.tolist(),
+            "close": self.close.tolist(),
+            "volume": np.nan_to_num(self.volume.astype(float)).astype(np.int64).tolist(),
+        }
+
+    def summary(self, points: int = DEFAULT_SUMMARY_POINTS) -> dict[str, Any]:
+        """Summarize the series for a prompt: aggregates, returns, key levels and a few closes.
+
+        Args:
+            points: Maximum number of (date, close) pairs in the downsampled series
+
+        Returns:
+            Dict of plain Python values, or just the ticker and bar count for an empty series
+        """
+        bars = len(self)
+        if bars == 0:
+            return {"ticker": self.ticker, "bars": 0}
+
+        close = self.close.astype(float)
+        high_index = int(np.nanargmax(self.high))
+        low_index = int(np.nanargmin(self.low))
+        recent = slice(-min(RECENT_BARS, bars), None)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            daily_returns = np.diff(np.log(close))
+        volume = np.nan_to_num(self.volume.astype(float))
+        # Evenly spaced closes, always including the first and the last bar
+        sampled = np.unique(np.linspace(0, bars - 1, num=min(points, bars)).round().astype(int))
+
+        return {
+            "ticker": self.ticker,
+            "start": self._date(0),
+            "end": self._date(-1),
+            "bars": bars,
+            "open": _round(self.open[0]),
+            "close": _round(close[-1]),
+            "high": _round(self.high[high_index]),
+            "high_date": self._date(high_index),
+            "low": _round(self.low[low_index]),
+            "low_date": self._date(low_index),
+            "change_pct": _pct_change(close[-1], close[0]),
+            "return_1d_pct": _pct_change(close[-1], close[-2]) if bars > 1 else None,
+            f"return_{RECENT_BARS}d_pct": _pct_change(close[-1], close[-RECENT_BARS - 1]) if bars > RECENT_BARS else None,
+            "moving_average": _round(np.nanmean(close), 4),
+            "volatility": _round(np.nanstd(close, ddof=1), 4) if bars > 1 else None,
+            "daily_return_volatility_pct": _round(np.nanstd(daily_returns, ddof=1) * 100) if bars > 2 else None,
+            "recent_high": _round(np.nanmax(self.high[recent])),
+            "recent_low": _round(np.nanmin(self.low[recent])),
+            "avg_volume": int(volume.mean()),
+            "last_volume": int(volume[-1]),
+            "closes": {
+                "date": self.date_strings(sampled),
+                "close": [_round(value) for value in close[sampled]],
+            },
+        }
@@ -0,0 +1,310 @@
+import logging
+import math
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Literal, TypeVar
+
+from src.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Requests per second (and burst size) per provider; Brave's free tier allows one per
+# second, OpenAI's first tier a few hundred per minute, Yahoo throttles bursts
+DEFAULT_LIMITS: dict[str, tuple[float, float]] = {
+    "yahoo": (4.0, 8.0),
+    "brave": (1.0, 1.0),
+    "llm": (8.0, 8.0),
+}
+# Overrides a provider's rate, e.g. TICKER_ANALYZER_RATE_LLM=20
+RATE_ENV_PREFIX = "TICKER_ANALYZER_RATE_"
+# A throttled provider's rate is multiplied by this factor, but never below rate * MIN_RATE_FRACTION
+THROTTLE_FACTOR = 0.5
+MIN_RATE_FRACTION = 0.05
+# Each success adds back this fraction of the configured rate
+RECOVERY_FRACTION = 0.05
+
+Outcome = Literal["throttled", "transient", "fatal"]
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket whose rate adapts to the provider's limits.
+
+    Callers block in ``acquire`` until a token is available, so concurrent workers
+    share one request budget. ``throttled`` halves the rate when the provider pushes
+    back, and every ``succeeded`` call raises it again additively up to the
+    configured rate (AIMD), settling near the highest sustainable throughput.
+    A rate of ``math.inf`` never waits.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take one token, waiting for it if needed; returns the seconds waited."""
+        if self.rate == math.inf:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                wait = (1.0 - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+    def throttled(self) -> None:
+        with self._lock:
+            self._refill()
+            self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate * THROTTLE_FACTOR)
+            # Drop the burst allowance so waiting callers really slow down
+            self._tokens = min(self._tokens, 0.0)
+        logger.warning(f"Provider throttled; reducing the request rate to {self.rate:.2f}/s")
+
+    def succeeded(self) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_FRACTION)
+
+
+class CircuitBreaker:
+    """Stops calling a provider after repeated failures and probes it again later.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and calls fail
+    fast for ``reset_timeout`` seconds. Then a single trial call is let through
+    (half-open): its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(
+        self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> Literal["closed", "open", "half-open"]:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if self._clock() - self._opened_at >= self.reset_timeout else "open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if self._clock() - self._opened_at < self.reset_timeout or self._trial_running:
+                raise CircuitOpenError("circuit open")
+            self._trial_running = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_running = False
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter: attempt n waits a random time up to base * 2**n."""
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int, rng: random.Random) -> float:
+        return rng.uniform(0.0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+def _status_code(exc: BaseException) -> int | None:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def classify(exc: BaseException) -> Outcome:
+    """Tell whether a failed call was throttled, may succeed when retried, or is final.
+
+    Works on requests, litellm/OpenAI and yfinance errors without importing them:
+    HTTP statuses come from ``status_code`` or ``response.status_code``, and
+    yfinance's rate limit error is recognized by name and message.
+    """
+    status = _status_code(exc)
+    message = str(exc).lower()
+    if status == 429 or type(exc).__name__ in ("YFRateLimitError", "RateLimitError") \
+            or "too many requests" in message or "rate limit" in message:
+        return "throttled"
+    if status is not None:
+        return "transient" if status >= 500 or status == 408 else "fatal"
+    if isinstance(exc, TimeoutError | ConnectionError) or type(exc).__name__ in (
+        "Timeout", "ConnectTimeout", "ReadTimeout", "ConnectionError", "APIConnectionError", "APITimeoutError",
+    ):
+        return "transient"
+    return "fatal"
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    """Return the delay requested by a Retry-After header, if the error carries one."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    value = headers.get("Retry-After") if hasattr(headers, "get") else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class Provider:
+    """Rate limit, retry policy and circuit breaker guarding one external service."""
+
+    def __init__(
+        self,
+        name: str,
+        bucket: TokenBucket,
+        breaker: CircuitBreaker | None = None,
+        retry: RetryPolicy | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: random.Random | None = None,
+    ):
+        self.name = name
+        self.bucket = bucket
+        self.breaker = breaker or CircuitBreaker()
+        self.retry = retry or RetryPolicy()
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call ``func`` within the provider's limits, retrying throttled and transient failures.
+
+        Raises:
+            CircuitOpenError: If the provider has been failing and is not probed yet
+            Exception: The last error once retries are exhausted, or any final error
+        """
+        attempts = max(1, self.retry.max_attempts)
+        for attempt in range(attempts):
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError:
+                metrics.count(f"circuit_open.{self.name}")
+                raise CircuitOpenError(f"{self.name} is failing; not calling it for now") from None
+            self.bucket.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                outcome = classify(e)
+                if outcome == "fatal":
+                    # The provider answered; the request itself was wrong
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if outcome == "throttled":
+                    metrics.count(f"throttled.{self.name}")
+                    self.bucket.throttled()
+                if attempt + 1 >= attempts or self.breaker.state == "open":
+                    raise
+                delay = _retry_after(e) if outcome == "throttled" else None
+                if delay is None:
+                    delay = self.retry.delay(attempt, self._rng)
+                metrics.count(f"retry.{self.name}")
+                logger.info(f"{self.name} call failed ({outcome}: {e}); retrying in {delay:.2f}s")
+                self._sleep(delay)
+                continue
+            self.breaker.record_success()
+            self.bucket.succeeded()
+            return result
+        raise AssertionError("unreachable")
+
+
+def _default_provider(name: str) -> Provider:
+    rate, capacity = DEFAULT_LIMITS.get(name, (1.0, 1.0))
+    override = os.environ.get(f"{RATE_ENV_PREFIX}{name.upper()}")
+    if override:
+        try:
+            value = float(override)
+        except ValueError:
+            value = math.nan
+        # A rate of zero or less (or NaN) would never refill the bucket
+        if value > 0:
+            rate, capacity = value, max(1.0, value)
+        else:
+            logger.warning(f"Ignoring invalid {RATE_ENV_PREFIX}{name.upper()}={override!r}; rates must be positive")
+    return Provider(name, TokenBucket(rate, capacity))
+
+
+_providers: dict[str, Provider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(name: str) -> Provider:
+    """Return the process-wide limiter of a provider ('yahoo', 'brave' or 'llm')."""
+    with _providers_lock:
+        provider = _providers.get(name)
+        if provider is None:
+            provider = _providers[name] = _default_provider(name)
+        return provider
+
+
+def set_provider(name: str, provider: Provider | None) -> None:
+    """Replace a provider's limiter (None restores the default on next use)."""
+    with _providers_lock:
+        if provider is None:
+            _providers.pop(name, None)
+        else:
+            _providers[name] = provider
+
+
+def reset_providers() -> None:
+    """Forget every limiter, e.g. between tests."""
+    with _providers_lock:
+        _providers.clear()
+
+
+def call(name: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call ``func`` through the shared limiter of provider ``name``."""
+    return get_provider(name).call(func, *args, **kwargs)
@@ -0,0 +1,91 @@
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+ACTIONS = ("Buy", "Sell", "Hold")
+
+_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Recommendation:
+    """Final Buy/Sell/Hold call produced by the recommendation agent."""
+    ticker: str
+    action: str
+    explanation: str
+    references: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def json_objects(text: str):
+    """Yield every top-level JSON object embedded in ``text``, fenced blocks first."""
+    decoder = json.JSONDecoder()
+    candidates = [match.group(1) for match in _FENCE_PATTERN.finditer(text)] + [text]
+    for candidate in candidates:
+        start = candidate.find("{")
+        while start != -1:
+            try:
+                value, end = decoder.raw_decode(candidate, start)
+            except json.JSONDecodeError:
+                start = candidate.find("{", start + 1)
+                continue
+            if isinstance(value, dict):
+                yield value
+            start = candidate.find("{", end)
+
+
+def _references(value: Any) -> list[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    references = []
+    for item in value if isinstance(value, list) else [value]:
+        if isinstance(item, dict):
+            item = item.get("url") or item.get("link") or item.get("title") or json.dumps(item)
+        references.append(str(item))
+    return references
+
+
+def recommendation_from_dict(data: dict[str, Any], ticker: str | None = None) -> Recommendation:
+    """Build a Recommendation from the agent's JSON object.
+
+    Keys are matched case-insensitively and the action is normalized to Buy/Sell/Hold.
+
+    Raises:
+        ValueError: If the action is missing or not one of Buy/Sell/Hold
+    """
+    data = {str(key).lower(): value for key, value in data.items()}
+    action = str(data.get("action") or data.get("recommendation") or "").strip().capitalize()
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown recommendation action: {action or 'missing'}")
+    return Recommendation(
+        ticker=str(data.get("ticker") or ticker or "").upper(),
+        action=action,
+        explanation=str(data.get("explanation") or "").strip(),
+        references=_references(data.get("references")),
+    )
+
+
+def parse_recommendation(text: str, ticker: str | None = None) -> Recommendation | None:
+    """Extract the recommendation JSON from an LLM answer.
+
+    The object may be bare, wrapped in a Markdown code fence, or surrounded by prose;
+    the first object with a valid action wins.
+
+    Args:
+        text: Raw answer of the recommendation task
+        ticker: Ticker used when the object does not name one
+
+    Returns:
+        The parsed Recommendation, or None if the text contains no valid one
+    """
+    for data in json_objects(text or ""):
+        try:
+            return recommendation_from_dict(data, ticker)
+        except ValueError:
+            continue
+    return None
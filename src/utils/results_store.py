@@ -0,0 +1,326 @@
+import csv
+import json
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any
+
+from src.utils.cache_config import get_cache_dir
+from src.utils.digest import key_numbers
+from src.utils.events import (
+    AnalysisEvent,
+    AnalysisFinished,
+    EventCallback,
+    NewsItems,
+    PriceSummary,
+    Screened,
+    SentimentScore,
+)
+
+# Columns of the bulk CSV export; nested values are written as JSON
+EXPORT_COLUMNS = (
+    "id", "ticker", "finished_at", "success", "error", "action", "explanation",
+    "references", "price", "news", "sentiment", "screening",
+)
+
+_SELECT = (
+    "SELECT id, ticker, finished_at, success, error, action, explanation, refs, price, news, sentiment, screening "
+    "FROM results"
+)
+
+
+@dataclass
+class StoredResult:
+    """One finished analysis as kept in the results store.
+
+    Attributes:
+        ticker: The validated ticker symbol
+        finished_at: UNIX time at which the analysis finished
+        success: Whether the analysis succeeded
+        error: Error message of a failed analysis
+        action: Buy/Sell/Hold, or None without a valid recommendation
+        explanation: The recommendation's explanation
+        references: The recommendation's sources
+        price: Period and key numbers of the price summary (None without price data)
+        news: Distinct news items found, as dicts with 'title' and 'url'
+        sentiment: Local sentiment score of the headlines (None when not scored)
+        screening: Triggered rules and measurements when the ticker was screened
+        id: Row id, assigned when stored
+    """
+    ticker: str
+    finished_at: float
+    success: bool
+    error: str | None = None
+    action: str | None = None
+    explanation: str = ""
+    references: list[str] = field(default_factory=list)
+    price: dict[str, Any] | None = None
+    news: list[dict[str, str]] = field(default_factory=list)
+    sentiment: float | None = None
+    screening: dict[str, Any] | None = None
+    id: int | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_events(cls, events: Iterable[AnalysisEvent]) -> "StoredResult | None":
+        """Build the result of one analysis from its events (None before AnalysisFinished)."""
+        price = sentiment = screening = finished = None
+        news: dict[str, dict[str, str]] = {}
+        for event in events:
+            if isinstance(event, PriceSummary):
+                price = {
+                    "period": f"{event.summary.get('start')} to {event.summary.get('end')}",
+                    **key_numbers(event.summary),
+                }
+            elif isinstance(event, NewsItems):
+                for article in event.articles:
+                    url = str(article.get("url") or "")
+                    news.setdefault(url, {"title": str(article.get("title") or ""), "url": url})
+            elif isinstance(event, SentimentScore):
+                sentiment = event.score
+            elif isinstance(event, Screened):
+                screening = {"triggered": event.triggered, "measurements": event.measurements}
+            elif isinstance(event, AnalysisFinished):
+                finished = event
+        if finished is None:
+            return None
+        recommendation = finished.recommendation
+        return cls(
+            ticker=finished.ticker,
+            finished_at=finished.timestamp,
+            success=finished.success,
+            error=finished.error,
+            action=recommendation.action if recommendation else None,
+            explanation=recommendation.explanation if recommendation else "",
+            references=list(recommendation.references) if recommendation else [],
+            price=price,
+            news=list(news.values()),
+            sentiment=sentiment,
+            screening=screening,
+        )
+
+
+def _loads(value: str | None) -> Any:
+    return json.loads(value) if value is not None else None
+
+
+class ResultsStore:
+    """Indexed SQLite store of finished analyses.
+
+    Every run is one row, indexed by ticker and finish time and by action and finish
+    time, so "latest recommendation per ticker" and "all Sell calls since Monday"
+    are index lookups. Rows are only appended, never updated.
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else get_cache_dir("results") / "results.sqlite3"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "id INTEGER PRIMARY KEY, ticker TEXT NOT NULL, finished_at REAL NOT NULL, success INTEGER NOT NULL, "
+            "error TEXT, action TEXT, explanation TEXT, refs TEXT, price TEXT, news TEXT, sentiment REAL, "
+            "screening TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_ticker_time ON results (ticker, finished_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_action_time ON results (action, finished_at)")
+        self._conn.commit()
+
+    def add(self, result: StoredResult) -> int:
+        """Store a result and return its row id."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO results (ticker, finished_at, success, error, action, explanation, refs, price, news, "
+                "sentiment, screening) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    result.ticker, result.finished_at, int(result.success), result.error, result.action,
+                    result.explanation, json.dumps(result.references),
+                    json.dumps(result.price) if result.price is not None else None,
+                    json.dumps(result.news), result.sentiment,
+                    json.dumps(result.screening, default=str) if result.screening is not None else None,
+                ),
+            )
+            self._conn.commit()
+            result.id = cursor.lastrowid
+            return cursor.lastrowid
+
+    @staticmethod
+    def _result(row: tuple) -> StoredResult:
+        return StoredResult(
+            id=row[0], ticker=row[1], finished_at=row[2], success=bool(row[3]), error=row[4], action=row[5],
+            explanation=row[6] or "", references=_loads(row[7]) or [], price=_loads(row[8]),
+            news=_loads(row[9]) or [], sentiment=row[10], screening=_loads(row[11]),
+        )
+
+    def query(
+        self,
+        ticker: str | None = None,
+        action: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        successful_only: bool = False,
+        limit: int | None = None,
+    ) -> list[StoredResult]:
+        """Return stored results matching every given filter, newest first.
+
+        Args:
+            ticker: Only this ticker
+            action: Only this recommendation action (Buy/Sell/Hold)
+            since: Only results finished at or after this UNIX time
+            until: Only results finished before this UNIX time
+            successful_only: Skip failed analyses
+            limit: Maximum number of results
+        """
+        clauses, params = [], []
+        for clause, value in (
+            ("ticker = ?", ticker.upper() if ticker else None),
+            ("action = ?", action.capitalize() if action else None),
+            ("finished_at >= ?", since),
+            ("finished_at < ?", until),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        if successful_only:
+            clauses.append("success = 1")
+        sql = _SELECT + (" WHERE " + " AND ".join(clauses) if clauses else "") + " ORDER BY finished_at DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._result(row) for row in rows]
+
+    def latest(self, tickers: Iterable[str] | None = None) -> dict[str, StoredResult]:
+        """Return the latest recommendation of every ticker (or only of ``tickers``).
+
+        Only results carrying an action count, so a later failed run does not hide
+        the last recommendation.
+        """
+        sql = (
+            _SELECT + " WHERE id IN (SELECT ("
+            "SELECT id FROM results AS r WHERE r.ticker = t.ticker AND r.action IS NOT NULL "
+            "ORDER BY r.finished_at DESC, r.id DESC LIMIT 1) FROM (SELECT DISTINCT ticker FROM results) AS t)"
+        )
+        params: list[Any] = []
+        if tickers is not None:
+            wanted = [ticker.upper() for ticker in tickers]
+            if not wanted:
+                return {}
+            sql += f" AND ticker IN ({', '.join('?' for _ in wanted)})"
+            params.extend(wanted)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY ticker", params).fetchall()
+        return {result.ticker: result for result in map(self._result, rows)}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def iter_all(self, batch_size: int = 1000) -> Iterator[StoredResult]:
+        """Yield every stored result in insertion order, fetching ``batch_size`` rows at a time."""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    _SELECT + " WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._result(row)
+            last_id = rows[-1][0]
+
+    def export(self, out: IO[str], fmt: str = "jsonl", results: Iterable[StoredResult] | None = None) -> int:
+        """Write results (every stored one by default) as JSON lines or CSV and return how many.
+
+        Raises:
+            ValueError: If ``fmt`` is neither 'jsonl' nor 'csv'
+        """
+        if fmt not in ("jsonl", "csv"):
+            raise ValueError(f"Unknown export format: {fmt}")
+        results = self.iter_all() if results is None else results
+        writer = csv.DictWriter(out, fieldnames=EXPORT_COLUMNS) if fmt == "csv" else None
+        if writer is not None:
+            writer.writeheader()
+        count = 0
+        for result in results:
+            data = result.to_dict()
+            if writer is None:
+                out.write(json.dumps(data, default=str) + "\n")
+            else:
+                writer.writerow({
+                    column: json.dumps(data[column], default=str) if isinstance(data[column], list | dict) else data[column]
+                    for column in EXPORT_COLUMNS
+                })
+            count += 1
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResultsRecorder:
+    """Event callback storing every analysis in a ResultsStore once it finishes.
+
+    Events are collected per ticker (callbacks may come from several worker
+    threads); AnalysisFinished turns them into one stored row.
+    """
+
+    def __init__(self, store: ResultsStore):
+        self.store = store
+        self._pending: dict[str, list[AnalysisEvent]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: AnalysisEvent) -> None:
+        with self._lock:
+            collected = self._pending.setdefault(event.ticker, [])
+            collected.append(event)
+            if not isinstance(event, AnalysisFinished):
+                return
+            del self._pending[event.ticker]
+        result = StoredResult.from_events(collected)
+        if result is not None:
+            self.store.add(result)
+
+
+@contextmanager
+def recording_results(path: str | Path | None) -> Iterator[EventCallback | None]:
+    """Yield a callback storing every finished analysis in the store at ``path`` (None without a path)."""
+    if not path:
+        yield None
+        return
+    store = ResultsStore(path)
+    try:
+        yield ResultsRecorder(store)
+    finally:
+        store.close()
+
+
+def combine_callbacks(*callbacks: EventCallback | None) -> EventCallback | None:
+    """Return one callback calling every given one (None when none is given)."""
+    active = [callback for callback in callbacks if callback is not None]
+    if len(active) <= 1:
+        return active[0] if active else None
+
+    def combined(event: AnalysisEvent) -> None:
+        for callback in active:
+            callback(event)
+    return combined
+
+
+def parse_time(value: str) -> float:
+    """Parse an ISO date or date-time (local time) into a UNIX time.
+
+    Raises:
+        ValueError: If the value is not an ISO date or date-time
+    """
+    return datetime.fromisoformat(value).timestamp()
+
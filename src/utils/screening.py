@@ -0,0 +1,192 @@
+import json
+import logging
+import math
+import re
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from src.utils.recommendation import Recommendation
+
+if TYPE_CHECKING:
+    from src.utils.news_cache import NewsSearchCache
+    from src.utils.price_loader import PriceLoader
+    from src.utils.price_series import PriceSeries
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ScreenRules:
+    """Thresholds deciding whether a ticker is interesting enough for the full crew.
+
+    A ticker gets the crew as soon as one rule triggers; a rule whose threshold is
+    None is skipped. Moves are absolute percentages, spikes are ratios of the
+    recent bars to the rest of the lookback.
+    """
+    days: int = 30
+    min_change_pct: float | None = 8.0
+    min_daily_move_pct: float | None = 3.0
+    volatility_spike_ratio: float | None = 1.5
+    volume_spike_ratio: float | None = 2.0
+    min_news_count: int | None = 5
+    recent_bars: int = 5
+    news_query: str = "{ticker} stock news"
+    news_results: int = 10
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ScreenRules":
+        """Build rules from a dict of overrides.
+
+        Raises:
+            ValueError: If a key is not one of the rule fields
+        """
+        known = {f.name for f in fields(cls)}
+        unknown = sorted(set(data) - known)
+        if unknown:
+            raise ValueError(f"Unknown screening rule(s): {', '.join(unknown)}")
+        return cls(**data)
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "ScreenRules":
+        """Load rule overrides from a JSON object file."""
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+@dataclass(frozen=True)
+class ScreenResult:
+    """Outcome of screening one ticker; ``triggered`` names the rules that fired."""
+    ticker: str
+    needs_analysis: bool
+    triggered: list[str] = field(default_factory=list)
+    measurements: dict[str, float | int | None] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _round(value: float | None, digits: int = 2) -> float | None:
+    return None if value is None or not math.isfinite(value) else round(float(value), digits)
+
+
+def measure_prices(series: "PriceSeries", window: "PriceSeries", recent_bars: int) -> dict[str, float | None]:
+    """Compute the price-based screening measurements.
+
+    Args:
+        series: The whole lookback, used as the baseline for the spike ratios
+        window: The bars of the screening window, used for the price change
+        recent_bars: Number of latest bars compared against the baseline
+
+    Returns:
+        change_pct, daily_move_pct, volatility_ratio and volume_ratio (None when there are too few bars)
+    """
+    import numpy as np
+
+    close = series.close.astype(float)
+    window_close = window.close.astype(float)
+    volume = np.nan_to_num(series.volume.astype(float))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.diff(np.log(close))
+        change = window_close[-1] / window_close[0] - 1.0 if len(window_close) > 1 else None
+        daily_move = close[-1] / close[-2] - 1.0 if len(close) > 1 else None
+
+        volatility_ratio = None
+        if len(returns) >= recent_bars + 2:
+            recent, baseline = returns[-recent_bars:], returns[:-recent_bars]
+            volatility_ratio = np.nanstd(recent, ddof=1) / np.nanstd(baseline, ddof=1)
+
+        volume_ratio = None
+        if len(volume) > 1:
+            volume_ratio = volume[-1] / volume[:-1].mean()
+
+    return {
+        "change_pct": _round(change * 100.0) if change is not None else None,
+        "daily_move_pct": _round(daily_move * 100.0) if daily_move is not None else None,
+        "volatility_ratio": _round(volatility_ratio),
+        "volume_ratio": _round(volume_ratio),
+    }
+
+
+def count_news(ticker: str, rules: ScreenRules, news_cache: "NewsSearchCache | None" = None) -> int | None:
+    """Count the distinct articles mentioning ``ticker``, or None if the search failed.
+
+    The search goes through the shared news cache, so its results are reused by the
+    crew's news agent when it runs the same query.
+    """
+    try:
+        if news_cache is None:
+            from src.utils.news_cache import get_news_cache
+
+            news_cache = get_news_cache()
+        articles = news_cache.search(rules.news_query.format(ticker=ticker), rules.news_results)
+    except Exception as e:
+        logger.warning(f"News count for screening {ticker} unavailable: {e}")
+        return None
+    mention = re.compile(rf"\b{re.escape(ticker)}\b", re.IGNORECASE)
+    return sum(1 for article in articles if mention.search(f"{article.title} {article.description}"))
+
+
+def _triggered(measurements: dict[str, Any], rules: ScreenRules) -> list[str]:
+    checks = [
+        ("price_change", abs, "change_pct", rules.min_change_pct),
+        ("daily_move", abs, "daily_move_pct", rules.min_daily_move_pct),
+        ("volatility_spike", None, "volatility_ratio", rules.volatility_spike_ratio),
+        ("volume_spike", None, "volume_ratio", rules.volume_spike_ratio),
+        ("news_count", None, "news_count", rules.min_news_count),
+    ]
+    triggered = []
+    for rule, transform, key, threshold in checks:
+        value = measurements.get(key)
+        if threshold is None or value is None:
+            continue
+        if (transform(value) if transform else value) >= threshold:
+            triggered.append(rule)
+    return triggered
+
+
+def screen_ticker(
+    ticker: str,
+    rules: ScreenRules | None = None,
+    loader: "PriceLoader | None" = None,
+    news_cache: "NewsSearchCache | None" = None,
+) -> ScreenResult:
+    """Decide from numbers alone whether a ticker needs the full crew.
+
+    Price data comes from the shared price loader (a prefetched batch serves a whole
+    watchlist), so screening costs no LLM call. The news search only runs when no
+    price rule fired. Tickers without price data, or whose prices could not be
+    loaded, are always passed on to the crew.
+    """
+    from src.utils.indicators import INDICATOR_LOOKBACK_DAYS
+    from src.utils.price_loader import get_price_loader
+
+    rules = rules or ScreenRules()
+    loader = loader or get_price_loader()
+    try:
+        series = loader.get_price_series(ticker, max(rules.days, INDICATOR_LOOKBACK_DAYS))
+    except Exception as e:
+        logger.warning(f"Could not load prices to screen {ticker}: {e}")
+        return ScreenResult(ticker, needs_analysis=True, triggered=["price_error"])
+    window = series.since(loader.start_date(rules.days)) if series is not None else None
+    if series is None or len(window) == 0:
+        return ScreenResult(ticker, needs_analysis=True, triggered=["no_price_data"])
+
+    measurements: dict[str, float | int | None] = measure_prices(series, window, rules.recent_bars)
+    triggered = _triggered(measurements, rules)
+    if not triggered and rules.min_news_count is not None:
+        measurements["news_count"] = count_news(ticker, rules, news_cache)
+        triggered = _triggered(measurements, rules)
+    return ScreenResult(ticker, needs_analysis=bool(triggered), triggered=triggered, measurements=measurements)
+
+
+def fast_hold(result: ScreenResult) -> Recommendation:
+    """Return the rule-based Hold given to a ticker that was screened out."""
+    described = ", ".join(
+        f"{name.replace('_', ' ')} {value}" for name, value in result.measurements.items() if value is not None
+    )
+    return Recommendation(
+        ticker=result.ticker,
+        action="Hold",
+        explanation=f"No screening rule triggered ({described}); no significant price, volatility, volume or news activity.",
+    )
@@ -0,0 +1,163 @@
+import logging
+import re
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from textblob import TextBlob
+
+logger = logging.getLogger(__name__)
+
+# Scores closer to zero than this are ambiguous and may be sent to the LLM
+DEFAULT_NEUTRAL_BAND = 0.15
+# Weight of TextBlob's general-language polarity next to the finance lexicon
+DEFAULT_TEXTBLOB_WEIGHT = 0.25
+# Normalization constant: score = x / sqrt(x^2 + alpha), as in VADER
+_ALPHA = 4.0
+# A negator flips the polarity of lexicon words within this many following tokens
+_NEGATION_WINDOW = 3
+
+FINANCE_LEXICON: dict[str, float] = {
+    # Positive
+    "beat": 1.5, "beats": 1.5, "surge": 2.0, "surges": 2.0, "surged": 2.0, "soar": 2.0,
+    "soars": 2.0, "soared": 2.0, "rally": 1.5, "rallies": 1.5, "rallied": 1.5, "jump": 1.2,
+    "jumps": 1.2, "jumped": 1.2, "gain": 1.0, "gains": 1.0, "gained": 1.0, "rise": 0.8,
+    "rises": 0.8, "rose": 0.8, "record": 1.0, "upgrade": 2.0, "upgrades": 2.0, "upgraded": 2.0,
+    "outperform": 1.5, "outperforms": 1.5, "overweight": 1.0, "buy": 0.8, "bullish": 2.0,
+    "growth": 1.0, "profit": 1.0, "profitable": 1.2, "raises": 1.0, "raised": 1.0,
+    "strong": 1.2, "stronger": 1.2, "robust": 1.2, "exceeds": 1.5, "exceeded": 1.5,
+    "tops": 1.2, "topped": 1.2, "boost": 1.2, "boosts": 1.2, "approval": 1.5, "approved": 1.5,
+    "dividend": 0.5, "buyback": 1.0, "expands": 0.8, "partnership": 0.8, "breakthrough": 1.8,
+    "momentum": 0.8, "recovery": 1.0, "rebound": 1.2, "rebounds": 1.2, "optimism": 1.2,
+    "optimistic": 1.2,
+    # Negative
+    "miss": -1.5, "misses": -1.5, "missed": -1.5, "plunge": -2.2, "plunges": -2.2,
+    "plunged": -2.2, "tumble": -2.0, "tumbles": -2.0, "tumbled": -2.0, "slump": -1.8,
+    "slumps": -1.8, "sink": -1.5, "sinks": -1.5, "sank": -1.5, "fall": -1.0, "falls": -1.0,
+    "fell": -1.0, "drop": -1.0, "drops": -1.0, "dropped": -1.0, "decline": -1.0,
+    "declines": -1.0, "declined": -1.0, "loss": -1.2, "losses": -1.2, "downgrade": -2.0,
+    "downgrades": -2.0, "downgraded": -2.0, "underperform": -1.5, "underweight": -1.0,
+    "sell": -0.8, "bearish": -2.0, "weak": -1.2, "weaker": -1.2, "warning": -1.5,
+    "warns": -1.5, "cut": -1.0, "cuts": -1.0, "layoffs": -1.5, "lawsuit": -1.5, "probe": -1.5,
+    "investigation": -1.5, "fraud": -2.5, "recall": -1.5, "bankruptcy": -3.0, "defaults": -2.0,
+    "delay": -1.0, "delays": -1.0, "delayed": -1.0, "fined": -1.5,
+    "halt": -1.5, "halts": -1.5, "volatile": -0.5, "volatility": -0.5, "slowdown": -1.2,
+    "recession": -2.0, "selloff": -2.0, "crash": -2.8, "pessimism": -1.2, "pessimistic": -1.2,
+    "concern": -0.8, "concerns": -0.8, "risk": -0.5, "risks": -0.5,
+}
+NEGATORS = frozenset({"not", "no", "never", "without", "fails", "failed", "fail", "isn't", "wasn't", "didn't", "don't", "doesn't"})
+
+_TOKEN_PATTERN = re.compile(r"[a-z']+")
+
+
+@dataclass
+class SentimentBatch:
+    """Local sentiment scores for a batch of texts.
+
+    Attributes:
+        texts: The scored texts, in input order
+        scores: Score per text from -1.0 (very negative) to 1.0 (very positive)
+        lexicon_hits: Number of finance lexicon words found in each text
+        ambiguous: True where the local score is too weak to trust without the LLM
+    """
+    texts: list[str]
+    scores: np.ndarray
+    lexicon_hits: np.ndarray
+    ambiguous: np.ndarray
+
+    @property
+    def overall(self) -> float:
+        """Mean score of the batch, weighting each text by its lexicon evidence."""
+        if len(self.scores) == 0:
+            return 0.0
+        weights = 1.0 + self.lexicon_hits
+        return float(np.average(self.scores, weights=weights))
+
+
+class SentimentScorer:
+    """Deterministic finance-aware sentiment scorer for headlines and snippets.
+
+    Texts are tokenized once into a dense (text x lexicon word) matrix of signed
+    counts; a single matrix-vector product then scores the whole batch. TextBlob's
+    general polarity is blended in for wording the finance lexicon does not cover.
+    """
+
+    def __init__(
+        self,
+        lexicon: dict[str, float] | None = None,
+        neutral_band: float = DEFAULT_NEUTRAL_BAND,
+        textblob_weight: float = DEFAULT_TEXTBLOB_WEIGHT,
+    ):
+        lexicon = lexicon if lexicon is not None else FINANCE_LEXICON
+        self.vocabulary = {word: index for index, word in enumerate(lexicon)}
+        self.weights = np.array(list(lexicon.values()), dtype=float)
+        self.neutral_band = neutral_band
+        self.textblob_weight = textblob_weight
+
+    def _signed_counts(self, texts: Sequence[str]) -> np.ndarray:
+        rows, cols, signs = [], [], []
+        for row, text in enumerate(texts):
+            negate_until = -1
+            for position, token in enumerate(_TOKEN_PATTERN.findall(text.lower())):
+                if token in NEGATORS:
+                    negate_until = position + _NEGATION_WINDOW
+                    continue
+                col = self.vocabulary.get(token)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+                    signs.append(-1.0 if position <= negate_until else 1.0)
+
+        counts = np.zeros((len(texts), len(self.vocabulary)))
+        if rows:
+            np.add.at(counts, (np.array(rows), np.array(cols)), np.array(signs))
+        return counts
+
+    def score(self, texts: Sequence[str]) -> SentimentBatch:
+        """Score a batch of texts in one pass."""
+        texts = [text or "" for text in texts]
+        counts = self._signed_counts(texts)
+        raw = counts @ self.weights
+        lexicon_scores = raw / np.sqrt(raw * raw + _ALPHA)
+        hits = np.abs(counts).sum(axis=1)
+
+        if self.textblob_weight > 0:
+            polarity = np.array([TextBlob(text).sentiment.polarity for text in texts])
+            # Texts without finance vocabulary rely on TextBlob alone
+            blend = np.where(hits > 0, self.textblob_weight, 1.0)
+            scores = (1.0 - blend) * lexicon_scores + blend * polarity
+        else:
+            scores = lexicon_scores
+
+        scores = np.clip(scores, -1.0, 1.0)
+        ambiguous = np.abs(scores) < self.neutral_band
+        return SentimentBatch(texts=texts, scores=scores, lexicon_hits=hits, ambiguous=ambiguous)
+
+
+def score_with_fallback(
+    texts: Sequence[str],
+    llm_scorer: Callable[[list[str]], Sequence[float]] | None = None,
+    scorer: SentimentScorer | None = None,
+) -> SentimentBatch:
+    """Score texts locally and ask the LLM only about the ambiguous ones.
+
+    Args:
+        texts: Headlines or snippets to score
+        llm_scorer: Callable scoring a list of texts (e.g. one LLM request); only
+            receives texts whose local score falls inside the neutral band
+        scorer: Local scorer to use (default finance lexicon when None)
+
+    Returns:
+        SentimentBatch whose ambiguous entries were replaced by the LLM's scores
+    """
+    scorer = scorer or SentimentScorer()
+    batch = scorer.score(texts)
+    if llm_scorer is None or not batch.ambiguous.any():
+        return batch
+
+    indices = np.flatnonzero(batch.ambiguous)
+    logger.info(f"Sending {len(indices)} of {len(batch.texts)} ambiguous texts to the LLM for sentiment")
+    llm_scores = np.asarray(llm_scorer([batch.texts[i] for i in indices]), dtype=float)
+    batch.scores[indices] = np.clip(llm_scores, -1.0, 1.0)
+    batch.ambiguous[indices] = False
+    return batch
@@ -1,20 +1,212 @@
+import csv
+import json
 import logging
+import os
+import re
+import threading
+import time
 from collections import namedtuple
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-import yfinance as yf
+from src.utils import metrics, rate_limit
+from src.utils.cache_config import caching_enabled, get_cache_dir
+from src.utils.http_session import ticker_info, yahoo_ticker
 
 # Simple named tuple instead of Pydantic model
-TickerValidationResult = namedtuple('TickerValidationResult', 
+TickerValidationResult = namedtuple('TickerValidationResult',
                                    ['ticker', 'is_valid', 'company_name', 'error_message'])
 
 logger = logging.getLogger(__name__)
 
-def validate_ticker_symbol(ticker: str) -> TickerValidationResult:
+# Optional exchange listing file(s) enabling offline validation, separated by os.pathsep
+SYMBOL_DIRECTORY_ENV = "TICKER_SYMBOL_DIRECTORY"
+
+DEFAULT_POSITIVE_TTL_SECONDS = 24 * 60 * 60.0
+DEFAULT_NEGATIVE_TTL_SECONDS = 60 * 60.0
+DEFAULT_MAX_WORKERS = 8
+# Superseded lines tolerated in the validation cache file before it is compacted on load
+COMPACT_SLACK_LINES = 100
+
+# Letters, digits and the punctuation Yahoo uses for classes, indices and suffixes
+_TICKER_PATTERN = re.compile(r"^[A-Za-z0-9^][A-Za-z0-9.\-=^]{0,14}$")
+
+
+class ValidationCache:
+    """Validation results persisted to a JSON lines file, with separate TTLs for valid and invalid symbols.
+
+    Only definitive answers are cached: symbols that exist, and symbols Yahoo reports
+    as missing. Transient errors are always retried. Each result is appended as one
+    line (later lines win), so validating a watchlist costs one small write per
+    ticker; the file is compacted when it is loaded with many superseded lines.
     """
-    Validate a stock ticker symbol using Yahoo Finance.
-    Returns a TickerValidationResult named tuple.
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        positive_ttl: float = DEFAULT_POSITIVE_TTL_SECONDS,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL_SECONDS,
+    ):
+        self.path = Path(path) if path else get_cache_dir("validation") / "tickers.jsonl"
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = self._load()
+
+    def _load(self) -> dict[str, dict]:
+        entries: dict[str, dict] = {}
+        lines = 0
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        entries[entry.pop("ticker")] = entry
+                    except (ValueError, KeyError, AttributeError):
+                        continue
+                    lines += 1
+        except OSError:
+            return {}
+        if lines > 2 * len(entries) + COMPACT_SLACK_LINES:
+            self._entries = entries
+            self.save()
+        return entries
+
+    def get(self, ticker: str) -> TickerValidationResult | None:
+        """Return the cached result for a ticker, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(ticker.upper())
+        if entry is None:
+            return None
+        ttl = self.positive_ttl if entry["is_valid"] else self.negative_ttl
+        if time.time() - entry["checked_at"] > ttl:
+            return None
+        return TickerValidationResult(
+            ticker=ticker,
+            is_valid=entry["is_valid"],
+            company_name=entry["company_name"],
+            error_message=entry["error_message"],
+        )
+
+    def put(self, result: TickerValidationResult, persist: bool = True) -> None:
+        """Cache a definitive validation result, appending it to the file unless ``persist`` is False."""
+        ticker = result.ticker.upper()
+        entry = {
+            "is_valid": result.is_valid,
+            "company_name": result.company_name,
+            "error_message": result.error_message,
+            "checked_at": time.time(),
+        }
+        with self._lock:
+            self._entries[ticker] = entry
+            if persist:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"ticker": ticker, **entry}) + "\n")
+
+    def save(self) -> None:
+        """Rewrite the cache file atomically with one line per ticker."""
+        with self._lock:
+            data = "".join(json.dumps({"ticker": ticker, **entry}) + "\n" for ticker, entry in self._entries.items())
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(data, encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+class SymbolDirectory:
+    """Local exchange listing used to validate symbols without any network call.
+
+    Reads pipe- or comma-delimited listings with a header row, such as the
+    NASDAQ Trader ``nasdaqlisted.txt``/``otherlisted.txt`` files or a simple
+    ``Symbol,Name`` CSV.
     """
-    # Basic input validation
+
+    SYMBOL_COLUMNS = ("Symbol", "ACT Symbol", "Ticker", "symbol", "ticker")
+    NAME_COLUMNS = ("Security Name", "Company Name", "Name", "name")
+
+    def __init__(self, paths: Iterable[str | Path]):
+        self.symbols: dict[str, str | None] = {}
+        for path in paths:
+            self._load(Path(path))
+        logger.info(f"Loaded {len(self.symbols)} symbols into the offline symbol directory")
+
+    def _load(self, path: Path) -> None:
+        with open(path, encoding="utf-8", newline="") as f:
+            header = f.readline()
+            delimiter = "|" if "|" in header else ","
+            f.seek(0)
+            reader = csv.DictReader(f, delimiter=delimiter)
+            fields = reader.fieldnames or []
+            symbol_column = next((c for c in self.SYMBOL_COLUMNS if c in fields), None)
+            name_column = next((c for c in self.NAME_COLUMNS if c in fields), None)
+            if symbol_column is None:
+                raise ValueError(f"No symbol column found in listing file {path}")
+            for row in reader:
+                symbol = (row.get(symbol_column) or "").strip().upper()
+                # NASDAQ Trader files end with a "File Creation Time" footer row
+                if not symbol or symbol.startswith("FILE CREATION TIME"):
+                    continue
+                name = (row.get(name_column) or "").strip() if name_column else ""
+                self.symbols[symbol] = name or None
+
+    def lookup(self, ticker: str) -> TickerValidationResult:
+        """Validate a ticker against the listing only."""
+        symbol = ticker.upper()
+        if symbol not in self.symbols:
+            return TickerValidationResult(
+                ticker=ticker,
+                is_valid=False,
+                company_name=None,
+                error_message=f"Ticker symbol '{ticker}' does not exist."
+            )
+        return TickerValidationResult(
+            ticker=ticker,
+            is_valid=True,
+            company_name=self.symbols[symbol] or ticker,
+            error_message=None
+        )
+
+
+_default_cache: ValidationCache | None = None
+_default_directory: SymbolDirectory | None = None
+_defaults_lock = threading.Lock()
+
+
+def get_validation_cache() -> ValidationCache | None:
+    """Return the process-wide validation cache, or None when caching is disabled."""
+    global _default_cache
+    if not caching_enabled():
+        return None
+    with _defaults_lock:
+        if _default_cache is None:
+            _default_cache = ValidationCache()
+        return _default_cache
+
+
+def get_symbol_directory() -> SymbolDirectory | None:
+    """Return the offline symbol directory configured in the environment, if any."""
+    global _default_directory
+    paths = [p for p in os.environ.get(SYMBOL_DIRECTORY_ENV, "").split(os.pathsep) if p]
+    if not paths:
+        return None
+    with _defaults_lock:
+        if _default_directory is None:
+            _default_directory = SymbolDirectory(paths)
+        return _default_directory
+
+
+def reset_validation_defaults() -> None:
+    """Drop the process-wide cache and symbol directory so they are rebuilt on next use."""
+    global _default_cache, _default_directory
+    with _defaults_lock:
+        _default_cache = None
+        _default_directory = None
+
+
+def check_ticker_format(ticker) -> TickerValidationResult | None:
+    """Reject obviously malformed input before any lookup; returns None if the format is fine."""
     if not ticker or not isinstance(ticker, str):
         return TickerValidationResult(
             ticker=str(ticker),
@@ -22,14 +214,35 @@ def validate_ticker_symbol(ticker: str) -> TickerValidationResult:
             company_name=None,
             error_message="Ticker symbol must be a non-empty string."
         )
-    
+    if not _TICKER_PATTERN.match(ticker):
+        return TickerValidationResult(
+            ticker=ticker,
+            is_valid=False,
+            company_name=None,
+            error_message=f"Ticker symbol '{ticker}' is not a valid symbol format."
+        )
+    return None
+
+
+def _is_cacheable(result: TickerValidationResult) -> bool:
+    # Transient lookup errors must not be remembered
+    return result.is_valid or "does not exist" in (result.error_message or "")
+
+
+def _validate_online(ticker: str) -> TickerValidationResult:
+    """Validate a ticker against Yahoo Finance."""
     logger.info(f"Validating ticker symbol: {ticker}")
-    
+
+    def fetch_info() -> dict:
+        metrics.count("http.yahoo")
+        # Shared with the price stage of the same analysis, which then reuses the info
+        return ticker_info(yahoo_ticker(ticker))
+
     try:
-        # Try to get ticker info - this will fail with 404 for invalid tickers
-        ticker_obj = yf.Ticker(ticker)
-        info = ticker_obj.info
-        
+        # Try to get ticker info - this will fail with 404 for invalid tickers;
+        # throttling and network errors are retried within Yahoo's shared rate limit
+        info = rate_limit.call("yahoo", fetch_info)
+
         # If we got here, check if we have a company name
         company_name = info.get("shortName")
         if company_name:
@@ -47,7 +260,7 @@ def validate_ticker_symbol(ticker: str) -> TickerValidationResult:
                 company_name=ticker,
                 error_message=None
             )
-            
+
     except Exception as e:
         # Most errors will be 404 for invalid tickers
         if "404" in str(e):
@@ -59,7 +272,7 @@ def validate_ticker_symbol(ticker: str) -> TickerValidationResult:
                 company_name=None,
                 error_message=f"Ticker symbol '{ticker}' does not exist."
             )
-        
+
         # Handle any other errors generically
         logger.debug(f"Error validating ticker {ticker}: {e}", exc_info=True)
         return TickerValidationResult(
@@ -67,4 +280,72 @@ def validate_ticker_symbol(ticker: str) -> TickerValidationResult:
             is_valid=False,
             company_name=None,
             error_message=f"Error validating ticker '{ticker}'. Please try again."
-        ) 
\ No newline at end of file
+        )
+
+
+def _validate_offline(ticker: str, cache: ValidationCache | None) -> TickerValidationResult | None:
+    """Resolve a ticker without network access, or return None if a Yahoo lookup is needed."""
+    invalid = check_ticker_format(ticker)
+    if invalid:
+        return invalid
+
+    directory = get_symbol_directory()
+    if directory is not None:
+        return directory.lookup(ticker)
+
+    if cache is not None:
+        cached = cache.get(ticker)
+        metrics.count_cache("validation", hit=cached is not None)
+        if cached is not None:
+            logger.debug(f"Validation cache hit for {ticker}")
+            return cached
+    return None
+
+
+def validate_ticker_symbol(ticker: str) -> TickerValidationResult:
+    """
+    Validate a stock ticker symbol using Yahoo Finance.
+    Returns a TickerValidationResult named tuple.
+
+    Malformed symbols are rejected immediately. When an offline symbol directory is
+    configured it is the only source consulted; otherwise recent results come from
+    the validation cache before falling back to Yahoo.
+    """
+    cache = get_validation_cache()
+    result = _validate_offline(ticker, cache)
+    if result is not None:
+        return result
+
+    result = _validate_online(ticker)
+    if cache is not None and _is_cacheable(result):
+        cache.put(result)
+    return result
+
+
+def validate_ticker_symbols(
+    tickers: Iterable[str], max_workers: int = DEFAULT_MAX_WORKERS
+) -> dict[str, TickerValidationResult]:
+    """
+    Validate many ticker symbols, querying Yahoo concurrently for those not
+    resolved offline or from the cache.
+
+    Returns:
+        Dict mapping each distinct ticker, in input order, to its validation result
+    """
+    cache = get_validation_cache()
+    results: dict[str, TickerValidationResult | None] = {}
+    for ticker in dict.fromkeys(tickers):
+        results[ticker] = _validate_offline(ticker, cache)
+
+    pending = [ticker for ticker, result in results.items() if result is None]
+    if pending:
+        logger.info(f"Validating {len(pending)} ticker symbols online")
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+            for ticker, result in zip(pending, executor.map(_validate_online, pending), strict=True):
+                results[ticker] = result
+                if cache is not None and _is_cacheable(result):
+                    cache.put(result, persist=False)
+        if cache is not None:
+            cache.save()
+
+    return results
@@ -0,0 +1,395 @@
+import argparse
+import heapq
+import json
+import logging
+import math
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from src.controller import (
+    DEFAULT_MAX_WORKERS,
+    analyze_tickers,
+    configure_environment,
+    event_sinks,
+    read_tickers,
+)
+from src.utils.events import EventCallback
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from src.session import SessionPool
+    from src.utils.news_cache import NewsSearchCache
+    from src.utils.price_loader import PriceLoader
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_SECONDS = 300.0
+# Change of the last close since the previous analysis that re-triggers a ticker on the same bar
+DEFAULT_MOVE_THRESHOLD_PCT = 2.0
+NEWS_QUERY = "{ticker} stock news"
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Fingerprint of the inputs an analysis of one ticker depends on.
+
+    Attributes:
+        ticker: The stock ticker symbol
+        last_bar: Date of the latest price bar (None without price data)
+        close: Close of the latest bar
+        move_pct: Change of that close against the previous bar, in percent
+        articles: URLs of the news articles found for the ticker
+    """
+    ticker: str
+    last_bar: str | None = None
+    close: float | None = None
+    move_pct: float | None = None
+    articles: frozenset[str] = field(default_factory=frozenset)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "ticker": self.ticker, "last_bar": self.last_bar, "close": self.close,
+            "move_pct": self.move_pct, "articles": sorted(self.articles),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Snapshot":
+        return cls(
+            ticker=data["ticker"], last_bar=data.get("last_bar"), close=data.get("close"),
+            move_pct=data.get("move_pct"), articles=frozenset(data.get("articles") or ()),
+        )
+
+
+def _pct_change(current: float | None, previous: float | None) -> float | None:
+    if current is None or not previous:
+        return None
+    return (current / previous - 1.0) * 100.0
+
+
+def price_snapshot(ticker: str, frame: "pd.DataFrame | None") -> Snapshot:
+    """Fingerprint the latest bar of a ticker's daily frame."""
+    if frame is None or frame.empty:
+        return Snapshot(ticker)
+    closes = frame["Close"].to_numpy(dtype=float)
+    move = _pct_change(closes[-1], closes[-2]) if len(closes) > 1 else None
+    return Snapshot(
+        ticker,
+        last_bar=str(frame.index[-1].date()),
+        close=round(float(closes[-1]), 4),
+        move_pct=round(move, 4) if move is not None and math.isfinite(move) else None,
+    )
+
+
+def changes(current: Snapshot, previous: Snapshot | None, move_threshold_pct: float) -> list[str]:
+    """Name what changed since the inputs of the previous analysis (empty when nothing did).
+
+    Returns:
+        Any of 'first_seen', 'new_bar', 'price_move' (the close moved by at least
+        ``move_threshold_pct`` on the same bar) and 'new_articles'
+    """
+    if previous is None:
+        return ["first_seen"]
+    reasons = []
+    if current.last_bar != previous.last_bar:
+        reasons.append("new_bar")
+    else:
+        move = _pct_change(current.close, previous.close)
+        if move is not None and abs(move) >= move_threshold_pct:
+            reasons.append("price_move")
+    if current.articles - previous.articles:
+        reasons.append("new_articles")
+    return reasons
+
+
+def move_size(current: Snapshot, previous: Snapshot | None) -> float:
+    """Return the absolute move in percent that ranks a changed ticker in the work queue.
+
+    The move is measured since the previous analysis on the same bar, otherwise
+    against the previous bar.
+    """
+    since_analysis = None
+    if previous is not None and previous.last_bar == current.last_bar:
+        since_analysis = _pct_change(current.close, previous.close)
+    move = since_analysis if since_analysis is not None else current.move_pct
+    return abs(move) if move is not None and math.isfinite(move) else 0.0
+
+
+class WorkQueue:
+    """Max-priority queue of tickers to analyze; a ticker queued twice keeps its highest priority."""
+
+    def __init__(self):
+        self._heap: list[tuple[float, str]] = []
+        self._priorities: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._priorities)
+
+    def push(self, ticker: str, priority: float) -> None:
+        if priority <= self._priorities.get(ticker, -math.inf):
+            return
+        self._priorities[ticker] = priority
+        heapq.heappush(self._heap, (-priority, ticker))
+
+    def pop(self) -> str:
+        """Return the ticker with the largest priority (ties in alphabetical order).
+
+        Raises:
+            IndexError: If the queue is empty
+        """
+        while self._heap:
+            priority, ticker = heapq.heappop(self._heap)
+            # Entries superseded by a higher priority push are skipped
+            if self._priorities.get(ticker) == -priority:
+                del self._priorities[ticker]
+                return ticker
+        raise IndexError("pop from an empty work queue")
+
+    def drain(self) -> Iterator[str]:
+        """Pop every queued ticker, largest priority first."""
+        while self:
+            yield self.pop()
+
+
+class Watcher:
+    """Polls a watchlist and re-analyzes only the tickers whose inputs changed.
+
+    Each cycle fetches the whole watchlist's prices in one batch and (optionally)
+    searches its news through the shared news cache, then fingerprints every
+    ticker. Tickers whose fingerprint changed since their last successful analysis
+    are queued by move size and analyzed largest move first; the rest are skipped.
+    Fingerprints of successful analyses can be kept in a JSON state file so a
+    restarted watcher resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        tickers: Iterable[str],
+        move_threshold_pct: float = DEFAULT_MOVE_THRESHOLD_PCT,
+        news: bool = True,
+        state_file: str | Path | None = None,
+        loader: "PriceLoader | None" = None,
+        news_cache: "NewsSearchCache | None" = None,
+        analyze: Callable[[list[str]], Iterable[tuple[str, bool, str | None]]] | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        planning: bool = True,
+        on_event: EventCallback | None = None,
+    ):
+        """
+        Args:
+            tickers: The stock ticker symbols to watch
+            move_threshold_pct: Move of the close on the same bar that re-triggers a ticker
+            news: Whether new article URLs re-trigger a ticker (costs one search per ticker and cycle)
+            state_file: JSON file keeping the fingerprints of the last analyses
+            loader: Price loader to poll (the shared one when None)
+            news_cache: News cache to poll (the shared one when None)
+            analyze: Analyzes tickers in the given order, yielding (ticker, success, error)
+                (``analyze_tickers`` with sessions kept across cycles when None)
+            max_workers: Maximum number of tickers analyzed concurrently by the default analyze
+            planning: Whether the default analyze runs the (cached) planning step
+            on_event: Receives the events of every analysis run by the default analyze
+        """
+        self.tickers = list(dict.fromkeys(ticker.strip().upper() for ticker in tickers if ticker.strip()))
+        self.move_threshold_pct = move_threshold_pct
+        self.news = news
+        self.state_file = Path(state_file) if state_file else None
+        self.loader = loader
+        self.news_cache = news_cache
+        self.analyze = analyze or self._analyze
+        self.max_workers = max_workers
+        self.planning = planning
+        self.on_event = on_event
+        # Agents and plans outlive a cycle; created on the first analysis
+        self.sessions: SessionPool | None = None
+        self.analyzed: dict[str, Snapshot] = self._load_state()
+
+    def _load_state(self) -> dict[str, Snapshot]:
+        if self.state_file is None or not self.state_file.exists():
+            return {}
+        try:
+            data = json.loads(self.state_file.read_text(encoding="utf-8"))
+            return {ticker: Snapshot.from_dict(entry) for ticker, entry in data.items()}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable watch state {self.state_file}: {e}")
+            return {}
+
+    def _save_state(self) -> None:
+        if self.state_file is None:
+            return
+        data = {ticker: snapshot.to_dict() for ticker, snapshot in self.analyzed.items()}
+        self.state_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    def snapshots(self) -> dict[str, Snapshot]:
+        """Poll prices (one batch request) and news, and fingerprint every watched ticker."""
+        from src.utils.indicators import INDICATOR_LOOKBACK_DAYS
+
+        if self.loader is None:
+            from src.utils.price_loader import get_price_loader
+
+            self.loader = get_price_loader()
+        try:
+            frames = self.loader.prefetch(self.tickers, INDICATOR_LOOKBACK_DAYS)
+        except Exception as e:
+            logger.warning(f"Price poll failed: {e}")
+            frames = {}
+        snapshots = {}
+        for ticker in self.tickers:
+            snapshot = price_snapshot(ticker, frames.get(ticker))
+            previous = self.analyzed.get(ticker)
+            if snapshot.last_bar is None and previous is not None:
+                # Without fresh prices, assume the bar of the last analysis rather than a new one
+                snapshot = Snapshot(ticker, previous.last_bar, previous.close, previous.move_pct)
+            snapshots[ticker] = snapshot
+        if not self.news:
+            return snapshots
+
+        if self.news_cache is None:
+            from src.utils.news_cache import get_news_cache
+
+            self.news_cache = get_news_cache()
+        for ticker, snapshot in snapshots.items():
+            try:
+                articles = self.news_cache.search(NEWS_QUERY.format(ticker=ticker))
+            except Exception as e:
+                logger.warning(f"News poll for {ticker} failed: {e}")
+                # Without a fresh search, assume the articles of the last analysis
+                previous = self.analyzed.get(ticker)
+                articles_seen = previous.articles if previous is not None else frozenset()
+            else:
+                articles_seen = frozenset(article.url for article in articles)
+            snapshots[ticker] = Snapshot(
+                ticker, snapshot.last_bar, snapshot.close, snapshot.move_pct, articles_seen
+            )
+        return snapshots
+
+    def _analyze(self, ordered: list[str]) -> Iterator[tuple[str, bool, str | None]]:
+        from src.utils.price_loader import get_price_loader
+
+        if self.sessions is None:
+            from src.session import SessionPool
+            from src.utils.llm_cache import get_response_cache
+
+            self.sessions = SessionPool(planning=self.planning, llm_cache=get_response_cache())
+        # One worker keeps the queue's order strictly; more start the largest moves first.
+        # snapshots() has just downloaded the watchlist into the shared loader, so the
+        # analyses do not fetch the batch again
+        return analyze_tickers(
+            ordered, max_workers=self.max_workers, on_event=self.on_event, sessions=self.sessions,
+            prefetched=self.loader is get_price_loader(),
+        )
+
+    def poll(self) -> tuple[WorkQueue, dict[str, Snapshot]]:
+        """Fingerprint the watchlist and queue the tickers whose inputs changed.
+
+        Returns:
+            The work queue ordered by move size and the snapshot of every ticker
+        """
+        snapshots = self.snapshots()
+        queue = WorkQueue()
+        for ticker, snapshot in snapshots.items():
+            previous = self.analyzed.get(ticker)
+            reasons = changes(snapshot, previous, self.move_threshold_pct)
+            if reasons:
+                logger.info(f"{ticker} changed ({', '.join(reasons)}); queued for analysis")
+                queue.push(ticker, move_size(snapshot, previous))
+        logger.info(f"{len(queue)} of {len(snapshots)} watched tickers changed")
+        return queue, snapshots
+
+    def run_cycle(self) -> list[tuple[str, bool, str | None]]:
+        """Poll once and analyze the changed tickers, largest move first.
+
+        A successful analysis stores the fingerprint it was based on; a failed one
+        leaves the old fingerprint so the ticker is tried again next cycle.
+        """
+        queue, snapshots = self.poll()
+        if not queue:
+            return []
+        results = []
+        for ticker, success, error in self.analyze(list(queue.drain())):
+            results.append((ticker, success, error))
+            if success:
+                self.analyzed[ticker] = snapshots[ticker]
+        self._save_state()
+        return results
+
+    def run(
+        self,
+        interval: float = DEFAULT_INTERVAL_SECONDS,
+        cycles: int | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Run cycles every ``interval`` seconds (forever when ``cycles`` is None)."""
+        completed = 0
+        while cycles is None or completed < cycles:
+            started = time.monotonic()
+            for ticker, success, error in self.run_cycle():
+                print(f"Analysis for {ticker} {'completed' if success else f'failed: {error}'}.")
+            completed += 1
+            if cycles is None or completed < cycles:
+                sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Watch a watchlist and re-analyze only the tickers whose prices or news changed."
+    )
+    parser.add_argument("-f", "--file", required=True, help="Watchlist file ('-' reads from stdin)")
+    parser.add_argument(
+        "--interval", type=float, default=DEFAULT_INTERVAL_SECONDS,
+        help=f"Seconds between polls (default: {DEFAULT_INTERVAL_SECONDS:g})",
+    )
+    parser.add_argument(
+        "--move-threshold", type=float, default=DEFAULT_MOVE_THRESHOLD_PCT,
+        help=f"Move of the close in percent since the last analysis that re-triggers a ticker "
+             f"(default: {DEFAULT_MOVE_THRESHOLD_PCT:g})",
+    )
+    parser.add_argument(
+        "--no-news", dest="news", action="store_false",
+        help="Do not poll news; only new bars and price moves re-trigger a ticker",
+    )
+    parser.add_argument("--state-file", help="JSON file keeping the fingerprints of the last analyses across restarts")
+    parser.add_argument("--once", action="store_true", help="Poll and analyze once, then exit")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=DEFAULT_MAX_WORKERS,
+        help=f"Maximum number of tickers analyzed concurrently (default: {DEFAULT_MAX_WORKERS})",
+    )
+    parser.add_argument(
+        "--no-planning", dest="planning", action="store_false",
+        help="Skip the crew planning step (saves one LLM call per run)",
+    )
+    parser.add_argument("--events-file", help="Append every analysis event to this file as JSON lines")
+    parser.add_argument("--results-db", help="Record every finished analysis in this SQLite results store")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.interval <= 0 or args.move_threshold < 0:
+        parser.error("--interval must be positive and --move-threshold must not be negative")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv or [])
+    configure_environment()
+    tickers = read_tickers(args.file)
+    if not tickers:
+        print("No ticker symbols found.")
+        return 1
+
+    with event_sinks(args.events_file, args.results_db) as on_event:
+        watcher = Watcher(
+            tickers, args.move_threshold, news=args.news, state_file=args.state_file,
+            max_workers=args.workers, planning=args.planning, on_event=on_event,
+        )
+        try:
+            watcher.run(args.interval, cycles=1 if args.once else None)
+        except KeyboardInterrupt:
+            print("Stopped watching.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
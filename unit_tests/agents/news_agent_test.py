@@ -0,0 +1,35 @@
+from src.agents.news_agent import NewsAgent, NewsSearchTool
+from src.utils.news_cache import NewsSearchCache, StubSearchBackend
+
+
+def test_news_search_tool_returns_formatted_articles():
+    """Test the search tool renders articles from the search cache."""
+    backend = StubSearchBackend(default=[
+        {"title": "Apple launches new iPhone", "url": "https://example.com/iphone", "description": "Launch event."},
+    ])
+    tool = NewsSearchTool(cache=NewsSearchCache(backend))
+
+    output = tool.run(search_query="AAPL news")
+
+    assert "Title: Apple launches new iPhone" in output
+    assert "Link: https://example.com/iphone" in output
+    assert backend.queries == ["AAPL news"]
+
+
+def test_news_search_tool_reports_backend_errors():
+    """Test backend failures are returned to the agent as an error message."""
+    class FailingBackend:
+        def search(self, query, count=10):
+            raise RuntimeError("rate limited")
+
+    tool = NewsSearchTool(cache=NewsSearchCache(FailingBackend()))
+
+    assert tool.run(search_query="AAPL news") == "Error performing search: rate limited"
+
+
+def test_news_agent_uses_search_cache():
+    """Test NewsAgent wires its search tool to the given cache."""
+    agent = NewsAgent(search_cache=NewsSearchCache(StubSearchBackend()))
+
+    assert agent.agent.role == "News Researcher"
+    assert agent.agent.tools == [agent.search_tool]
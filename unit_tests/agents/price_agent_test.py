@@ -1,6 +1,10 @@
+from datetime import date
 from unittest.mock import ANY, MagicMock, patch
 
+import pytest
+
 from src.agents.price_agent import PriceAgent
+from src.utils.price_loader import PriceLoader, set_price_loader
 
 # Since we cannot call the decorated fetch_price_data_tool directly,
 # we'll test the internal function by patching the decorator
@@ -13,25 +17,29 @@ class MockTool:
         return self.func(*args, **kwargs)
 
 @patch('src.agents.price_agent.tool', side_effect=lambda name: lambda f: MockTool(f))
-@patch('src.agents.price_agent.yf.Ticker')
+@patch('src.utils.price_loader.yf.Ticker')
 def test_fetch_price_data_tool_success(mock_yf_ticker, mock_tool, mock_ticker):
     """Test fetch_price_data_tool with successful data retrieval."""
     # Import here after mocking the decorator
     from src.agents.price_agent import fetch_price_data_tool
     
     mock_yf_ticker.return_value = mock_ticker
+    # The recorded bars end on 2023-01-10
+    set_price_loader(PriceLoader(clock=lambda: date(2023, 1, 11)))
     
     result = fetch_price_data_tool.func("AAPL", days=10)
     
     assert isinstance(result, dict)
     assert result["ticker"] == "AAPL"
-    assert isinstance(result["data"], list)
+    assert result["bars"] == 10
+    assert len(result["closes"]["close"]) < result["bars"]
+    assert result["indicators"]["sma"]["5"] == pytest.approx(159.0)
     assert "moving_average" in result
     assert "volatility" in result
 
 
 @patch('src.agents.price_agent.tool', side_effect=lambda name: lambda f: MockTool(f))
-@patch('src.agents.price_agent.yf.Ticker')
+@patch('src.utils.price_loader.yf.Ticker')
 def test_fetch_price_data_tool_empty_data(mock_yf_ticker, mock_tool):
     """Test fetch_price_data_tool with empty data."""
     # Import here after mocking the decorator
@@ -48,7 +56,7 @@ def test_fetch_price_data_tool_empty_data(mock_yf_ticker, mock_tool):
 
 
 @patch('src.agents.price_agent.tool', side_effect=lambda name: lambda f: MockTool(f))
-@patch('src.agents.price_agent.yf.Ticker')
+@patch('src.utils.price_loader.yf.Ticker')
 def test_fetch_price_data_tool_exception(mock_yf_ticker, mock_tool):
     """Test fetch_price_data_tool with exception."""
     # Import here after mocking the decorator
@@ -0,0 +1,122 @@
+import json
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.replay import FIXTURES_DIR, Fixtures, Latency, ReplayLLM
+from src.backtest import (
+    MomentumRecommender,
+    PipelineRecommender,
+    RecordedRecommender,
+    evaluate,
+    load_recorded_prices,
+    main,
+    run_backtest,
+)
+
+
+def make_frame(closes, start="2024-01-01"):
+    """Build a business-day OHLCV frame with the given closes."""
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        "Open": closes, "High": closes + 1, "Low": closes - 1, "Close": closes, "Volume": 1000,
+    }, index=pd.bdate_range(start, periods=len(closes)))
+
+
+def test_evaluate_scores_each_call_against_the_next_bars():
+    """Test PnL and hits: Buy wins on a rise, Sell on a fall, Hold inside the band; skipped days are not scored."""
+    frames = {"AAA": make_frame([100, 102, 104, 100, 99])}
+    days = list(frames["AAA"].index.date)
+    recommendations = pd.DataFrame({
+        "ticker": ["AAA"] * 4,
+        "date": days[:4],
+        "action": ["Buy", "Sell", "Hold", None],
+    })
+
+    scored, stats = evaluate(recommendations, frames, horizon=1, hold_band_pct=2.0)
+
+    assert scored["pnl"].iloc[:3].tolist() == pytest.approx([0.02, -2 / 102, 0.0])
+    assert scored["hit"].iloc[:3].tolist() == [1.0, 0.0, 0.0]
+    assert stats["ticker_days"] == 3
+    assert stats["skipped"] == 1
+    assert stats["actions"]["Buy"] == {"count": 1, "mean_forward_return_pct": 2.0, "hit_rate": 1.0}
+    assert stats["directional"]["count"] == 2
+    assert stats["directional"]["hit_rate"] == 0.5
+    assert stats["tickers"]["AAA"]["total_pnl_pct"] == pytest.approx((0.02 - 2 / 102) * 100, abs=1e-4)
+
+
+def test_run_backtest_in_worker_processes_matches_single_process():
+    """Test ticker-days split across a process pool give the same results as a serial run."""
+    rng = np.random.default_rng(1)
+    frames = {
+        ticker: make_frame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, 80))))
+        for ticker in ("AAA", "BBB", "CCC")
+    }
+
+    serial = run_backtest(frames, MomentumRecommender(), workers=1, chunk_days=7)
+    pooled = run_backtest(frames, MomentumRecommender(), workers=2, chunk_days=7)
+
+    # 80 bars minus 30 warm-up and 5 horizon bars per ticker
+    assert serial.stats["ticker_days"] == 3 * 45
+    assert pooled.stats == serial.stats
+    pd.testing.assert_frame_equal(pooled.recommendations, serial.recommendations)
+
+
+def test_recorded_recommender_reads_events_and_plain_rows(tmp_path):
+    """Test recommendations are replayed from an events file and from explicit dated rows."""
+    path = tmp_path / "events.jsonl"
+    timestamp = pd.Timestamp("2024-03-01 15:00").timestamp()
+    path.write_text("\n".join([
+        json.dumps({"type": "stage_started", "ticker": "AAA", "timestamp": timestamp, "stage": "validation"}),
+        json.dumps({
+            "type": "analysis_finished", "ticker": "AAA", "timestamp": timestamp, "success": True,
+            "recommendation": {"ticker": "AAA", "action": "Buy", "explanation": "", "references": []},
+        }),
+        json.dumps({"ticker": "bbb", "date": "2024-03-04", "action": "Sell"}),
+        "not json",
+    ]))
+
+    recommender = RecordedRecommender(path)
+
+    assert recommender.recommend("AAA", date(2024, 3, 1), pd.DataFrame()) == "Buy"
+    assert recommender.recommend("BBB", date(2024, 3, 4), pd.DataFrame()) == "Sell"
+    assert recommender.recommend("AAA", date(2024, 3, 4), pd.DataFrame()) is None
+
+
+def test_pipeline_recommender_replays_recorded_completions_offline(tmp_path):
+    """Test a recording run stores the crew's completions and a later run replays them without any LLM."""
+    fixtures = Fixtures()
+    frames = {"AAPL": load_recorded_prices(FIXTURES_DIR / "yahoo_history.json")["AAPL"]}
+    as_of = frames["AAPL"].index[60].date()
+    llm_cache = tmp_path / "responses.sqlite3"
+
+    def backtest(recommender):
+        return run_backtest(frames, recommender, start=as_of, end=as_of, workers=1)
+
+    recorded = backtest(PipelineRecommender(
+        llm_cache, news=fixtures.search_results, llm=ReplayLLM(fixtures, Latency()), record=True,
+    ))
+    replayed = backtest(PipelineRecommender(llm_cache, news=fixtures.search_results, llm="replay"))
+    missing = backtest(PipelineRecommender(tmp_path / "empty.sqlite3", news=fixtures.search_results, llm="replay"))
+
+    assert recorded.recommendations["action"].tolist() == ["Hold"]
+    assert replayed.recommendations["action"].tolist() == ["Hold"]
+    assert missing.stats["skipped"] == 1
+
+
+def test_main_writes_report(tmp_path, capsys):
+    """Test the command line backtests recorded prices with the momentum baseline and writes a report."""
+    output = tmp_path / "report.json"
+
+    code = main([
+        "--strategy", "momentum", "--prices", str(FIXTURES_DIR / "yahoo_history.json"),
+        "--tickers", "AAPL", "MSFT", "--every", "5", "--workers", "1", "--output", str(output),
+    ])
+
+    report = json.loads(output.read_text())
+    assert code == 0
+    assert set(report["stats"]["tickers"]) == {"AAPL", "MSFT"}
+    assert len(report["recommendations"]) == report["stats"]["ticker_days"] + report["stats"]["skipped"]
+    assert "hit_rate" in capsys.readouterr().out
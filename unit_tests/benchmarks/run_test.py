@@ -0,0 +1,68 @@
+from benchmarks.replay import Fixtures, Latency, replayed_yahoo
+from benchmarks.run import (
+    STAGES,
+    BenchmarkResult,
+    find_regressions,
+    probe_startup,
+    run_benchmarks,
+    run_startup,
+)
+from src.utils.validation import validate_ticker_symbol
+
+
+def test_watchlist_has_distinct_symbols_backed_by_fixtures():
+    """Test synthetic watchlists cycle through the recorded symbols without repeating."""
+    fixtures = Fixtures()
+
+    watchlist = fixtures.watchlist(20)
+
+    assert len(set(watchlist)) == 20
+    assert watchlist[:len(fixtures.symbols)] == fixtures.symbols
+    assert all(fixtures.headlines(ticker) for ticker in watchlist)
+
+
+def test_replayed_yahoo_serves_recorded_info():
+    """Test validation runs against recorded Yahoo responses, including unknown symbols."""
+    with replayed_yahoo(Fixtures(), Latency()):
+        known = validate_ticker_symbol("AAPL")
+        unknown = validate_ticker_symbol("QQQQ")
+
+    assert known.is_valid and known.company_name == "Apple Inc."
+    assert not unknown.is_valid and "does not exist" in unknown.error_message
+
+
+def test_run_benchmarks_offline():
+    """Test every stage, including full crew analyses, runs offline on the recorded fixtures."""
+    results = run_benchmarks(list(STAGES), sizes=(1, 2))
+
+    assert [(r.stage, r.size) for r in results] == [
+        (stage, size) for stage in ("validation", "price", "sentiment", "analyze") for size in (1, 2)
+    ]
+    assert all(r.p95_ms >= r.p50_ms > 0 and r.throughput_per_s > 0 for r in results)
+
+
+def test_find_regressions_ignores_noise():
+    """Test slowdowns beyond the tolerance are reported while sub-millisecond jitter is not."""
+    baseline = [
+        {"stage": "analyze", "size": 10, "p50_ms": 100.0, "p95_ms": 120.0, "throughput_per_s": 9.0, "peak_memory_mb": 5.0},
+        {"stage": "validation", "size": 10, "p50_ms": 0.02, "p95_ms": 0.03, "throughput_per_s": 30000.0, "peak_memory_mb": 0.0},
+    ]
+    results = [
+        BenchmarkResult("analyze", 10, p50_ms=150.0, p95_ms=200.0, throughput_per_s=6.0, peak_memory_mb=5.5),
+        BenchmarkResult("validation", 10, p50_ms=0.05, p95_ms=0.09, throughput_per_s=15000.0, peak_memory_mb=0.0),
+    ]
+
+    regressions = find_regressions(results, baseline, tolerance=0.25)
+
+    assert len(regressions) == 2
+    assert all(regression.startswith("analyze[10]") for regression in regressions)
+
+
+def test_controller_cold_start_skips_heavy_imports():
+    """Test importing the controller and printing its help load none of the heavy dependencies."""
+    assert probe_startup("import src.controller")["heavy_modules"] == []
+
+    results = run_startup(repeats=1)
+
+    assert [r.stage for r in results] == ["startup.import", "startup.help"]
+    assert all(r.size == 1 and r.p50_ms > 0 and r.peak_memory_mb > 0 for r in results)
@@ -3,6 +3,27 @@ from unittest.mock import MagicMock
 import pandas as pd
 import pytest
 
+from src.utils import price_loader, rate_limit, validation
+from src.utils.cache_config import CACHE_DIR_ENV, NO_CACHE_ENV
+from src.utils.news_cache import set_news_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    """Keep tests away from the user's on-disk caches and shared loaders"""
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "cache"))
+    monkeypatch.setenv(NO_CACHE_ENV, "1")
+    monkeypatch.delenv(validation.SYMBOL_DIRECTORY_ENV, raising=False)
+    price_loader.set_price_loader(None)
+    set_news_cache(None)
+    validation.reset_validation_defaults()
+    rate_limit.reset_providers()
+    yield
+    price_loader.set_price_loader(None)
+    set_news_cache(None)
+    validation.reset_validation_defaults()
+    rate_limit.reset_providers()
+
 
 @pytest.fixture
 def mock_ticker():
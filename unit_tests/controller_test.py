@@ -1,18 +1,36 @@
-from unittest.mock import ANY, MagicMock, patch
+import json
+from unittest.mock import ANY, MagicMock, call, patch
 
-from src.controller import analyze_ticker, main
+from src.controller import (
+    analyze_ticker,
+    analyze_tickers,
+    analyze_tickers_batched,
+    main,
+    read_tickers,
+    run_batch,
+    stream_analysis,
+)
+from src.utils import events
+from src.utils.events import AnalysisFinished, PriceSummary
+from src.utils.metrics import RunMetrics
+from src.utils.news_cache import NewsArticle
+from src.utils.recommendation import Recommendation
+from src.utils.results_store import ResultsStore
+from src.utils.screening import ScreenResult, ScreenRules
 
 
 @patch('src.controller.validate_ticker_symbol')
-@patch('src.controller.PriceAgent')
-@patch('src.controller.NewsAgent')
-@patch('src.controller.SentimentAgent')
-@patch('src.controller.RecommendationAgent')
-@patch('src.controller.Crew')
-@patch('src.controller.Task')
+@patch('src.session.PriceAgent')
+@patch('src.session.NewsAgent')
+@patch('src.session.SentimentAgent')
+@patch('src.session.RecommendationAgent')
+@patch('src.session.CrewPlanner')
+@patch('src.session.Crew')
+@patch('src.session.ContextTask')
 def test_analyze_ticker_valid(
     mock_task_class,
     mock_crew_class, 
+    mock_planner_class,
     mock_recommendation_agent_class,
     mock_sentiment_agent_class, 
     mock_news_agent_class,
@@ -32,13 +50,18 @@ def test_analyze_ticker_valid(
     mock_sentiment_task = MagicMock()
     mock_recommendation_task = MagicMock()
     
-    # Setup Task constructor to return the appropriate mock tasks
-    mock_task_class.side_effect = [
+    # Setup Task constructor: four template tasks for planning, then the ticker's tasks
+    mock_task_class.side_effect = [MagicMock() for _ in range(4)] + [
         mock_price_task,
         mock_news_task,
         mock_sentiment_task, 
         mock_recommendation_task
     ]
+
+    # Mock the planner output (one step plan per task)
+    mock_planner_class.return_value._handle_crew_planning.return_value.list_of_plans_per_task = [
+        MagicMock(plan=f" Plan {i} for {{ticker}}.") for i in range(4)
+    ]
     
     # Mock agents
     mock_price_agent = MagicMock()
@@ -72,14 +95,22 @@ def test_analyze_ticker_valid(
     mock_recommendation_agent_class.assert_called_once()
     
     # Verify Task creation
-    assert mock_task_class.call_count == 4
+    assert mock_task_class.call_count == 8
+    price_task_kwargs = mock_task_class.call_args_list[4].kwargs
+    assert price_task_kwargs["description"] == "Fetch recent price data for AAPL. Plan 0 for AAPL."
+    news_task_kwargs = mock_task_class.call_args_list[5].kwargs
+    assert news_task_kwargs["context"] == []
+    assert news_task_kwargs["async_execution"] is True
+    recommendation_task_kwargs = mock_task_class.call_args_list[7].kwargs
+    assert recommendation_task_kwargs["context"] == [mock_price_task, mock_sentiment_task]
     
-    # Verify the crew was created with the correct tasks
+    # Verify the crew was created with the correct tasks; planning is done by the session
+    mock_planner_class.assert_called_once()
     mock_crew_class.assert_called_once_with(
         agents=ANY,
-        tasks=ANY,
+        tasks=[mock_price_task, mock_news_task, mock_sentiment_task, mock_recommendation_task],
         verbose=True,
-        planning=True
+        planning=False
     )
     
     # Verify the kickoff method was called
@@ -106,9 +137,10 @@ def test_analyze_ticker_invalid(mock_validate_ticker_symbol):
     mock_validate_ticker_symbol.assert_called_once_with("INVALID")
 
 
-@patch('src.controller.input', side_effect=['AAPL', 'quit'])
+@patch('src.controller.input', side_effect=['AAPL', 'MSFT', 'quit'])
+@patch('src.session.AnalyzerSession')
 @patch('src.controller.analyze_ticker')
-def test_main_function(mock_analyze_ticker, mock_input):
+def test_main_function(mock_analyze_ticker, mock_session_class, mock_input):
     """Test main function with user input."""
     # Setup mock analyze_ticker
     mock_analyze_ticker.return_value = (True, None)
@@ -116,5 +148,278 @@ def test_main_function(mock_analyze_ticker, mock_input):
     # Call the main function
     main()
     
-    # Verify analyze_ticker was called with the right ticker
-    mock_analyze_ticker.assert_called_once_with('AAPL') 
\ No newline at end of file
+    # Verify analyze_ticker was called with the right tickers and one reused session
+    mock_session_class.assert_called_once_with(planning=True, llm_cache=None)
+    session = mock_session_class.return_value
+    assert mock_analyze_ticker.call_args_list == [
+        call('AAPL', session=session, run_metrics=ANY, on_event=None, screen=None),
+        call('MSFT', session=session, run_metrics=ANY, on_event=None, screen=None),
+    ] 
+
+
+@patch('src.controller.input', side_effect=['AA PL', 'quit'])
+@patch('src.session.AnalyzerSession')
+@patch('src.controller.analyze_ticker')
+def test_main_rejects_malformed_ticker_before_creating_agents(mock_analyze_ticker, mock_session_class, mock_input, capsys):
+    """Test malformed input is rejected without building the agents."""
+    main()
+
+    mock_session_class.assert_not_called()
+    mock_analyze_ticker.assert_not_called()
+    assert "not a valid symbol format" in capsys.readouterr().out
+
+
+@patch('src.session.AnalyzerSession')
+@patch('src.utils.price_loader.get_price_loader')
+@patch('src.controller.analyze_ticker')
+def test_analyze_tickers_yields_each_result(mock_analyze_ticker, mock_get_price_loader, mock_session_class):
+    """Test analyze_tickers runs every unique ticker and yields one result per ticker."""
+    mock_analyze_ticker.side_effect = lambda ticker, session, run_metrics, on_event, screen: (
+        (False, "Invalid ticker") if ticker == "BAD" else (True, None)
+    )
+
+    results = list(analyze_tickers(["aapl", "MSFT", "AAPL", "BAD", " "], max_workers=2))
+
+    assert sorted(results) == [
+        ("AAPL", True, None),
+        ("BAD", False, "Invalid ticker"),
+        ("MSFT", True, None),
+    ]
+    assert mock_analyze_ticker.call_count == 3
+    mock_get_price_loader.return_value.prefetch.assert_called_once_with(["AAPL", "MSFT", "BAD"])
+    mock_get_price_loader.return_value.compute_peers.assert_called_once_with(["AAPL", "MSFT", "BAD"], "SPY")
+    # At most one session per worker thread, all sharing one planner
+    assert 1 <= mock_session_class.call_count <= 2
+    planners = {id(c.kwargs["planner"]) for c in mock_session_class.call_args_list}
+    assert len(planners) == 1
+
+
+@patch('src.session.AnalyzerSession')
+@patch('src.utils.price_loader.get_price_loader')
+@patch('src.controller.analyze_ticker')
+def test_analyze_tickers_reports_unexpected_errors(mock_analyze_ticker, mock_get_price_loader, mock_session_class):
+    """Test analyze_tickers turns an exception from a worker into a failed result."""
+    mock_analyze_ticker.side_effect = RuntimeError("boom")
+
+    results = list(analyze_tickers(["AAPL"]))
+
+    assert results == [("AAPL", False, "Error analyzing ticker AAPL: boom")]
+
+
+def test_read_tickers_from_file(tmp_path):
+    """Test read_tickers parses comma/whitespace separated symbols and skips comments."""
+    watchlist = tmp_path / "watchlist.txt"
+    watchlist.write_text("# tech\naapl, msft\nGOOG  # search\n\n")
+
+    assert read_tickers(str(watchlist)) == ["AAPL", "MSFT", "GOOG"]
+
+
+@patch('src.controller.analyze_tickers')
+def test_main_batch_mode(mock_analyze_tickers, tmp_path):
+    """Test main analyzes a watchlist file when --file is given."""
+    watchlist = tmp_path / "watchlist.txt"
+    watchlist.write_text("AAPL MSFT")
+    mock_analyze_tickers.return_value = iter([("MSFT", True, None), ("AAPL", True, None)])
+
+    main(["--file", str(watchlist), "--workers", "8"])
+
+    mock_analyze_tickers.assert_called_once_with(
+        ["AAPL", "MSFT"], max_workers=8, planning=True, batch_metrics=None, on_event=None, screen=None
+    )
+
+
+@patch('src.controller.validate_ticker_symbol')
+def test_analyze_ticker_records_metrics(mock_validate_ticker_symbol):
+    """Test analyze_ticker records its stages and outcome in the given run metrics."""
+    mock_validate_ticker_symbol.return_value = MagicMock(is_valid=True)
+    session = MagicMock()
+    run_metrics = RunMetrics("AAPL")
+
+    success, _ = analyze_ticker("AAPL", session=session, run_metrics=run_metrics)
+
+    assert success is True
+    assert run_metrics.success is True
+    assert {"validation", "total"} <= set(run_metrics.stages)
+
+
+@patch('src.controller.analyze_tickers')
+def test_run_batch_writes_metrics_file(mock_analyze_tickers, tmp_path):
+    """Test run_batch writes the batch metrics report when a metrics file is given."""
+    def fake_analyze(tickers, max_workers, planning, batch_metrics, on_event, screen):
+        run_metrics = RunMetrics("AAPL")
+        run_metrics.add_stage("total", 1.5)
+        run_metrics.finish(True)
+        batch_metrics.add(run_metrics)
+        yield "AAPL", True, None
+
+    mock_analyze_tickers.side_effect = fake_analyze
+    metrics_file = tmp_path / "metrics.json"
+
+    run_batch(["AAPL"], metrics_file=str(metrics_file))
+
+    report = json.loads(metrics_file.read_text())
+    assert report["runs"][0]["ticker"] == "AAPL"
+    assert report["histograms"]["total"]["count"] == 1
+
+
+@patch('src.controller.validate_ticker_symbol')
+def test_stream_analysis_yields_events_and_recommendation(mock_validate_ticker_symbol):
+    """Test stream_analysis yields tool events while running and ends with the parsed recommendation."""
+    mock_validate_ticker_symbol.return_value = MagicMock(is_valid=True)
+    session = MagicMock()
+
+    def run(ticker):
+        events.publish(PriceSummary, summary={"ticker": ticker, "close": 10.0})
+        return MagicMock(raw='```json\n{"ticker": "AAPL", "action": "Sell", "explanation": "Weak"}\n```')
+
+    session.run.side_effect = run
+
+    stream = list(stream_analysis("AAPL", session=session))
+
+    assert [event.type for event in stream] == [
+        "stage_started", "stage_finished", "price_summary", "final_recommendation", "analysis_finished",
+    ]
+    assert stream[2].summary["close"] == 10.0
+    finished = stream[-1]
+    assert finished.success is True
+    assert finished.recommendation == Recommendation("AAPL", "Sell", "Weak")
+
+
+@patch('src.controller.validate_ticker_symbol')
+def test_stream_analysis_reports_invalid_ticker(mock_validate_ticker_symbol):
+    """Test a failed validation ends the stream with an unsuccessful AnalysisFinished."""
+    mock_validate_ticker_symbol.return_value = MagicMock(is_valid=False, error_message="Invalid ticker")
+
+    stream = list(stream_analysis("BAD", session=MagicMock()))
+
+    assert stream[-1] == AnalysisFinished(
+        ticker="BAD", success=False, error="Invalid ticker", timestamp=stream[-1].timestamp
+    )
+
+
+@patch('src.controller.analyze_tickers')
+def test_run_batch_writes_events_file(mock_analyze_tickers, tmp_path):
+    """Test run_batch appends every event to the events file as JSON lines."""
+    def fake_analyze(tickers, max_workers, planning, batch_metrics, on_event, screen):
+        on_event(AnalysisFinished(ticker="AAPL", success=True, recommendation=Recommendation("AAPL", "Hold", "Flat")))
+        yield "AAPL", True, None
+
+    mock_analyze_tickers.side_effect = fake_analyze
+    events_file = tmp_path / "events.jsonl"
+
+    run_batch(["AAPL"], events_file=str(events_file))
+
+    lines = [json.loads(line) for line in events_file.read_text().splitlines()]
+    assert lines[0]["type"] == "analysis_finished"
+    assert lines[0]["recommendation"]["action"] == "Hold"
+
+
+@patch('src.controller.analyze_tickers')
+def test_run_batch_records_results_alongside_the_events_file(mock_analyze_tickers, tmp_path):
+    """Test run_batch feeds both the events file and the results store when both are given."""
+    def fake_analyze(tickers, max_workers, planning, batch_metrics, on_event, screen):
+        on_event(AnalysisFinished(ticker="AAPL", success=True, recommendation=Recommendation("AAPL", "Sell", "Weak")))
+        yield "AAPL", True, None
+
+    mock_analyze_tickers.side_effect = fake_analyze
+    events_file = tmp_path / "events.jsonl"
+    results_db = tmp_path / "results.sqlite3"
+
+    run_batch(["AAPL"], events_file=str(events_file), results_db=str(results_db))
+
+    store = ResultsStore(results_db)
+    assert store.latest()["AAPL"].action == "Sell"
+    store.close()
+    assert len(events_file.read_text().splitlines()) == 1
+
+
+@patch('src.controller.screen_ticker')
+@patch('src.controller.validate_ticker_symbol')
+def test_analyze_ticker_screened_out_skips_the_crew(mock_validate_ticker_symbol, mock_screen_ticker):
+    """Test a ticker triggering no screening rule gets a Hold without running the crew."""
+    mock_validate_ticker_symbol.return_value = MagicMock(is_valid=True)
+    mock_screen_ticker.return_value = ScreenResult("AAPL", needs_analysis=False, measurements={"change_pct": 0.4})
+    session = MagicMock()
+    received = []
+
+    success, error = analyze_ticker("AAPL", session=session, on_event=received.append, screen=ScreenRules())
+
+    assert (success, error) == (True, None)
+    session.run.assert_not_called()
+    screened = next(event for event in received if event.type == "screened")
+    assert screened.needs_analysis is False
+    assert received[-1].recommendation.action == "Hold"
+
+
+@patch('src.controller.screen_ticker')
+@patch('src.controller.validate_ticker_symbol')
+def test_analyze_ticker_runs_the_crew_when_a_rule_triggers(mock_validate_ticker_symbol, mock_screen_ticker):
+    """Test a ticker passing the screen is analyzed by the crew and the rule is reported."""
+    mock_validate_ticker_symbol.return_value = MagicMock(is_valid=True)
+    mock_screen_ticker.return_value = ScreenResult("AAPL", needs_analysis=True, triggered=["volume_spike"])
+    session = MagicMock()
+    received = []
+
+    analyze_ticker("AAPL", session=session, on_event=received.append, screen=ScreenRules())
+
+    session.run.assert_called_once_with("AAPL")
+    assert next(event for event in received if event.type == "screened").triggered == ["volume_spike"]
+
+
+@patch('src.controller.analyze_tickers')
+def test_main_batch_mode_with_screen_rules(mock_analyze_tickers, tmp_path):
+    """Test --screen-rules loads the thresholds and passes them to the batch."""
+    watchlist = tmp_path / "watchlist.txt"
+    watchlist.write_text("AAPL")
+    rules = tmp_path / "rules.json"
+    rules.write_text('{"volume_spike_ratio": 3.0}')
+    mock_analyze_tickers.return_value = iter([("AAPL", True, None)])
+
+    main(["--file", str(watchlist), "--screen-rules", str(rules)])
+
+    assert mock_analyze_tickers.call_args.kwargs["screen"] == ScreenRules(volume_spike_ratio=3.0)
+
+
+@patch('src.utils.llm_cache.limited_llm')
+@patch('src.utils.news_cache.get_news_cache')
+@patch('src.utils.price_loader.get_price_loader')
+@patch('src.controller.validate_ticker_symbol')
+def test_analyze_tickers_batched_shares_one_request(
+    mock_validate_ticker_symbol, mock_get_price_loader, mock_get_news_cache, mock_limited_llm
+):
+    """Test a watchlist gets its recommendations from one batched LLM request instead of a crew per ticker."""
+    mock_validate_ticker_symbol.side_effect = lambda ticker: MagicMock(
+        is_valid=ticker != "BAD", error_message="Invalid ticker"
+    )
+    mock_get_price_loader.return_value.get_price_data.side_effect = lambda ticker: {"ticker": ticker, "close": 10.0}
+    mock_get_news_cache.return_value.search.return_value = [
+        NewsArticle("Record profit beats estimates", "https://example.com/a", "", summary="Shares surge.")
+    ]
+    llm = mock_limited_llm.return_value
+    llm.call.return_value = json.dumps([
+        {"ticker": ticker, "action": "Buy", "explanation": "Strong.", "references": []} for ticker in ("AAPL", "MSFT")
+    ])
+    received = []
+
+    results = list(analyze_tickers_batched(["AAPL", "MSFT", "BAD"], on_event=received.append))
+
+    assert results[0] == ("BAD", False, "Invalid ticker")
+    assert sorted(results[1:]) == [("AAPL", True, None), ("MSFT", True, None)]
+    llm.call.assert_called_once()
+    finished = {event.ticker: event for event in received if event.type == "analysis_finished"}
+    assert finished["AAPL"].recommendation.action == "Buy"
+    assert {event.ticker for event in received if event.type == "price_summary"} == {"AAPL", "MSFT"}
+
+
+@patch('src.controller.analyze_tickers_batched')
+def test_main_batch_mode_with_batch_prompts(mock_analyze_tickers_batched, tmp_path):
+    """Test --batch-prompts analyzes the watchlist with batched requests of the given budget."""
+    watchlist = tmp_path / "watchlist.txt"
+    watchlist.write_text("AAPL MSFT")
+    mock_analyze_tickers_batched.return_value = iter([("AAPL", True, None), ("MSFT", True, None)])
+
+    main(["--file", str(watchlist), "--batch-prompts", "--token-budget", "2000"])
+
+    mock_analyze_tickers_batched.assert_called_once_with(
+        ["AAPL", "MSFT"], max_workers=4, token_budget=2000, batch_metrics=None, on_event=None, screen=None
+    )
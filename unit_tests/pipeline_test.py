@@ -0,0 +1,52 @@
+import pytest
+
+from src.pipeline import ANALYSIS_GRAPH, TaskSpec, schedule, task_levels
+
+
+def spec(name, *inputs):
+    """Build a minimal task spec for graph tests."""
+    return TaskSpec(name=name, agent=name, description=name, expected_output=name, inputs=inputs)
+
+
+def test_analysis_graph_runs_price_and_news_in_parallel():
+    """Test the default graph starts price and news together and joins at the recommendation."""
+    levels = task_levels(ANALYSIS_GRAPH)
+    order = [(task.name, is_async) for task, is_async in schedule(ANALYSIS_GRAPH)]
+
+    assert [[task.name for task in level] for level in levels] == [
+        ['price', 'news'], ['sentiment'], ['recommendation']
+    ]
+    assert order == [
+        ('price', True), ('news', True), ('sentiment', False), ('recommendation', False)
+    ]
+    news = next(task for task in ANALYSIS_GRAPH if task.name == 'news')
+    assert news.inputs == ()
+
+
+def test_schedule_adds_join_between_parallel_levels():
+    """Test consecutive parallel levels are separated by a synchronous join task."""
+    graph = (spec('a'), spec('b'), spec('c', 'a'), spec('d', 'b'), spec('e', 'c', 'd'))
+
+    order = [(task.name, is_async) for task, is_async in schedule(graph)]
+
+    assert order == [
+        ('a', True), ('b', True), ('c', False), ('d', True), ('e', False)
+    ]
+
+
+def test_schedule_ends_with_synchronous_task():
+    """Test a graph ending in a parallel level still ends with a synchronous task."""
+    order = [(task.name, is_async) for task, is_async in schedule((spec('a'), spec('b')))]
+
+    assert order == [('a', True), ('b', False)]
+
+
+@pytest.mark.parametrize('graph, message', [
+    ((spec('a', 'missing'),), 'unknown task'),
+    ((spec('a', 'b'), spec('b', 'a')), 'cycle'),
+    ((spec('a'), spec('a')), 'Duplicate'),
+])
+def test_task_levels_rejects_invalid_graphs(graph, message):
+    """Test invalid graphs are reported with a clear error."""
+    with pytest.raises(ValueError, match=message):
+        task_levels(graph)
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.server import AnalysisService, create_app
+from src.utils import events
+from src.utils.events import AnalysisFinished, PriceSummary
+from src.utils.recommendation import Recommendation
+from src.utils.validation import TickerValidationResult
+
+
+@pytest.fixture
+def mock_session_class():
+    with patch('src.server.AnalyzerSession') as session_class:
+        yield session_class
+
+
+def run_with_client(service: AnalysisService, scenario):
+    """Run ``scenario(client)`` against an app serving ``service``."""
+    async def main():
+        async with TestClient(TestServer(create_app(service))) as client:
+            return await scenario(client)
+
+    return asyncio.run(main())
+
+
+def fake_analysis(release: threading.Event, calls: list[str]):
+    """analyze_ticker stand-in that publishes events and waits for ``release``."""
+    def analyze(ticker, session, run_metrics, on_event):
+        calls.append(ticker)
+        with events.listening(ticker, on_event):
+            events.publish(PriceSummary, summary={"close": 1.0})
+            release.wait(timeout=5)
+            events.publish(AnalysisFinished, success=True, recommendation=Recommendation(ticker, "Buy", "Up"))
+        return True, None
+
+    return analyze
+
+
+def test_concurrent_requests_for_a_ticker_share_one_analysis(mock_session_class):
+    """Test requests arriving while a ticker is analyzed join the running analysis."""
+    release, calls = threading.Event(), []
+    service = AnalysisService(max_crews=2, planning=False)
+
+    async def scenario(client):
+        first = asyncio.ensure_future(client.post("/analyze/aapl"))
+        while service.in_flight == 0:
+            await asyncio.sleep(0.01)
+        second = asyncio.ensure_future(client.post("/analyze/AAPL"))
+        await asyncio.sleep(0.05)
+        release.set()
+        return [await (await response).json() for response in (first, second)]
+
+    with patch('src.server.analyze_ticker', side_effect=fake_analysis(release, calls)):
+        results = run_with_client(service, scenario)
+
+    assert calls == ["AAPL"]
+    assert results[0] == results[1]
+    assert results[0]["recommendation"]["action"] == "Buy"
+    assert service.stats["coalesced"] == 1
+    assert service.in_flight == 0
+
+
+def test_analysis_beyond_admission_limit_is_rejected(mock_session_class):
+    """Test a new ticker is rejected once every crew and pending slot is taken."""
+    release, calls = threading.Event(), []
+    service = AnalysisService(max_crews=1, max_pending=0, planning=False)
+
+    async def scenario(client):
+        first = asyncio.ensure_future(client.post("/analyze/AAPL"))
+        while service.in_flight == 0:
+            await asyncio.sleep(0.01)
+        rejected = await client.post("/analyze/MSFT")
+        release.set()
+        await first
+        return rejected.status, rejected.headers.get("Retry-After")
+
+    with patch('src.server.analyze_ticker', side_effect=fake_analysis(release, calls)):
+        status, retry_after = run_with_client(service, scenario)
+
+    assert status == 503
+    assert retry_after is not None
+    assert calls == ["AAPL"]
+
+
+def test_streamed_analysis_sends_events_as_json_lines(mock_session_class):
+    """Test ?stream=1 returns each event of the analysis as one JSON line."""
+    release, calls = threading.Event(), []
+    release.set()
+    service = AnalysisService(planning=False)
+
+    async def scenario(client):
+        response = await client.post("/analyze/AAPL?stream=1")
+        return [json.loads(line) for line in (await response.text()).splitlines()]
+
+    with patch('src.server.analyze_ticker', side_effect=fake_analysis(release, calls)):
+        lines = run_with_client(service, scenario)
+
+    assert [line["type"] for line in lines] == ["price_summary", "analysis_finished"]
+    assert lines[-1]["recommendation"]["action"] == "Buy"
+
+
+@patch('src.server.validate_ticker_symbol')
+def test_validate_endpoint(mock_validate, mock_session_class):
+    """Test the validate endpoint returns the validation result as JSON."""
+    mock_validate.return_value = TickerValidationResult("AAPL", True, "Apple Inc.", None)
+
+    async def scenario(client):
+        response = await client.get("/validate/aapl")
+        return response.status, await response.json()
+
+    status, body = run_with_client(AnalysisService(planning=False), scenario)
+
+    assert status == 200
+    assert body == {"ticker": "AAPL", "is_valid": True, "company_name": "Apple Inc.", "error_message": None}
+    mock_validate.assert_called_once_with("AAPL")
+
+
+@patch('src.server.get_price_loader')
+def test_price_endpoint(mock_get_price_loader, mock_session_class):
+    """Test the price endpoint serves the price summary and checks its arguments."""
+    loader = mock_get_price_loader.return_value
+    loader.get_price_data.side_effect = lambda ticker, days: {"ticker": ticker, "bars": days} if ticker == "AAPL" else None
+
+    async def scenario(client):
+        responses = [
+            await client.get("/price/AAPL?days=5"),
+            await client.get("/price/NONE"),
+            await client.get("/price/AAPL?days=x"),
+        ]
+        return [response.status for response in responses], await responses[0].json()
+
+    statuses, body = run_with_client(AnalysisService(planning=False), scenario)
+
+    assert statuses == [200, 404, 400]
+    assert body == {"ticker": "AAPL", "bars": 5}
+
+
+def test_health_endpoint(mock_session_class):
+    """Test the health endpoint reports the admission limits."""
+    async def scenario(client):
+        return await (await client.get("/health")).json()
+
+    body = run_with_client(AnalysisService(max_crews=3, max_pending=7, planning=False), scenario)
+
+    assert body["status"] == "ok"
+    assert (body["max_crews"], body["max_pending"], body["in_flight"]) == (3, 7, 0)
@@ -0,0 +1,180 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from crewai.agents.agent_builder.utilities.base_token_process import TokenProcess
+
+from src.session import (
+    PLANNING_MODEL,
+    AnalyzerSession,
+    ContextTask,
+    SessionPool,
+    TaskPlanner,
+)
+from src.utils import events
+from src.utils.digest import DigestLimits
+from src.utils.events import NewsItems
+from src.utils.metrics import RunMetrics, current_run, recording
+
+
+@pytest.fixture
+def mock_agents():
+    """Patch the four agent classes used by AnalyzerSession."""
+    with patch('src.session.PriceAgent') as price, \
+            patch('src.session.NewsAgent') as news, \
+            patch('src.session.SentimentAgent') as sentiment, \
+            patch('src.session.RecommendationAgent') as recommendation:
+        yield price, news, sentiment, recommendation
+
+
+@patch('src.session.CrewPlanner')
+@patch('src.session.Crew')
+@patch('src.session.ContextTask')
+def test_session_reuses_agents_and_plans(mock_task_class, mock_crew_class, mock_planner_class, mock_agents):
+    """Test a session builds agents and plans once for several tickers."""
+    mock_planner_class.return_value._handle_crew_planning.return_value.list_of_plans_per_task = [
+        MagicMock(plan=" Look up {ticker}.") for _ in range(4)
+    ]
+    session = AnalyzerSession()
+
+    session.run("AAPL")
+    session.run("MSFT")
+
+    for agent_class in mock_agents:
+        agent_class.assert_called_once()
+    mock_planner_class.assert_called_once()
+    assert mock_crew_class.call_count == 2
+    # Four template tasks for planning plus four tasks per ticker
+    assert mock_task_class.call_count == 12
+    descriptions = [c.kwargs["description"] for c in mock_task_class.call_args_list[8:]]
+    assert descriptions[0] == "Fetch recent price data for MSFT. Look up MSFT."
+
+
+@patch('src.session.CrewPlanner')
+@patch('src.session.Crew')
+@patch('src.session.ContextTask')
+def test_session_without_planning(mock_task_class, mock_crew_class, mock_planner_class, mock_agents):
+    """Test planning can be turned off entirely."""
+    AnalyzerSession(planning=False).run("AAPL")
+
+    mock_planner_class.assert_not_called()
+    assert mock_task_class.call_count == 4
+    assert mock_crew_class.call_args.kwargs["planning"] is False
+
+
+@patch('src.session.CrewPlanner')
+@patch('src.session.ContextTask')
+def test_task_planner_is_shared_between_sessions(mock_task_class, mock_planner_class, mock_agents):
+    """Test sessions sharing a planner only plan once."""
+    planner = TaskPlanner()
+    first = AnalyzerSession(planner=planner)
+    second = AnalyzerSession(planner=planner)
+
+    first_plans = planner.plans(first.graph, first.agents)
+    second_plans = planner.plans(second.graph, second.agents)
+
+    assert first_plans is second_plans
+    mock_planner_class.assert_called_once()
+
+
+def test_session_pool_lends_idle_sessions_and_shares_the_planner(mock_agents):
+    """Test a returned session is lent again and sessions in use at once are distinct."""
+    pool = SessionPool(planning=False)
+
+    with pool.session() as first, pool.session() as second:
+        assert first is not second
+    with pool.session() as again:
+        assert again in (first, second)
+
+    assert first.planner is second.planner is pool.planner
+    assert first.planning is False
+
+
+@patch('src.session.limited_llm')
+@patch('src.session.CrewPlanner')
+@patch('src.session.ContextTask')
+def test_task_planner_llm_is_rate_limited_and_cached(mock_task_class, mock_planner_class, mock_limited_llm, mock_agents):
+    """Test the planning LLM goes through the same rate limit and response cache as the agents."""
+    cache = MagicMock()
+    planner = TaskPlanner(llm_cache=cache)
+    session = AnalyzerSession(planner=planner)
+
+    planner.plans(session.graph, session.agents)
+
+    mock_limited_llm.assert_called_with(PLANNING_MODEL, cache)
+    assert mock_planner_class.call_args.kwargs["planning_agent_llm"] is mock_limited_llm.return_value
+
+
+@patch('src.session.Crew')
+@patch('src.session.ContextTask')
+def test_session_records_task_durations_and_token_deltas(mock_task_class, mock_crew_class, mock_agents):
+    """Test a recorded run gets each task's duration and the tokens used during that run only."""
+    price_agent = mock_agents[0].return_value.agent
+    price_agent._token_process = TokenProcess()
+    price_agent._token_process.sum_prompt_tokens(500)
+    session = AnalyzerSession(planning=False)
+    crew = mock_crew_class.return_value
+    crew.tasks = [MagicMock(execution_duration=float(i + 1)) for i in range(4)]
+    crew.kickoff.side_effect = lambda: price_agent._token_process.sum_completion_tokens(40)
+
+    run = RunMetrics("AAPL")
+    with recording(run):
+        session.run("AAPL")
+
+    assert run.stages == {"task.price": 1.0, "task.news": 2.0, "task.sentiment": 3.0, "task.recommendation": 4.0}
+    assert run.tokens["price"]["completion_tokens"] == 40
+    assert run.tokens["price"]["total_tokens"] == 40
+    assert set(run.tokens) == {"price"}
+
+
+def test_context_task_runs_async_in_callers_context():
+    """Test async tasks see the metrics of the run that started them."""
+    seen = []
+    task = ContextTask(description="d", expected_output="o")
+    run = RunMetrics("AAPL")
+
+    with patch.object(ContextTask, '_execute_core', lambda self, *args: seen.append(current_run()) or MagicMock(raw="done")):
+        with recording(run):
+            future = task.execute_async()
+        future.result(timeout=5)
+
+    assert seen == [run]
+
+
+def test_context_task_publishes_stage_events():
+    """Test executing a task publishes its start and its finish with the raw output."""
+    received = []
+    task = ContextTask(name="price", description="d", expected_output="o")
+
+    with patch.object(ContextTask, '_execute_core', lambda self, *args: MagicMock(raw="done")):
+        with events.listening("AAPL", received.append):
+            task.execute_sync()
+
+    assert [(event.type, event.stage) for event in received] == [
+        ("stage_started", "task.price"), ("stage_finished", "task.price"),
+    ]
+    assert received[1].output == "done"
+
+
+def test_context_task_passes_digests_to_dependent_tasks():
+    """Test a dependent task receives the capped digest of its input instead of the raw answer."""
+    news = ContextTask(name="news", description="d", expected_output="o", digest_limits=DigestLimits(40, 2))
+    sentiment = ContextTask(name="sentiment", description="d", expected_output="o", context=[news])
+    articles = [{"title": f"Story {i}", "url": f"https://example.com/{i}", "summary": "x" * 500} for i in range(10)]
+    contexts = []
+
+    def execute_core(self, agent, context, tools):
+        contexts.append(context)
+        if self.name == "news":
+            events.publish(NewsItems, query="q", articles=articles)
+        self.output = MagicMock(raw="Long answer. " * 100)
+        return self.output
+
+    with patch.object(ContextTask, '_execute_core', execute_core):
+        news.execute_sync()
+        sentiment.execute_sync(context="raw news answer")
+
+    digest = json.loads(contexts[1])
+    assert [item["url"] for item in digest["news"]] == ["https://example.com/0", "https://example.com/1"]
+    assert len(digest["answer"]) <= 40
+    assert len(contexts[1]) < 1000
@@ -0,0 +1,108 @@
+import json
+
+from src.utils.batch_prompts import (
+    BatchPrompter,
+    TickerBrief,
+    estimate_tokens,
+    pack,
+    parse_recommendations,
+    parse_scores,
+)
+from src.utils.recommendation import Recommendation
+
+
+class ScriptedLLM:
+    """Answers each call with the next scripted response and records the prompts."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.prompts = []
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        self.prompts.append(messages[-1]["content"])
+        return self.answers.pop(0)
+
+
+def recommendation(ticker, action="Hold"):
+    return {"ticker": ticker, "action": action, "explanation": f"{ticker} call.", "references": []}
+
+
+def test_pack_respects_the_token_budget():
+    """Test sections are grouped in order without exceeding the budget, and an oversized one goes alone."""
+    sections = {"A": "x" * 40, "B": "x" * 40, "C": "x" * 400, "D": "x" * 40}
+
+    batches = pack(sections, budget=30, overhead=5)
+
+    assert batches == [["A", "B"], ["C"], ["D"]]
+    assert estimate_tokens("x" * 41) == 11
+
+
+def test_parse_recommendations_keeps_valid_requested_tickers():
+    """Test objects with an unknown action or an unrequested ticker are dropped."""
+    text = "Here you go:\n```json\n" + json.dumps([
+        recommendation("aapl", "buy"),
+        {"ticker": "MSFT", "action": "Maybe", "explanation": "?"},
+        recommendation("TSLA"),
+    ]) + "\n```"
+
+    parsed = parse_recommendations(text, ["AAPL", "MSFT"])
+
+    assert parsed == {"AAPL": Recommendation("AAPL", "Buy", "aapl call.", [])}
+
+
+def test_parse_scores_clips_and_skips_invalid_items():
+    """Test scores are clipped to [-1, 1] and items without a numeric score are ignored."""
+    text = '[{"id": "A-0", "score": 1.7}, {"id": "A-1", "score": "n/a"}, {"id": "B-0", "score": -0.4}]'
+
+    assert parse_scores(text, ["A-0", "A-1", "B-0"]) == {"A-0": 1.0, "B-0": -0.4}
+
+
+def test_recommend_asks_again_only_for_failed_tickers():
+    """Test many tickers share one request and only the unparsed ones are sent again."""
+    briefs = [TickerBrief(ticker, sentiment=0.1) for ticker in ("AAPL", "MSFT", "NVDA")]
+    llm = ScriptedLLM(
+        json.dumps([recommendation("AAPL", "Buy"), {"ticker": "MSFT", "action": "?"}, recommendation("NVDA")]),
+        json.dumps([recommendation("MSFT", "Sell")]),
+    )
+    prompter = BatchPrompter(llm)
+
+    recommendations = prompter.recommend(briefs)
+
+    assert {ticker: rec.action for ticker, rec in recommendations.items()} == {
+        "AAPL": "Buy", "MSFT": "Sell", "NVDA": "Hold",
+    }
+    assert prompter.requests == 2
+    assert all(f"## {ticker}" in llm.prompts[0] for ticker in ("AAPL", "MSFT", "NVDA"))
+    assert "## MSFT" in llm.prompts[1] and "## AAPL" not in llm.prompts[1]
+
+
+def test_recommend_gives_up_after_max_attempts():
+    """Test a ticker that never parses is left out once the attempts are used up."""
+    llm = ScriptedLLM("I cannot answer.", "Still no JSON.")
+    prompter = BatchPrompter(llm, max_attempts=2)
+
+    assert prompter.recommend([TickerBrief("AAPL")]) == {}
+    assert prompter.requests == 2
+
+
+def test_score_sentiment_sends_only_ambiguous_headlines():
+    """Test clear headlines are scored locally and the ambiguous ones of all tickers share one request."""
+    briefs = [
+        TickerBrief("AAPL", articles=[
+            {"title": "Apple shares surge after record profit beats estimates"},
+            {"title": "Apple to hold its annual event in September"},
+        ]),
+        TickerBrief("MSFT", articles=[{"title": "Microsoft schedules shareholder meeting"}]),
+        TickerBrief("NVDA"),
+    ]
+    llm = ScriptedLLM('[{"id": "AAPL-1", "score": 0.2}, {"id": "MSFT-0", "score": -0.5}]')
+
+    BatchPrompter(llm).score_sentiment(briefs)
+
+    assert len(llm.prompts) == 1
+    assert "surge" not in llm.prompts[0]
+    assert "[AAPL-1]" in llm.prompts[0] and "[MSFT-0]" in llm.prompts[0]
+    assert briefs[0].sentiment > 0.2
+    assert briefs[0].ambiguous == 1
+    assert briefs[1].sentiment == -0.5
+    assert briefs[2].sentiment is None
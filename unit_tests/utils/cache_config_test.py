@@ -0,0 +1,12 @@
+from src.utils.cache_config import CACHE_DIR_ENV, get_cache_dir
+
+
+def test_cache_dir_from_environment_expands_the_home_directory(monkeypatch, tmp_path):
+    """Test a '~'-prefixed cache directory lands in the home directory, not in a literal '~' folder."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv(CACHE_DIR_ENV, "~/.cache/ticker-analyzer")
+
+    path = get_cache_dir("prices")
+
+    assert path == tmp_path / ".cache" / "ticker-analyzer" / "prices"
+    assert path.is_dir()
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.cross_section import compute_cross_section, returns_matrix
+
+
+def frame(returns, start="2024-01-01"):
+    """Build a close-only frame whose daily log returns are ``returns``."""
+    closes = 100.0 * np.exp(np.concatenate([[0.0], np.cumsum(returns)]))
+    return pd.DataFrame({"Close": closes}, index=pd.bdate_range(start, periods=len(closes)))
+
+
+@pytest.fixture
+def universe():
+    """A benchmark and three tickers with known betas and one that starts later."""
+    rng = np.random.default_rng(7)
+    market = rng.normal(0.0, 0.01, 80)
+    return {
+        "SPY": frame(market),
+        "HIGH": frame(1.5 * market + 0.002),
+        "LOW": frame(0.5 * market - 0.001),
+        "LATE": frame(rng.normal(0.0, 0.01, 60), start="2024-01-29"),
+    }
+
+
+def test_returns_matrix_aligns_tickers_on_dates(universe):
+    """Test tickers of different lengths are aligned and missing days stay NaN."""
+    tickers, returns = returns_matrix(universe, window=80)
+
+    assert tickers == ["SPY", "HIGH", "LOW", "LATE"]
+    assert returns.shape == (80, 4)
+    assert np.isnan(returns[:20, 3]).all() and not np.isnan(returns[20:, 3]).any()
+
+
+def test_cross_section_aligns_exchange_local_and_naive_frames(universe):
+    """Test a benchmark fetched alone (exchange-local index) lines up with a batch-downloaded watchlist."""
+    mixed = dict(universe, SPY=universe["SPY"].tz_localize("America/New_York"))
+
+    assert compute_cross_section(mixed, benchmark="SPY") == compute_cross_section(universe, benchmark="SPY")
+
+
+def test_cross_section_betas_ranks_and_zscores(universe):
+    """Test betas against the benchmark, relative strength ranks and the z-scored window moves."""
+    stats = compute_cross_section(universe, benchmark="SPY", window=60)
+
+    assert set(stats) == {"HIGH", "LOW", "LATE"}
+    assert stats["HIGH"]["beta"] == pytest.approx(1.5)
+    assert stats["LOW"]["beta"] == pytest.approx(0.5)
+    assert stats["HIGH"]["benchmark_correlation"] == pytest.approx(1.0)
+    assert stats["HIGH"]["most_correlated"]["ticker"] == "LOW"
+    ranks = sorted((row["relative_strength_rank"], ticker) for ticker, row in stats.items())
+    assert ranks[0] == (1, "HIGH")
+    zscores = [row["return_zscore"] for row in stats.values()]
+    assert sum(zscores) == pytest.approx(0.0, abs=0.02)
+    assert stats["HIGH"]["peer_count"] == 2
+
+
+def test_cross_section_without_peers_or_benchmark():
+    """Test a lone ticker gets its window return but no peer or benchmark statistics."""
+    stats = compute_cross_section({"AAPL": frame(np.full(30, 0.01))}, benchmark="SPY")
+
+    assert stats["AAPL"]["return_pct"] == pytest.approx(34.99, abs=0.01)
+    assert stats["AAPL"]["avg_peer_correlation"] is None
+    assert stats["AAPL"]["return_zscore"] is None
+    assert "beta" not in stats["AAPL"]
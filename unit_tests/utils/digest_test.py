@@ -0,0 +1,39 @@
+import json
+
+from src.utils.digest import DigestLimits, build_digest, truncate
+from src.utils.events import PriceSummary, SentimentScore
+
+
+def price_summary(bars):
+    """Build a price tool payload whose sampled closes grow with the window."""
+    return {
+        "start": "2024-01-01", "end": "2024-12-31", "close": 101.5, "change_pct": 4.2,
+        "closes": {"date": [f"d{i}" for i in range(bars)], "close": [100.0 + i for i in range(bars)]},
+        "indicators": {"rsi_14": 61.0, "sma": {"20": 99.0}},
+    }
+
+
+def test_truncate_prefers_sentence_boundaries():
+    """Test long text is cut after a sentence and short text is only whitespace-normalized."""
+    assert truncate("Shares rose.  Volume  was high", 100) == "Shares rose. Volume was high"
+    assert truncate("Shares rose sharply. Volume was very high today.", 30) == "Shares rose sharply. …"
+
+
+def test_digest_size_does_not_grow_with_the_price_window():
+    """Test the digest keeps the key numbers only, so a longer window yields the same digest."""
+    limits = DigestLimits(max_chars=100)
+    short = build_digest("Up.", [PriceSummary(ticker="AAPL", summary=price_summary(10))], limits)
+    long = build_digest("Up.", [PriceSummary(ticker="AAPL", summary=price_summary(500))], limits)
+
+    assert short == long
+    assert json.loads(short)["key_numbers"] == {"close": 101.5, "change_pct": 4.2, "rsi_14": 61.0}
+
+
+def test_digest_keeps_the_last_sentiment_score():
+    """Test the local sentiment score of the task's tool reaches the digest."""
+    captured = [SentimentScore(ticker="AAPL", score=0.1, texts=3, ambiguous=0),
+                SentimentScore(ticker="AAPL", score=0.4, texts=5, ambiguous=1)]
+
+    digest = json.loads(build_digest("Positive overall.", captured, DigestLimits()))
+
+    assert digest == {"local_sentiment_score": 0.4, "answer": "Positive overall."}
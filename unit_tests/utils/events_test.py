@@ -0,0 +1,51 @@
+import json
+
+from src.utils import events
+from src.utils.events import AnalysisFinished, PriceSummary
+from src.utils.recommendation import Recommendation
+
+
+def test_publish_without_listener_is_a_no_op():
+    """Test publishing outside a listening block does nothing."""
+    assert events.publishing() is False
+    events.publish(PriceSummary, summary={"close": 1.0})
+
+
+def test_listener_receives_events_tagged_with_ticker():
+    """Test events published inside the block reach the callback with the block's ticker."""
+    received = []
+    with events.listening("AAPL", received.append):
+        assert events.publishing() is True
+        events.publish(PriceSummary, summary={"close": 1.0})
+
+    assert len(received) == 1
+    assert received[0].ticker == "AAPL"
+    assert received[0].summary == {"close": 1.0}
+    assert events.publishing() is False
+
+
+def test_capturing_collects_events_with_or_without_listener():
+    """Test events published inside a capturing block are collected and still reach the listener."""
+    received = []
+    with events.capturing() as captured:
+        assert events.publishing() is True
+        events.publish(PriceSummary, summary={"close": 1.0})
+        with events.listening("AAPL", received.append):
+            events.publish(PriceSummary, summary={"close": 2.0})
+
+    assert [(event.ticker, event.summary["close"]) for event in captured] == [("", 1.0), ("AAPL", 2.0)]
+    assert received == captured[1:]
+    assert events.publishing() is False
+
+
+def test_event_serializes_with_type_and_nested_recommendation():
+    """Test events serialize to JSON with their type and nested dataclasses."""
+    event = AnalysisFinished(
+        ticker="AAPL", success=True, recommendation=Recommendation("AAPL", "Buy", "Momentum", ["https://x"])
+    )
+
+    data = json.loads(event.to_json())
+
+    assert data["type"] == "analysis_finished"
+    assert data["recommendation"]["action"] == "Buy"
+    assert isinstance(data["timestamp"], float)
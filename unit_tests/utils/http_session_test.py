@@ -0,0 +1,69 @@
+import contextvars
+import threading
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from src.utils import http_session
+from src.utils.http_session import (
+    DEFAULT_POOL_SIZE,
+    get_http_session,
+    get_yahoo_session,
+    sharing_tickers,
+    ticker_info,
+    yahoo_ticker,
+)
+from src.utils.price_loader import YahooPriceSource
+from src.utils.validation import validate_ticker_symbol
+
+
+def test_http_session_is_shared_and_pooled():
+    """Test plain HTTP calls share one session with a keep-alive pool sized for many workers."""
+    session = get_http_session()
+
+    assert get_http_session() is session
+    assert session.get_adapter("https://api.search.brave.com")._pool_maxsize == DEFAULT_POOL_SIZE
+
+    http_session.reset_sessions()
+    assert get_http_session() is not session
+
+
+@patch('yfinance.Ticker')
+def test_yahoo_ticker_is_reused_within_an_analysis(mock_yf_ticker):
+    """Test Ticker objects are shared by symbol inside sharing_tickers and created afresh outside."""
+    mock_yf_ticker.side_effect = lambda symbol, session: MagicMock(symbol=symbol)
+
+    with sharing_tickers():
+        first = yahoo_ticker("AAPL")
+        assert yahoo_ticker("aapl") is first
+        assert yahoo_ticker("MSFT") is not first
+        # Worker threads started with a copy of the context see the same objects
+        seen = []
+        context = contextvars.copy_context()
+        thread = threading.Thread(target=context.run, args=(lambda: seen.append(yahoo_ticker("AAPL")),))
+        thread.start()
+        thread.join()
+        assert seen == [first]
+
+    assert yahoo_ticker("AAPL") is not first
+    assert {call.kwargs["session"] for call in mock_yf_ticker.call_args_list} == {get_yahoo_session()}
+
+
+def test_ticker_info_remembers_the_exchange_timezone():
+    """Test fetched info seeds the ticker's timezone so history needs no extra lookup."""
+    ticker = MagicMock(_tz=None, info={"shortName": "Apple", "exchangeTimezoneName": "America/New_York"})
+
+    assert ticker_info(ticker)["shortName"] == "Apple"
+    assert ticker._tz == "America/New_York"
+
+
+@patch('yfinance.Ticker')
+def test_validation_and_price_fetch_share_the_ticker(mock_yf_ticker, mock_ticker):
+    """Test the price stage reuses the Ticker created while validating the symbol."""
+    mock_yf_ticker.return_value = mock_ticker
+
+    with sharing_tickers():
+        assert validate_ticker_symbol("AAPL").is_valid
+        frames = YahooPriceSource().fetch(["AAPL"], date(2023, 1, 1), date(2023, 1, 11))
+
+    assert len(frames["AAPL"]) == 10
+    mock_yf_ticker.assert_called_once()
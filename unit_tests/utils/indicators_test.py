@@ -0,0 +1,100 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.indicators import IndicatorEngine
+from src.utils.price_series import PriceSeries
+
+
+def make_series(bars: int = 80, seed: int = 3) -> PriceSeries:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+    frame = pd.DataFrame(
+        {
+            "Open": close * (1 + rng.normal(0, 0.005, bars)),
+            "High": close * (1 + np.abs(rng.normal(0, 0.01, bars))),
+            "Low": close * (1 - np.abs(rng.normal(0, 0.01, bars))),
+            "Close": close,
+            "Volume": rng.integers(1_000, 10_000, bars),
+        },
+        index=pd.bdate_range("2024-01-01", periods=bars),
+    )
+    return PriceSeries.from_frame("TEST", frame)
+
+
+def head(series: PriceSeries, bars: int) -> PriceSeries:
+    return PriceSeries(
+        series.ticker, series.dates[:bars], series.open[:bars], series.high[:bars],
+        series.low[:bars], series.close[:bars], series.volume[:bars],
+    )
+
+
+def flatten(payload: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in payload.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def test_indicators_match_pandas_reference():
+    """Test the indicators agree with straightforward pandas implementations."""
+    series = make_series()
+    close = pd.Series(series.close)
+    high, low = pd.Series(series.high), pd.Series(series.low)
+
+    result = IndicatorEngine().indicators(series)
+
+    assert result["sma"]["20"] == pytest.approx(close.rolling(20).mean().iloc[-1], abs=1e-4)
+    assert result["ema"]["12"] == pytest.approx(close.ewm(span=12, adjust=False).mean().iloc[-1], abs=1e-4)
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    assert result["macd"]["macd"] == pytest.approx(macd.iloc[-1], abs=1e-4)
+    assert result["macd"]["signal"] == pytest.approx(macd.ewm(span=9, adjust=False).mean().iloc[-1], abs=1e-4)
+    delta = close.diff().dropna()
+    gain = delta.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean().iloc[-1]
+    loss = (-delta).clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean().iloc[-1]
+    assert result["rsi_14"] == pytest.approx(100 - 100 / (1 + gain / loss), abs=0.01)
+    previous = close.shift(1).fillna(close.iloc[0])
+    true_range = pd.concat([high - low, (high - previous).abs(), (low - previous).abs()], axis=1).max(axis=1)
+    assert result["atr_14"] == pytest.approx(true_range.ewm(alpha=1 / 14, adjust=False).mean().iloc[-1], abs=1e-4)
+    assert result["max_drawdown_pct"] == pytest.approx((close / close.cummax() - 1).min() * 100, abs=0.01)
+    volatility = np.log(close).diff().iloc[-20:].std()
+    assert result["volatility_20d_pct"] == pytest.approx(volatility * 100, abs=0.01)
+
+
+def test_incremental_updates_match_full_recompute():
+    """Test advancing a cached state over new bars gives the same result as starting over."""
+    series = make_series()
+    engine = IndicatorEngine()
+    engine.indicators(head(series, 60))
+
+    with patch.object(IndicatorEngine, "compute", wraps=engine.compute) as compute:
+        incremental = engine.indicators(series)
+
+    compute.assert_not_called()
+    assert flatten(incremental) == pytest.approx(flatten(IndicatorEngine().indicators(series)))
+
+
+def test_forming_bar_is_not_cached():
+    """Test a revised last bar replaces the earlier partial value instead of adding to it."""
+    series = make_series(30)
+    engine = IndicatorEngine()
+    partial = head(series, 30)
+    partial.close = series.close.copy()
+    partial.close[-1] *= 1.1
+    engine.indicators(partial)
+
+    assert flatten(engine.indicators(series)) == pytest.approx(flatten(IndicatorEngine().indicators(series)))
+
+
+def test_short_history_leaves_slow_indicators_undefined():
+    """Test windows longer than the history are reported as None."""
+    result = IndicatorEngine().indicators(head(make_series(), 8))
+
+    assert result["sma"]["5"] is not None
+    assert result["sma"]["50"] is None
+    assert IndicatorEngine().indicators(head(make_series(), 0)) == {}
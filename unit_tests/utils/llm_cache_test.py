@@ -0,0 +1,103 @@
+from unittest.mock import patch
+
+import pytest
+from crewai.llms.base_llm import BaseLLM
+
+from src.agents.sentiment_agent import SentimentAgent
+from src.utils.llm_cache import CachedLLM, ResponseCache
+
+
+class FakeLLM(BaseLLM):
+    """LLM returning a numbered answer and counting its calls."""
+
+    def __init__(self, model="fake-model"):
+        super().__init__(model=model)
+        self.calls = 0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        self.calls += 1
+        return f"answer {self.calls}"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(tmp_path / "responses.sqlite3")
+
+
+def test_cached_llm_answers_repeated_prompts_from_cache(cache):
+    """Test an identical prompt is only sent to the model once."""
+    inner = FakeLLM()
+    llm = CachedLLM(inner, cache)
+    messages = [{"role": "user", "content": "Sentiment of: AAPL beats earnings"}]
+
+    first = llm.call(messages)
+    second = llm.call(messages)
+    other = llm.call([{"role": "user", "content": "Sentiment of: AAPL misses earnings"}])
+
+    assert first == second == "answer 1"
+    assert other == "answer 2"
+    assert inner.calls == 2
+    assert cache.stats() == {"hits": 1, "misses": 2, "hit_rate": pytest.approx(1 / 3)}
+
+
+def test_cache_key_covers_model(cache):
+    """Test the same prompt to a different model is not served from the cache."""
+    messages = "Summarize AAPL news"
+    CachedLLM(FakeLLM("model-a"), cache).call(messages)
+
+    inner = FakeLLM("model-b")
+    CachedLLM(inner, cache).call(messages)
+
+    assert inner.calls == 1
+
+
+def test_cached_llm_skips_function_execution_calls(cache):
+    """Test calls where the LLM executes functions itself always reach the model."""
+    inner = FakeLLM()
+    llm = CachedLLM(inner, cache)
+
+    llm.call("price?", available_functions={"tool": print})
+    llm.call("price?", available_functions={"tool": print})
+
+    assert inner.calls == 2
+
+
+def test_cached_llm_forwards_stop_words():
+    """Test stop words set by CrewAI reach the wrapped LLM."""
+    inner = FakeLLM()
+    llm = CachedLLM(inner, ResponseCache(":memory:"))
+
+    llm.stop = ["\nObservation:"]
+
+    assert inner.stop == ["\nObservation:"]
+
+
+def test_response_cache_ttl_and_lru_eviction(tmp_path):
+    """Test expired entries miss and the least recently used entries are evicted."""
+    cache = ResponseCache(tmp_path / "responses.sqlite3", ttl=60, max_entries=2)
+    cache.put("a", "m", "A")
+    cache.put("b", "m", "B")
+    cache.get("a")
+    cache.put("c", "m", "C")
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    with patch("src.utils.llm_cache.time.time", return_value=10**12):
+        assert cache.get("c") is None
+
+
+def test_response_cache_persists(tmp_path):
+    """Test responses survive reopening the database."""
+    ResponseCache(tmp_path / "responses.sqlite3").put("key", "m", "stored")
+
+    assert ResponseCache(tmp_path / "responses.sqlite3").get("key") == "stored"
+
+
+def test_agents_accept_cached_llm(cache):
+    """Test an agent keeps the caching wrapper as its LLM."""
+    llm = CachedLLM(FakeLLM(), cache)
+
+    agent = SentimentAgent(llm=llm).agent
+
+    assert agent.llm is llm
@@ -0,0 +1,113 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from src.utils import metrics
+from src.utils.metrics import BatchMetrics, RunMetrics, recording
+from src.utils.news_cache import NewsSearchCache, StubSearchBackend
+from src.utils.price_loader import PriceLoader
+
+
+def test_run_report_groups_counters_and_tokens():
+    """Test the JSON report splits counters into HTTP requests and cache hit rates."""
+    run = RunMetrics("AAPL")
+    run.add_stage("price_fetch", 0.5)
+    run.add_stage("price_fetch", 0.25)
+    run.count("http.yahoo", 2)
+    run.count("http.brave")
+    for hit in (True, True, False):
+        run.count(f"cache.llm.{'hits' if hit else 'misses'}")
+    run.add_tokens("news", {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120})
+    run.add_tokens("sentiment", {"total_tokens": 30})
+    run.finish(True)
+
+    report = json.loads(run.to_json())
+
+    assert report["ticker"] == "AAPL"
+    assert report["success"] is True
+    assert report["stages"] == {"price_fetch": 0.75}
+    assert report["http_requests"] == {"brave": 1, "yahoo": 2}
+    assert report["caches"]["llm"] == {"hits": 2, "misses": 1, "hit_rate": pytest.approx(2 / 3)}
+    assert report["llm_tokens"]["news"]["prompt_tokens"] == 100
+    assert report["llm_tokens"]["total"]["total_tokens"] == 150
+
+
+def test_module_helpers_record_only_inside_a_run():
+    """Test counters and stages are no-ops outside a recorded run."""
+    metrics.count("http.yahoo")
+    with metrics.stage("validation"):
+        pass
+
+    run = RunMetrics("AAPL")
+    with recording(run):
+        metrics.count("http.yahoo")
+        metrics.count_cache("prices", hit=False)
+        with metrics.stage("validation"):
+            pass
+
+    assert metrics.current_run() is None
+    assert run.counters == {"http.yahoo": 1, "cache.prices.misses": 1}
+    assert "validation" in run.stages
+
+
+def test_stage_is_recorded_when_block_raises():
+    """Test a failing stage still reports its duration."""
+    run = RunMetrics("AAPL")
+
+    with pytest.raises(ValueError), run.stage("validation"):
+        raise ValueError("boom")
+
+    assert "validation" in run.stages
+
+
+def test_batch_histograms_and_totals():
+    """Test batch histograms bucket stage durations and totals add up across runs."""
+    batch = BatchMetrics(buckets=(1.0, 10.0))
+    for seconds in (0.5, 2.0, 3.0, 30.0):
+        run = RunMetrics("T")
+        run.add_stage("total", seconds)
+        run.count("http.yahoo")
+        run.count("cache.news.hits")
+        run.add_tokens("news", {"total_tokens": 10})
+        run.finish(seconds < 10)
+        batch.add(run)
+
+    report = batch.to_dict()
+    histogram = report["histograms"]["total"]
+
+    assert histogram["count"] == 4
+    assert histogram["p50"] == pytest.approx(2.5)
+    assert histogram["max"] == 30.0
+    assert histogram["buckets"] == {"le_1": 1, "le_10": 2, "inf": 1}
+    assert (report["succeeded"], report["failed"]) == (3, 1)
+    assert report["http_requests"] == {"yahoo": 4}
+    assert report["caches"]["news"]["hit_rate"] == 1.0
+    assert report["llm_tokens"]["total_tokens"] == 40
+
+
+def test_news_searches_are_counted():
+    """Test news search cache lookups and timings land in the current run."""
+    cache = NewsSearchCache(backend=StubSearchBackend(default=[{"title": "T", "url": "https://x.com/a"}]))
+    run = RunMetrics("AAPL")
+
+    with recording(run):
+        cache.search("AAPL stock news")
+        cache.search("AAPL stock news")
+
+    assert run.cache_stats()["news"]["hits"] == 1
+    assert run.cache_stats()["news"]["misses"] == 1
+    assert "news_search" in run.stages
+
+
+@patch('src.utils.price_loader.yf.Ticker')
+def test_price_fetch_counts_yahoo_requests(mock_ticker_class, mock_ticker):
+    """Test a price tool fetch records the Yahoo request and its duration."""
+    mock_ticker_class.return_value = mock_ticker
+    run = RunMetrics("AAPL")
+
+    with recording(run):
+        PriceLoader().get_price_data("AAPL")
+
+    assert run.counters["http.yahoo"] == 1
+    assert "price_fetch" in run.stages
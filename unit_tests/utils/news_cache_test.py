@@ -0,0 +1,104 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.utils.news_cache import (
+    NewsSearchCache,
+    StubSearchBackend,
+    canonical_url,
+    extractive_summary,
+    format_articles,
+)
+
+AAPL_RESULTS = [
+    {"title": "Apple beats quarterly earnings estimates - Reuters",
+     "url": "https://www.reuters.com/apple-earnings/?utm_source=brave",
+     "description": "Apple <strong>reported</strong> record revenue."},
+    {"title": "Apple beats quarterly earnings estimates",
+     "url": "https://finance.example.com/apple-earnings",
+     "description": "Syndicated copy of the Reuters story."},
+    {"title": "Tech stocks rally as chipmakers surge",
+     "url": "https://news.example.com/tech-rally",
+     "description": "Broad rally across the sector."},
+]
+MSFT_RESULTS = [
+    {"title": "Tech stocks rally as chipmakers surge",
+     "url": "https://news.example.com/tech-rally/",
+     "description": "Broad rally across the sector."},
+]
+
+
+@pytest.fixture
+def backend():
+    return StubSearchBackend({"AAPL news": AAPL_RESULTS, "MSFT news": MSFT_RESULTS})
+
+
+def test_search_results_are_cached_within_ttl(backend):
+    """Test a repeated query is served without calling the backend again."""
+    cache = NewsSearchCache(backend)
+
+    cache.search("AAPL news")
+    cache.search("  aapl   NEWS ")
+
+    assert backend.queries == ["AAPL news"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_search_results_expire(backend):
+    """Test expired results are fetched again."""
+    cache = NewsSearchCache(backend, ttl=0)
+
+    cache.search("AAPL news")
+    cache.search("AAPL news")
+
+    assert backend.queries == ["AAPL news", "AAPL news"]
+
+
+def test_expired_results_and_articles_are_forgotten(backend):
+    """Test searching again after the TTL leaves only the articles of live searches in memory."""
+    cache = NewsSearchCache(backend, ttl=0)
+
+    cache.search("AAPL news")
+    cache.search("MSFT news")
+
+    assert len(cache._results) == 1
+    assert cache.stats()["articles"] == 1
+    assert set(cache._titles) <= set(cache._articles) == set(cache._seen)
+
+
+def test_duplicate_articles_are_dropped(backend):
+    """Test syndicated copies with near-identical titles are returned once."""
+    articles = NewsSearchCache(backend).search("AAPL news")
+
+    assert [article.title for article in articles] == [
+        "Apple beats quarterly earnings estimates - Reuters",
+        "Tech stocks rally as chipmakers surge",
+    ]
+
+
+def test_articles_are_summarized_once_across_tickers(backend):
+    """Test an article found for several tickers is stored and summarized once."""
+    summarizer = MagicMock(side_effect=extractive_summary)
+    cache = NewsSearchCache(backend, summarizer=summarizer)
+
+    aapl = cache.search("AAPL news")
+    msft = cache.search("MSFT news")
+
+    assert msft[0] is aapl[1]
+    assert msft[0].queries == {"AAPL news", "MSFT news"}
+    assert summarizer.call_count == 2
+    assert cache.stats()["articles"] == 2
+
+
+def test_canonical_url_ignores_tracking_and_formatting():
+    """Test URLs differing only by scheme, www, tracking parameters or slash match."""
+    assert canonical_url("https://www.Example.com/a/?utm_source=x&id=3") == \
+        canonical_url("http://example.com/a?id=3&fbclid=abc")
+
+
+def test_format_articles_uses_clean_summaries(backend):
+    """Test the rendered results contain cleaned summaries instead of raw HTML snippets."""
+    output = format_articles(NewsSearchCache(backend).search("AAPL news"))
+
+    assert "Summary: Apple reported record revenue." in output
+    assert "<strong>" not in output
@@ -0,0 +1,117 @@
+from datetime import date
+from unittest.mock import MagicMock, call
+
+import pytest
+
+from src.utils.price_cache import CachedPriceSource, PriceCache
+from src.utils.price_loader import DataFramePriceSource
+
+
+@pytest.fixture
+def source(mock_ticker):
+    """Recording fixture source with ten days of AAPL data from 2023-01-01."""
+    return MagicMock(wraps=DataFramePriceSource({'AAPL': mock_ticker.history.return_value}))
+
+
+def test_fresh_cache_serves_without_fetching(source, tmp_path):
+    """Test a second request inside the TTL costs no source call."""
+    cached_source = CachedPriceSource(source, PriceCache(tmp_path))
+
+    first = cached_source.fetch(['AAPL'], date(2023, 1, 1), date(2023, 1, 11))
+    second = cached_source.fetch(['AAPL'], date(2023, 1, 3), date(2023, 1, 11))
+
+    assert source.fetch.call_count == 1
+    assert len(first['AAPL']) == 10
+    assert len(second['AAPL']) == 8
+    assert second['AAPL']['Close'].iloc[0] == 154.0
+
+
+def test_stale_cache_fetches_only_new_bars(source, tmp_path):
+    """Test a stale entry is refreshed from its last bar and merged."""
+    cached_source = CachedPriceSource(source, PriceCache(tmp_path, daily_ttl=0))
+
+    cached_source.fetch(['AAPL'], date(2023, 1, 1), date(2023, 1, 6))
+    result = cached_source.fetch(['AAPL'], date(2023, 1, 1), date(2023, 1, 11))
+
+    assert source.fetch.call_args_list == [
+        call(['AAPL'], date(2023, 1, 1), date(2023, 1, 6), '1d'),
+        call(['AAPL'], date(2023, 1, 5), date(2023, 1, 11), '1d'),
+    ]
+    assert result['AAPL']['Close'].tolist() == [152.0 + i for i in range(10)]
+
+
+def test_earlier_start_backfills_missing_range(source, tmp_path):
+    """Test requesting older history only fetches the part before the cached range."""
+    cached_source = CachedPriceSource(source, PriceCache(tmp_path))
+
+    cached_source.fetch(['AAPL'], date(2023, 1, 6), date(2023, 1, 11))
+    result = cached_source.fetch(['AAPL'], date(2023, 1, 1), date(2023, 1, 11))
+
+    assert source.fetch.call_args_list[1] == call(['AAPL'], date(2023, 1, 1), date(2023, 1, 6), '1d')
+    assert len(result['AAPL']) == 10
+
+
+def test_cache_persists_across_instances(source, tmp_path):
+    """Test a new cache instance (e.g. a new process) reuses stored history."""
+    CachedPriceSource(source, PriceCache(tmp_path)).fetch(['AAPL'], date(2023, 1, 1), date(2023, 1, 11))
+
+    result = CachedPriceSource(source, PriceCache(tmp_path)).fetch(['AAPL'], date(2023, 1, 1), date(2023, 1, 11))
+
+    assert source.fetch.call_count == 1
+    assert len(result['AAPL']) == 10
+
+
+def test_eviction_drops_least_recently_read_entries(mock_ticker, tmp_path):
+    """Test the store stays under max_bytes by evicting the oldest reads first."""
+    frame = mock_ticker.history.return_value
+    cache = PriceCache(tmp_path)
+    cache.write('AAPL', '1d', frame, date(2023, 1, 1))
+    cache.write('MSFT', '1d', frame, date(2023, 1, 1))
+    cache.read('AAPL')
+    cache.max_bytes = cache.size()
+
+    cache.write('GOOG', '1d', frame, date(2023, 1, 1))
+
+    assert cache.read('MSFT') == (None, None)
+    assert cache.read('AAPL')[0] is not None
+    assert cache.read('GOOG')[0] is not None
+    assert not (tmp_path / 'MSFT_1d.parquet').exists()
+
+
+def test_instances_sharing_a_directory_keep_each_others_entries(mock_ticker, tmp_path):
+    """Test a process saving its manifest merges the entries other processes stored meanwhile."""
+    frame = mock_ticker.history.return_value
+    server, watcher = PriceCache(tmp_path), PriceCache(tmp_path)
+
+    server.write('AAPL', '1d', frame, date(2023, 1, 1))
+    watcher.write('MSFT', '1d', frame, date(2023, 1, 1))
+    server.touch('AAPL')
+
+    restarted = PriceCache(tmp_path)
+    assert restarted.read('AAPL')[0] is not None
+    assert restarted.read('MSFT')[0] is not None
+    assert restarted.size() == server.size() == 2 * (tmp_path / 'AAPL_1d.parquet').stat().st_size
+
+
+def test_intraday_intervals_use_shorter_ttl(tmp_path):
+    """Test intraday and end-of-day data have separate TTLs."""
+    cache = PriceCache(tmp_path, intraday_ttl=60, daily_ttl=900)
+
+    assert cache.ttl('5m') == 60
+    assert cache.ttl('1h') == 60
+    assert cache.ttl('1d') == 900
+    assert cache.ttl('1wk') == 900
+
+
+def test_refresh_merges_bars_with_a_different_index_timezone(mock_ticker, tmp_path):
+    """Test exchange-local refreshed bars merge into naive cached bars instead of failing the ticker."""
+    frame = mock_ticker.history.return_value
+    source = DataFramePriceSource({'AAPL': frame})
+    cached_source = CachedPriceSource(source, PriceCache(tmp_path, daily_ttl=0))
+    cached_source.fetch(['AAPL'], date(2023, 1, 1), date(2023, 1, 6))
+
+    source.frames['AAPL'] = frame.tz_localize('America/New_York')
+    result = cached_source.fetch(['AAPL'], date(2023, 1, 1), date(2023, 1, 11))
+
+    assert result['AAPL']['Close'].tolist() == [152.0 + i for i in range(10)]
+    assert result['AAPL'].index.tz is None
@@ -0,0 +1,124 @@
+from datetime import date
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.price_loader import (
+    DataFramePriceSource,
+    PriceLoader,
+    YahooPriceSource,
+)
+
+
+def make_frame(closes, start='2023-01-01'):
+    """Build an OHLCV frame with the given closing prices."""
+    dates = pd.date_range(start=start, periods=len(closes))
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        'Open': closes - 1,
+        'High': closes + 2,
+        'Low': closes - 2,
+        'Close': closes,
+        'Volume': np.arange(len(closes)) * 1000 + 1000,
+    }, index=dates)
+
+
+@pytest.fixture
+def fixture_source(mock_ticker):
+    """Local price source with two tickers of recorded data."""
+    return DataFramePriceSource({
+        'AAPL': mock_ticker.history.return_value,
+        'MSFT': make_frame([300.0, 310.0, 305.0]),
+    })
+
+
+def test_load_serves_single_tickers_from_prefetched_batch(fixture_source):
+    """Test prefetch makes one source call and later loads reuse it."""
+    loader = PriceLoader(source=fixture_source, clock=lambda: date(2023, 1, 11))
+
+    loader.prefetch(['AAPL', 'MSFT'])
+    aapl = loader.get_price_data('AAPL', days=10)
+    msft = loader.get_price_data('MSFT', days=10)
+
+    assert fixture_source.calls == [['AAPL', 'MSFT']]
+    assert aapl['bars'] == 10
+    assert msft['moving_average'] == pytest.approx(305.0)
+
+
+def test_load_fetches_missing_tickers_together(fixture_source):
+    """Test tickers outside the batch are fetched in one call and unknown ones are omitted."""
+    loader = PriceLoader(source=fixture_source, clock=lambda: date(2023, 1, 11))
+    loader.prefetch(['AAPL'], days=10)
+
+    frames = loader.load(['AAPL', 'MSFT', 'NOPE'], days=10)
+
+    assert set(frames) == {'AAPL', 'MSFT'}
+    assert fixture_source.calls == [['AAPL'], ['MSFT', 'NOPE']]
+    assert loader.get_price_data('NOPE') is None
+
+
+def test_load_refetches_expired_batch(fixture_source):
+    """Test a batch older than its TTL is not served."""
+    loader = PriceLoader(source=fixture_source, batch_ttl=0, clock=lambda: date(2023, 1, 11))
+    loader.prefetch(['AAPL'], days=10)
+
+    loader.load(['AAPL'], days=10)
+
+    assert fixture_source.calls == [['AAPL'], ['AAPL']]
+
+
+def test_compute_peers_attaches_statistics_to_payloads():
+    """Test peer statistics use the prefetched batch plus one benchmark fetch and reach the price payload."""
+    steps = np.tile([0.01, -0.005], 20)
+    source = DataFramePriceSource({
+        'SPY': make_frame(100 * np.exp(np.cumsum(steps))),
+        'AAPL': make_frame(100 * np.exp(np.cumsum(2 * steps))),
+        'MSFT': make_frame(100 * np.exp(np.cumsum(-steps))),
+    })
+    loader = PriceLoader(source=source, clock=lambda: date(2023, 2, 9))
+    loader.prefetch(['AAPL', 'MSFT'])
+
+    loader.compute_peers(['AAPL', 'MSFT'], benchmark='SPY')
+    peers = loader.get_price_data('AAPL')['peers']
+
+    assert source.calls == [['AAPL', 'MSFT'], ['SPY']]
+    assert peers['beta'] == pytest.approx(2.0)
+    assert peers['relative_strength_rank'] == 1
+    assert peers['most_correlated'] == {'ticker': 'MSFT', 'correlation': -1.0}
+    assert loader.get_price_data('SPY') is not None and 'peers' not in loader.get_price_data('SPY')
+
+
+@patch('src.utils.price_loader.yf.download')
+def test_yahoo_source_downloads_many_tickers_at_once(mock_download):
+    """Test the Yahoo source splits one multi-ticker download into per-ticker frames."""
+    mock_download.return_value = pd.concat(
+        {'AAPL': make_frame([1.0, 2.0]), 'MSFT': make_frame([3.0, 4.0])}, axis=1
+    )
+
+    frames = YahooPriceSource().fetch(['AAPL', 'MSFT', 'NOPE'], start=date(2023, 1, 1))
+
+    mock_download.assert_called_once()
+    assert set(frames) == {'AAPL', 'MSFT'}
+    assert frames['MSFT']['Close'].tolist() == [3.0, 4.0]
+
+
+@patch('src.utils.price_loader.yahoo_ticker')
+@patch('src.utils.price_loader.yf.download')
+def test_yahoo_source_single_and_batch_fetches_share_one_index_type(mock_download, mock_yahoo_ticker):
+    """Test a single-ticker fetch (exchange-local index) merges with a batch fetch (naive index)."""
+    mock_download.return_value = pd.concat(
+        {'AAPL': make_frame([1.0, 2.0]), 'MSFT': make_frame([3.0, 4.0])}, axis=1
+    )
+    single = make_frame([2.5, 5.0], start='2023-01-02')
+    mock_yahoo_ticker.return_value.history.return_value = single.tz_localize('America/New_York')
+    source = YahooPriceSource()
+
+    batch = source.fetch(['AAPL', 'MSFT'], start=date(2023, 1, 1))['AAPL']
+    refreshed = source.fetch(['AAPL'], start=date(2023, 1, 2))['AAPL']
+    merged = pd.concat([batch, refreshed]).sort_index()
+
+    assert refreshed.index.tz is None
+    assert refreshed.index.equals(single.index)
+    assert merged['Close'].tolist() == [1.0, 2.0, 2.5, 5.0]
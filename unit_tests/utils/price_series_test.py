@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.price_loader import DataFramePriceSource, PriceLoader
+from src.utils.price_series import PriceSeries
+
+
+def frame_to_records(frame):
+    """Convert an OHLCV frame to per-day dicts, the layout the price tool used to return."""
+    return [
+        {"date": str(day.date()), "open": float(row.Open), "close": float(row.Close),
+         "high": float(row.High), "low": float(row.Low), "volume": int(row.Volume)}
+        for day, row in zip(frame.index, frame.itertuples(), strict=True)
+    ]
+
+
+def test_from_frame_shares_memory_with_frame(mock_ticker):
+    """Test the columnar view does not copy the frame's columns."""
+    frame = mock_ticker.history.return_value
+
+    series = PriceSeries.from_frame("AAPL", frame)
+
+    assert len(series) == 10
+    assert np.shares_memory(series.close, frame["Close"].to_numpy())
+    assert not hasattr(series, "__dict__")
+
+
+def test_columns_match_records(mock_ticker):
+    """Test the columnar output holds the same values as the per-day records."""
+    frame = mock_ticker.history.return_value
+
+    columns = PriceSeries.from_frame("AAPL", frame).columns()
+
+    records = frame_to_records(frame)
+    assert columns["date"] == [record["date"] for record in records]
+    assert columns["close"] == [record["close"] for record in records]
+    assert columns["volume"] == [record["volume"] for record in records]
+
+
+def test_summary_aggregates_and_downsamples(mock_ticker):
+    """Test the prompt summary carries aggregates, returns, key levels and a few closes."""
+    frame = mock_ticker.history.return_value
+
+    summary = PriceSeries.from_frame("AAPL", frame).summary(points=4)
+
+    assert summary["start"] == "2023-01-01" and summary["end"] == "2023-01-10"
+    assert (summary["open"], summary["close"]) == (150.0, 161.0)
+    assert (summary["high"], summary["high_date"]) == (164.0, "2023-01-10")
+    assert (summary["low"], summary["low_date"]) == (148.0, "2023-01-01")
+    assert summary["change_pct"] == pytest.approx((161 / 152 - 1) * 100, abs=0.01)
+    assert summary["return_5d_pct"] == pytest.approx((161 / 156 - 1) * 100, abs=0.01)
+    assert summary["moving_average"] == pytest.approx(frame["Close"].mean())
+    assert summary["volatility"] == pytest.approx(frame["Close"].std(), abs=1e-4)
+    assert summary["closes"] == {
+        "date": ["2023-01-01", "2023-01-04", "2023-01-07", "2023-01-10"],
+        "close": [152.0, 155.0, 158.0, 161.0],
+    }
+
+
+def test_summary_size_does_not_grow_with_the_window():
+    """Test a year of bars yields a payload far smaller than the per-day records."""
+    dates = pd.bdate_range("2023-01-02", periods=250)
+    close = np.linspace(100.0, 150.0, len(dates))
+    frame = pd.DataFrame(
+        {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1_000_000},
+        index=dates,
+    )
+
+    summary = json.dumps(PriceSeries.from_frame("AAPL", frame).summary())
+
+    assert len(summary) * 10 < len(json.dumps(frame_to_records(frame)))
+    assert len(summary) < len(json.dumps(PriceSeries.from_frame("AAPL", frame[:20]).summary())) * 1.2
+
+
+def test_loader_returns_none_series_without_data():
+    """Test a ticker without history has no series."""
+    loader = PriceLoader(source=DataFramePriceSource({}))
+
+    assert loader.get_price_series("NOPE") is None
+
+
+def test_timezone_aware_index_keeps_exchange_dates(mock_ticker):
+    """Test Yahoo's tz-aware daily timestamps map to their local trading dates."""
+    frame = mock_ticker.history.return_value.tz_localize("America/New_York")
+
+    series = PriceSeries.from_frame("AAPL", frame)
+
+    assert series.date_strings()[:2] == ["2023-01-01", "2023-01-02"]
+    assert series.summary()["end"] == "2023-01-10"
@@ -0,0 +1,196 @@
+import math
+import random
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.utils import rate_limit
+from src.utils.metrics import RunMetrics, recording
+from src.utils.rate_limit import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Provider,
+    RetryPolicy,
+    TokenBucket,
+    classify,
+)
+
+
+class FakeClock:
+    """Clock advanced only by the fake sleep."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def http_error(status: int, retry_after: str | None = None) -> Exception:
+    error = Exception(f"HTTP {status}")
+    error.response = MagicMock(status_code=status, headers={"Retry-After": retry_after} if retry_after else {})
+    return error
+
+
+def test_token_bucket_allows_bursts_then_paces_requests():
+    """Test the bucket serves its capacity at once and then one token per 1/rate seconds."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2.0, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(4)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2:] == [pytest.approx(0.5), pytest.approx(0.5)]
+
+
+def test_token_bucket_backs_off_and_recovers():
+    """Test throttling halves the rate and successes restore it gradually."""
+    bucket = TokenBucket(rate=10.0)
+
+    bucket.throttled()
+    bucket.throttled()
+    assert bucket.rate == pytest.approx(2.5)
+
+    for _ in range(100):
+        bucket.succeeded()
+    assert bucket.rate == 10.0
+
+
+def test_unlimited_bucket_never_waits():
+    """Test an infinite rate passes every request straight through."""
+    bucket = TokenBucket(rate=math.inf, sleep=lambda seconds: pytest.fail("slept"))
+
+    assert all(bucket.acquire() == 0.0 for _ in range(100))
+
+
+def test_circuit_breaker_opens_and_probes_after_timeout():
+    """Test the circuit opens after repeated failures and a trial call closes it again."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, clock=clock)
+
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now += 10.0
+    assert breaker.state == "half-open"
+    breaker.before_call()
+    # Only one trial call at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now += 10.0
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_classify_errors():
+    """Test provider errors are sorted into throttled, transient and final ones."""
+    class YFRateLimitError(Exception):
+        pass
+
+    assert classify(http_error(429)) == "throttled"
+    assert classify(YFRateLimitError("Too Many Requests. Rate limited.")) == "throttled"
+    assert classify(http_error(503)) == "transient"
+    assert classify(TimeoutError()) == "transient"
+    assert classify(http_error(404)) == "fatal"
+    assert classify(Exception("HTTP Error 404: Quote not found")) == "fatal"
+
+
+def make_provider(**kwargs) -> tuple[Provider, FakeClock]:
+    clock = FakeClock()
+    provider = Provider(
+        "brave",
+        TokenBucket(rate=100.0, capacity=100.0, clock=clock, sleep=clock.sleep),
+        breaker=CircuitBreaker(clock=clock, **kwargs),
+        retry=RetryPolicy(max_attempts=3, base_delay=1.0),
+        sleep=clock.sleep,
+        rng=random.Random(0),
+    )
+    return provider, clock
+
+
+def test_provider_retries_throttled_calls_honoring_retry_after():
+    """Test a 429 is retried after the delay the provider asked for and slows the bucket down."""
+    provider, clock = make_provider()
+    func = MagicMock(side_effect=[http_error(429, retry_after="7"), "results"])
+    run = RunMetrics("AAPL")
+
+    with recording(run):
+        assert provider.call(func, "query") == "results"
+
+    assert 7.0 in clock.sleeps
+    assert provider.bucket.rate < 100.0
+    assert run.to_dict()["provider_errors"] == {"retry": {"brave": 1}, "throttled": {"brave": 1}}
+
+
+def test_provider_gives_up_after_max_attempts_with_jittered_backoff():
+    """Test transient failures are retried with growing, jittered delays and then re-raised."""
+    provider, clock = make_provider()
+    func = MagicMock(side_effect=TimeoutError("slow"))
+
+    with pytest.raises(TimeoutError):
+        provider.call(func)
+
+    assert func.call_count == 3
+    assert len(clock.sleeps) == 2
+    assert 0.0 <= clock.sleeps[0] <= 1.0 and 0.0 <= clock.sleeps[1] <= 2.0
+
+
+def test_provider_does_not_retry_final_errors():
+    """Test a final error (e.g. 404) is raised at once and does not count against the circuit."""
+    provider, _ = make_provider(failure_threshold=1)
+    func = MagicMock(side_effect=http_error(404))
+
+    for _ in range(3):
+        with pytest.raises(Exception, match="HTTP 404"):
+            provider.call(func)
+
+    assert func.call_count == 3
+    assert provider.breaker.state == "closed"
+
+
+def test_open_circuit_fails_fast():
+    """Test calls are refused without reaching the provider once its circuit is open."""
+    provider, _ = make_provider(failure_threshold=1)
+    func = MagicMock(side_effect=http_error(500))
+
+    with pytest.raises(Exception, match="HTTP 500"):
+        provider.call(func)
+    with pytest.raises(CircuitOpenError):
+        provider.call(func)
+
+    assert func.call_count == 1
+
+
+def test_shared_providers_use_env_override(monkeypatch):
+    """Test the process-wide limiter of a provider is shared and its rate can be overridden."""
+    monkeypatch.setenv(f"{rate_limit.RATE_ENV_PREFIX}LLM", "20")
+
+    provider = rate_limit.get_provider("llm")
+
+    assert provider is rate_limit.get_provider("llm")
+    assert provider.bucket.rate == 20.0
+    assert rate_limit.get_provider("brave").bucket.rate == rate_limit.DEFAULT_LIMITS["brave"][0]
+
+
+@pytest.mark.parametrize("override", ["0", "-2", "nan", "fast"])
+def test_env_override_rejects_non_positive_rates(monkeypatch, override):
+    """Test a zero, negative or unparsable rate override keeps the provider's default limits."""
+    monkeypatch.setenv(f"{rate_limit.RATE_ENV_PREFIX}YAHOO", override)
+
+    bucket = rate_limit.get_provider("yahoo").bucket
+
+    assert (bucket.rate, bucket.capacity) == rate_limit.DEFAULT_LIMITS["yahoo"]
+    assert bucket.acquire() == 0.0
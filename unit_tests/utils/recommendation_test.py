@@ -0,0 +1,36 @@
+from src.utils.recommendation import Recommendation, parse_recommendation
+
+
+def test_parse_fenced_json_with_prose():
+    """Test the JSON object is found inside a code fence surrounded by prose."""
+    text = (
+        "Here is my recommendation:\n```json\n"
+        '{"ticker": "aapl", "action": "buy", "explanation": "Strong momentum.", '
+        '"references": [{"title": "Q3", "url": "https://example.com/q3"}, "https://example.com/a"]}\n'
+        "```\nThanks."
+    )
+
+    assert parse_recommendation(text) == Recommendation(
+        ticker="AAPL",
+        action="Buy",
+        explanation="Strong momentum.",
+        references=["https://example.com/q3", "https://example.com/a"],
+    )
+
+
+def test_parse_uses_given_ticker_and_skips_invalid_objects():
+    """Test objects without a valid action are skipped and the ticker is filled in."""
+    text = 'Context {"price": 10} then {"Action": "Hold", "Explanation": "Mixed signals"}'
+
+    recommendation = parse_recommendation(text, ticker="msft")
+
+    assert recommendation.ticker == "MSFT"
+    assert recommendation.action == "Hold"
+    assert recommendation.references == []
+
+
+def test_parse_without_recommendation():
+    """Test text without a valid recommendation gives None."""
+    assert parse_recommendation("I cannot decide.") is None
+    assert parse_recommendation('{"action": "Maybe"}') is None
+    assert parse_recommendation("{not json") is None
@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+
+import pytest
+
+from src.utils.events import AnalysisFinished, NewsItems, PriceSummary, SentimentScore
+from src.utils.recommendation import Recommendation
+from src.utils.results_store import ResultsRecorder, ResultsStore, StoredResult
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(tmp_path / "results.sqlite3")
+    yield store
+    store.close()
+
+
+def result(ticker, action, finished_at, success=True):
+    """Build a stored result finished at ``finished_at``."""
+    return StoredResult(
+        ticker=ticker, finished_at=finished_at, success=success, action=action,
+        explanation=f"{ticker} {action}", error=None if success else "boom",
+    )
+
+
+def test_recorder_stores_each_finished_analysis_from_its_events(store):
+    """Test interleaved events of two tickers become one row each with digest, news, sentiment and call."""
+    recorder = ResultsRecorder(store)
+    article = {"title": "Beat", "url": "https://example.com/1", "summary": "long text"}
+    recorder(PriceSummary(ticker="AAPL", summary={"start": "2024-01-02", "end": "2024-03-01", "close": 180.0,
+                                                   "prices": [1.0] * 50}))
+    recorder(NewsItems(ticker="MSFT", query="MSFT news", articles=[]))
+    recorder(NewsItems(ticker="AAPL", query="AAPL news", articles=[article]))
+    recorder(NewsItems(ticker="AAPL", query="AAPL earnings", articles=[article]))
+    recorder(SentimentScore(ticker="AAPL", score=0.4, texts=1, ambiguous=0))
+    recorder(AnalysisFinished(ticker="AAPL", success=True, recommendation=Recommendation("AAPL", "Buy", "Strong", ["x"]),
+                              timestamp=100.0))
+    recorder(AnalysisFinished(ticker="MSFT", success=False, error="No data", timestamp=101.0))
+
+    aapl, msft = sorted(store.query(), key=lambda stored: stored.ticker)
+    assert aapl.price == {"period": "2024-01-02 to 2024-03-01", "close": 180.0}
+    assert aapl.news == [{"title": "Beat", "url": "https://example.com/1"}]
+    assert (aapl.sentiment, aapl.action, aapl.references, aapl.finished_at) == (0.4, "Buy", ["x"], 100.0)
+    assert (msft.success, msft.error, msft.action, msft.price) == (False, "No data", None, None)
+
+
+def test_query_and_latest_use_ticker_action_and_time(store):
+    """Test filtered queries come newest first and a failed run does not hide the latest call."""
+    for stored in [
+        result("AAPL", "Buy", 100.0), result("AAPL", "Sell", 200.0), result("AAPL", None, 300.0, success=False),
+        result("MSFT", "Sell", 150.0), result("NVDA", "Hold", 250.0),
+    ]:
+        store.add(stored)
+
+    assert [(r.ticker, r.finished_at) for r in store.query(action="sell", since=120.0)] == [
+        ("AAPL", 200.0), ("MSFT", 150.0),
+    ]
+    assert [r.finished_at for r in store.query(ticker="aapl", until=300.0)] == [200.0, 100.0]
+    assert len(store.query(successful_only=True, limit=10)) == 4
+    assert {ticker: r.action for ticker, r in store.latest().items()} == {"AAPL": "Sell", "MSFT": "Sell", "NVDA": "Hold"}
+    assert list(store.latest(["nvda"])) == ["NVDA"]
+    assert store.latest([]) == {}
+    assert len(store) == 5
+
+
+def test_export_writes_every_result_as_jsonl_or_csv(store):
+    """Test the bulk export covers every row, in insertion order, in both formats."""
+    store.add(result("AAPL", "Buy", 100.0))
+    store.add(result("MSFT", "Hold", 50.0))
+
+    lines = io.StringIO()
+    assert store.export(lines) == 2
+    assert [json.loads(line)["ticker"] for line in lines.getvalue().splitlines()] == ["AAPL", "MSFT"]
+
+    table = io.StringIO()
+    store.export(table, "csv")
+    rows = list(csv.DictReader(io.StringIO(table.getvalue())))
+    assert [(row["ticker"], row["action"], row["references"]) for row in rows] == [("AAPL", "Buy", "[]"), ("MSFT", "Hold", "[]")]
+    with pytest.raises(ValueError):
+        store.export(io.StringIO(), "xml")
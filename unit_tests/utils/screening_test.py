@@ -0,0 +1,103 @@
+import json
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.news_cache import NewsSearchCache, StubSearchBackend
+from src.utils.price_loader import DataFramePriceSource, PriceLoader
+from src.utils.screening import ScreenRules, fast_hold, screen_ticker
+
+TODAY = date(2024, 6, 28)
+
+
+def make_frame(closes, volumes=None):
+    """Build a daily OHLCV frame ending on TODAY."""
+    closes = np.asarray(closes, dtype=float)
+    volumes = np.full(len(closes), 1_000_000.0) if volumes is None else np.asarray(volumes, dtype=float)
+    return pd.DataFrame({
+        'Open': closes, 'High': closes + 0.5, 'Low': closes - 0.5, 'Close': closes, 'Volume': volumes,
+    }, index=pd.date_range(end=TODAY, periods=len(closes)))
+
+
+def quiet_closes(bars=120, seed=0):
+    """Closes drifting around 100 with small daily moves."""
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.005, bars)))
+
+
+def make_loader(**frames):
+    return PriceLoader(source=DataFramePriceSource(frames), clock=lambda: TODAY)
+
+
+def make_news(count=0):
+    results = [{"title": f"QUIET story {i}", "url": f"https://news.example/{i}", "description": ""} for i in range(count)]
+    return NewsSearchCache(StubSearchBackend(default=results))
+
+
+def test_quiet_ticker_gets_a_fast_hold():
+    """Test a ticker with small moves, steady volume and little news triggers no rule."""
+    loader = make_loader(QUIET=make_frame(quiet_closes()))
+
+    result = screen_ticker("QUIET", loader=loader, news_cache=make_news(1))
+
+    assert result.needs_analysis is False
+    assert result.triggered == []
+    assert result.measurements["news_count"] == 1
+    recommendation = fast_hold(result)
+    assert recommendation.action == "Hold"
+    assert "news count 1" in recommendation.explanation
+
+
+@pytest.mark.parametrize("closes, volumes, rule", [
+    (np.r_[quiet_closes()[:-1], quiet_closes()[-2] * 1.05], None, "daily_move"),
+    (np.r_[quiet_closes()[:-20], np.linspace(quiet_closes()[-21], quiet_closes()[-21] * 1.12, 20)], None, "price_change"),
+    (quiet_closes(), np.r_[np.full(119, 1e6), 3e6], "volume_spike"),
+    (np.r_[quiet_closes()[:-5], quiet_closes()[-6] * np.array([1.02, 0.99, 1.02, 0.995, 1.01])], None, "volatility_spike"),
+])
+def test_each_rule_sends_the_ticker_to_the_crew(closes, volumes, rule):
+    """Test every price rule on its own marks the ticker for full analysis and is reported."""
+    news = make_news()
+    loader = make_loader(MOVER=make_frame(closes, volumes))
+
+    result = screen_ticker("MOVER", loader=loader, news_cache=news)
+
+    assert result.needs_analysis is True
+    assert rule in result.triggered
+    # Price rules fired, so no news search was needed
+    assert news.backend.queries == []
+
+
+def test_news_count_rule_and_disabled_rules():
+    """Test busy news triggers the crew, and rules set to None are skipped."""
+    loader = make_loader(QUIET=make_frame(quiet_closes()))
+
+    busy = screen_ticker("QUIET", loader=loader, news_cache=make_news(6))
+    no_news_rule = screen_ticker("QUIET", ScreenRules(min_news_count=None), loader=loader, news_cache=make_news(6))
+
+    assert busy.triggered == ["news_count"]
+    assert no_news_rule.needs_analysis is False
+    assert "news_count" not in no_news_rule.measurements
+
+
+def test_missing_prices_always_run_the_crew():
+    """Test a ticker without price data is left to the crew instead of getting a Hold."""
+    result = screen_ticker("NODATA", loader=make_loader(), news_cache=make_news())
+
+    assert result.needs_analysis is True
+    assert result.triggered == ["no_price_data"]
+
+
+def test_screen_rules_from_file(tmp_path):
+    """Test thresholds can be overridden from JSON and unknown keys are rejected."""
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"min_change_pct": 4.0, "min_news_count": None}))
+
+    rules = ScreenRules.from_file(path)
+
+    assert rules.min_change_pct == 4.0
+    assert rules.min_news_count is None
+    assert rules.volume_spike_ratio == ScreenRules().volume_spike_ratio
+    with pytest.raises(ValueError, match="min_change"):
+        ScreenRules.from_dict({"min_change": 4.0})
@@ -0,0 +1,75 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.agents.sentiment_agent import score_sentiment_tool
+from src.utils.sentiment_scorer import SentimentScorer, score_with_fallback
+
+HEADLINES = [
+    "Apple beats estimates as iPhone sales surge to a record",
+    "Regulators open fraud probe as shares plunge",
+    "Apple to hold annual shareholder meeting on Tuesday",
+]
+
+
+def test_scores_have_expected_direction_and_range():
+    """Test positive, negative and neutral headlines score in the right direction."""
+    batch = SentimentScorer().score(HEADLINES)
+
+    assert batch.scores[0] > 0.5
+    assert batch.scores[1] < -0.5
+    assert abs(batch.scores[2]) < 0.15
+    assert np.all(np.abs(batch.scores) <= 1.0)
+    assert batch.ambiguous.tolist() == [False, False, True]
+
+
+def test_negation_flips_polarity():
+    """Test a negator flips the lexicon words that follow it."""
+    scorer = SentimentScorer(textblob_weight=0)
+
+    positive, negated = scorer.score(["Shares rally", "Shares did not rally"]).scores
+
+    assert positive > 0
+    assert negated == pytest.approx(-positive)
+
+
+def test_lexicon_only_scoring_is_deterministic():
+    """Test scoring without TextBlob depends only on the lexicon."""
+    scorer = SentimentScorer(lexicon={"good": 2.0, "bad": -2.0}, textblob_weight=0)
+
+    batch = scorer.score(["good good", "bad", "nothing here", ""])
+
+    assert batch.scores[0] == pytest.approx(4 / np.sqrt(16 + 4))
+    assert batch.scores[1] == pytest.approx(-2 / np.sqrt(4 + 4))
+    assert batch.lexicon_hits.tolist() == [2, 1, 0, 0]
+    assert batch.scores[2] == batch.scores[3] == 0
+
+
+def test_score_with_fallback_only_sends_ambiguous_texts_to_llm():
+    """Test the LLM scorer is called once, for the ambiguous texts only."""
+    llm_scorer = MagicMock(return_value=[0.4])
+
+    batch = score_with_fallback(HEADLINES, llm_scorer=llm_scorer)
+
+    llm_scorer.assert_called_once_with([HEADLINES[2]])
+    assert batch.scores[2] == pytest.approx(0.4)
+    assert not batch.ambiguous.any()
+
+
+def test_score_with_fallback_skips_llm_when_nothing_is_ambiguous():
+    """Test no LLM call is made when every text is scored confidently."""
+    llm_scorer = MagicMock()
+
+    score_with_fallback(HEADLINES[:2], llm_scorer=llm_scorer)
+
+    llm_scorer.assert_not_called()
+
+
+def test_score_sentiment_tool_reports_scores_and_ambiguous_items():
+    """Test the SentimentAgent tool returns per-text scores and the ambiguous texts."""
+    result = score_sentiment_tool.run(texts=HEADLINES)
+
+    assert [item["text"] for item in result["scores"]] == HEADLINES
+    assert result["ambiguous"] == [HEADLINES[2]]
+    assert -1.0 <= result["overall_score"] <= 1.0
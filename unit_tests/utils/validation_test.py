@@ -1,9 +1,21 @@
-from unittest.mock import MagicMock, patch
+import math
+import time
+from unittest.mock import MagicMock, PropertyMock, patch
 
-from src.utils.validation import TickerValidationResult, validate_ticker_symbol
+from src.utils import rate_limit
+from src.utils.cache_config import NO_CACHE_ENV
+from src.utils.rate_limit import Provider, TokenBucket
+from src.utils.validation import (
+    COMPACT_SLACK_LINES,
+    SYMBOL_DIRECTORY_ENV,
+    TickerValidationResult,
+    ValidationCache,
+    validate_ticker_symbol,
+    validate_ticker_symbols,
+)
 
 
-@patch('src.utils.validation.yf.Ticker')
+@patch('yfinance.Ticker')
 def test_validate_ticker_symbol_valid(mock_yf_ticker, mock_ticker):
     """Test ticker validation with a valid ticker symbol."""
     mock_yf_ticker.return_value = mock_ticker
@@ -17,7 +29,7 @@ def test_validate_ticker_symbol_valid(mock_yf_ticker, mock_ticker):
     assert result.error_message is None
 
 
-@patch('src.utils.validation.yf.Ticker')
+@patch('yfinance.Ticker')
 def test_validate_ticker_symbol_valid_no_company_name(mock_yf_ticker):
     """Test ticker validation with valid ticker but no company name."""
     mock_ticker = MagicMock()
@@ -33,7 +45,7 @@ def test_validate_ticker_symbol_valid_no_company_name(mock_yf_ticker):
     assert result.error_message is None
 
 
-@patch('src.utils.validation.yf.Ticker')
+@patch('yfinance.Ticker')
 def test_validate_ticker_symbol_invalid_404(mock_yf_ticker):
     """Test ticker validation with an invalid ticker (404 error)."""
     mock_yf_ticker.side_effect = Exception("404 Client Error")
@@ -66,4 +78,126 @@ def test_validate_ticker_symbol_none():
     assert result.ticker == "None"
     assert result.is_valid is False
     assert result.company_name is None
-    assert "non-empty string" in result.error_message 
\ No newline at end of file
+    assert "non-empty string" in result.error_message 
+
+
+def test_validate_ticker_symbol_malformed():
+    """Test malformed symbols are rejected without a Yahoo lookup."""
+    with patch('yfinance.Ticker') as mock_yf_ticker:
+        result = validate_ticker_symbol("AAPL; DROP")
+
+    assert result.is_valid is False
+    assert "not a valid symbol format" in result.error_message
+    mock_yf_ticker.assert_not_called()
+
+
+@patch('yfinance.Ticker')
+def test_validate_ticker_symbol_uses_cache(mock_yf_ticker, mock_ticker, monkeypatch):
+    """Test valid and missing symbols are served from the cache on repeat lookups."""
+    monkeypatch.delenv(NO_CACHE_ENV)
+    def make_ticker(ticker, **kwargs):
+        if ticker == "INVALID":
+            raise Exception("404 Client Error")
+        return mock_ticker
+    mock_yf_ticker.side_effect = make_ticker
+
+    first = [validate_ticker_symbol("AAPL"), validate_ticker_symbol("INVALID")]
+    second = [validate_ticker_symbol("AAPL"), validate_ticker_symbol("INVALID")]
+
+    assert first == second
+    assert second[0].is_valid is True
+    assert second[1].is_valid is False
+    assert mock_yf_ticker.call_count == 2
+
+
+def test_validation_cache_ttls_and_persistence(tmp_path):
+    """Test cache entries survive a reload and expire by their own TTLs."""
+    path = tmp_path / "tickers.json"
+    cache = ValidationCache(path, positive_ttl=60, negative_ttl=60)
+    cache.put(TickerValidationResult("AAPL", True, "Apple Inc.", None))
+    cache.put(TickerValidationResult("NOPE", False, None, "Ticker symbol 'NOPE' does not exist."))
+
+    reloaded = ValidationCache(path, positive_ttl=60, negative_ttl=0)
+    with patch('src.utils.validation.time.time', return_value=time.time() + 1):
+        assert reloaded.get("AAPL") == TickerValidationResult("AAPL", True, "Apple Inc.", None)
+        assert reloaded.get("NOPE") is None
+
+
+def test_validation_cache_appends_each_result_and_compacts_on_load(tmp_path):
+    """Test every put appends one line instead of rewriting the file, and superseded lines are compacted."""
+    path = tmp_path / "tickers.jsonl"
+    cache = ValidationCache(path)
+    for _ in range(2 * COMPACT_SLACK_LINES):
+        cache.put(TickerValidationResult("AAPL", True, "Apple Inc.", None))
+    cache.put(TickerValidationResult("MSFT", True, "Microsoft", None))
+    assert len(path.read_text().splitlines()) == 2 * COMPACT_SLACK_LINES + 1
+
+    reloaded = ValidationCache(path)
+
+    assert len(path.read_text().splitlines()) == 2
+    assert reloaded.get("msft") == TickerValidationResult("msft", True, "Microsoft", None)
+
+
+@patch('yfinance.Ticker')
+def test_validate_ticker_symbol_does_not_cache_transient_errors(mock_yf_ticker, monkeypatch):
+    """Test generic lookup errors are retried instead of cached."""
+    monkeypatch.delenv(NO_CACHE_ENV)
+    mock_yf_ticker.side_effect = Exception("Read timed out")
+
+    validate_ticker_symbol("AAPL")
+    validate_ticker_symbol("AAPL")
+
+    assert mock_yf_ticker.call_count == 2
+
+
+@patch('yfinance.Ticker')
+def test_validate_ticker_symbols_bulk(mock_yf_ticker, mock_ticker):
+    """Test bulk validation returns one result per distinct ticker in input order."""
+    def make_ticker(ticker, **kwargs):
+        if ticker == "INVALID":
+            raise Exception("404 Client Error")
+        return mock_ticker
+    mock_yf_ticker.side_effect = make_ticker
+
+    results = validate_ticker_symbols(["AAPL", "INVALID", "", "MSFT", "AAPL"])
+
+    assert list(results) == ["AAPL", "INVALID", "", "MSFT"]
+    assert results["AAPL"].is_valid is True
+    assert results["MSFT"].company_name == "Test Company"
+    assert "does not exist" in results["INVALID"].error_message
+    assert "non-empty string" in results[""].error_message
+    assert mock_yf_ticker.call_count == 3
+
+
+@patch('yfinance.Ticker')
+def test_validate_ticker_symbol_offline_directory(mock_yf_ticker, tmp_path, monkeypatch):
+    """Test an exchange listing file answers validation without network calls."""
+    listing = tmp_path / "nasdaqlisted.txt"
+    listing.write_text(
+        "Symbol|Security Name|Market Category\n"
+        "AAPL|Apple Inc. - Common Stock|Q\n"
+        "File Creation Time: 0101202300:00|||\n"
+    )
+    monkeypatch.setenv(SYMBOL_DIRECTORY_ENV, str(listing))
+
+    valid = validate_ticker_symbol("AAPL")
+    invalid = validate_ticker_symbol("ZZZZ")
+
+    assert valid.company_name == "Apple Inc. - Common Stock"
+    assert invalid.is_valid is False
+    assert "does not exist" in invalid.error_message
+    mock_yf_ticker.assert_not_called()
+
+
+@patch('yfinance.Ticker')
+def test_validate_ticker_symbol_retries_when_throttled(mock_yf_ticker, mock_ticker):
+    """Test a rate-limited Yahoo lookup is retried instead of reported as an error."""
+    rate_limit.set_provider("yahoo", Provider("yahoo", TokenBucket(math.inf), sleep=lambda seconds: None))
+    throttled = MagicMock()
+    type(throttled).info = PropertyMock(side_effect=Exception("Too Many Requests. Rate limited. Try after a while."))
+    mock_yf_ticker.side_effect = [throttled, mock_ticker]
+
+    result = validate_ticker_symbol("AAPL")
+
+    assert result.is_valid is True
+    assert mock_yf_ticker.call_count == 2
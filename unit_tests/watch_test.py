@@ -0,0 +1,147 @@
+from datetime import date
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.news_cache import NewsSearchCache, StubSearchBackend
+from src.utils.price_loader import DataFramePriceSource, PriceLoader
+from src.watch import Snapshot, Watcher, WorkQueue, changes, move_size
+
+
+def make_frame(closes, start="2024-03-01"):
+    """Build a daily close-only frame."""
+    return pd.DataFrame({"Close": np.asarray(closes, dtype=float)}, index=pd.bdate_range(start, periods=len(closes)))
+
+
+class RecordingAnalyzer:
+    """Stands in for analyze_tickers, remembering the order of every batch it was given."""
+
+    def __init__(self, failing=()):
+        self.batches = []
+        self.failing = set(failing)
+
+    def __call__(self, tickers):
+        self.batches.append(list(tickers))
+        for ticker in tickers:
+            yield ticker, ticker not in self.failing, "boom" if ticker in self.failing else None
+
+
+@pytest.fixture
+def watched():
+    """A watcher over three tickers with local prices and canned news."""
+    frames = {
+        "AAPL": make_frame([100, 101]),
+        "MSFT": make_frame([100, 95]),
+        "NVDA": make_frame([100, 103]),
+    }
+    backend = StubSearchBackend(default=[{"title": "Story", "url": "https://example.com/1", "description": "d"}])
+    source = DataFramePriceSource(frames)
+    analyzer = RecordingAnalyzer()
+    watcher = Watcher(
+        ["aapl", "MSFT", "NVDA"],
+        loader=PriceLoader(source=source, clock=lambda: date(2024, 3, 5)),
+        news_cache=NewsSearchCache(backend, ttl=0),
+        analyze=analyzer,
+    )
+    return watcher, source, backend, analyzer
+
+
+def test_changes_and_move_size():
+    """Test the fingerprint diff names new bars, same-bar moves past the threshold and new articles."""
+    previous = Snapshot("AAPL", "2024-03-04", 100.0, 1.0, frozenset({"a"}))
+
+    assert changes(previous, None, 2.0) == ["first_seen"]
+    assert changes(Snapshot("AAPL", "2024-03-04", 101.5, 1.0, frozenset({"a"})), previous, 2.0) == []
+    assert changes(Snapshot("AAPL", "2024-03-04", 97.0, 1.0, frozenset({"a", "b"})), previous, 2.0) == [
+        "price_move", "new_articles",
+    ]
+    assert changes(Snapshot("AAPL", "2024-03-05", 100.0, 0.0, frozenset({"a"})), previous, 2.0) == ["new_bar"]
+    assert move_size(Snapshot("AAPL", "2024-03-04", 97.0, 1.0), previous) == pytest.approx(3.0)
+    assert move_size(Snapshot("AAPL", "2024-03-05", 100.0, -4.0), previous) == pytest.approx(4.0)
+
+
+def test_work_queue_orders_by_priority_and_keeps_the_highest():
+    """Test tickers pop largest priority first and a re-queued ticker is popped once."""
+    queue = WorkQueue()
+    for ticker, priority in [("AAPL", 1.0), ("MSFT", 5.0), ("NVDA", 3.0), ("AAPL", 4.0), ("MSFT", 0.5)]:
+        queue.push(ticker, priority)
+
+    assert len(queue) == 3
+    assert list(queue.drain()) == ["MSFT", "AAPL", "NVDA"]
+    with pytest.raises(IndexError):
+        queue.pop()
+
+
+def test_watcher_analyzes_only_changed_tickers_largest_move_first(watched):
+    """Test the first cycle analyzes everything by move size and later cycles only the changed tickers."""
+    watcher, source, backend, analyzer = watched
+
+    watcher.run_cycle()
+    assert watcher.run_cycle() == []
+    source.frames["NVDA"] = make_frame([100, 106.5])
+    backend.results["AAPL stock news"] = [{"title": "New", "url": "https://example.com/2", "description": "d"}]
+    results = watcher.run_cycle()
+
+    assert analyzer.batches == [["MSFT", "NVDA", "AAPL"], ["NVDA", "AAPL"]]
+    assert results == [("NVDA", True, None), ("AAPL", True, None)]
+
+
+def test_watcher_retries_failures_and_persists_state(watched, tmp_path):
+    """Test a failed analysis is retried next cycle and fingerprints survive a restart."""
+    watcher, source, backend, _ = watched
+    state_file = tmp_path / "watch.json"
+    watcher.state_file = state_file
+    watcher.analyze = RecordingAnalyzer(failing={"MSFT"})
+
+    watcher.run_cycle()
+    restarted = Watcher(
+        watcher.tickers, state_file=state_file, loader=watcher.loader,
+        news_cache=watcher.news_cache, analyze=RecordingAnalyzer(),
+    )
+    restarted.run_cycle()
+
+    assert set(restarted.analyzed) == {"AAPL", "MSFT", "NVDA"}
+    assert restarted.analyze.batches == [["MSFT"]]
+
+
+def test_watcher_keeps_the_last_prices_when_the_price_poll_fails(watched):
+    """Test a failed price poll neither queues the watched tickers nor overwrites their fingerprints."""
+    watcher, _, _, analyzer = watched
+    watcher.run_cycle()
+    analyzed = dict(watcher.analyzed)
+
+    def failing_prefetch(tickers, days):
+        raise ConnectionError("Yahoo is down")
+
+    watcher.loader.prefetch = failing_prefetch
+    queue, snapshots = watcher.poll()
+
+    assert len(queue) == 0
+    assert snapshots == analyzed
+    assert len(analyzer.batches) == 1
+
+
+@patch('src.session.SessionPool')
+@patch('src.watch.analyze_tickers')
+@patch('src.utils.price_loader.get_price_loader')
+def test_watcher_keeps_sessions_across_cycles_and_skips_the_second_download(
+    mock_get_price_loader, mock_analyze_tickers, mock_pool_class, watched
+):
+    """Test the default analyze reuses one session pool and does not prefetch the batch again."""
+    watcher, source, _, _ = watched
+    mock_get_price_loader.return_value = watcher.loader
+    mock_analyze_tickers.side_effect = lambda ordered, **kwargs: [(ticker, True, None) for ticker in ordered]
+    watcher.analyze = watcher._analyze
+
+    watcher.run_cycle()
+    source.frames["NVDA"] = make_frame([100, 106.5])
+    watcher.run_cycle()
+
+    mock_pool_class.assert_called_once()
+    assert mock_analyze_tickers.call_count == 2
+    assert all(
+        call.kwargs["sessions"] is mock_pool_class.return_value and call.kwargs["prefetched"]
+        for call in mock_analyze_tickers.call_args_list
+    )